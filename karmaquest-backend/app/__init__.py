@@ -3,48 +3,147 @@ from flask_cors import CORS
 from flask_jwt_extended import JWTManager
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
+from importlib import import_module
+import logging
 
 db = SQLAlchemy()
 migrate = Migrate()
 jwt = JWTManager()
 
+# (route module, url prefix) - each module exposes a `bp` Blueprint
+BLUEPRINTS = (
+    ('app.routes.auth', '/api/auth'),
+    ('app.routes.user', '/api/users'),
+    ('app.routes.workout', '/api/workouts'),
+    ('app.routes.progress', '/api/progress'),
+    ('app.routes.plan', '/api/plans'),
+    ('app.routes.pose', '/api/pose'),
+    ('app.routes.admin', '/api/admin'),
+    ('app.routes.trainer', '/api/trainer'),
+)
+
 def create_app(config_name='development'):
     from config.config import config
     
     app = Flask(__name__)
     app.config.from_object(config[config_name])
     
+    # Routes and services log through module loggers under the 'app' package
+    app_logger = logging.getLogger('app')
+    app_logger.setLevel(app.config['LOG_LEVEL'])
+    if not app_logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter('[%(name)s] %(levelname)s: %(message)s'))
+        app_logger.addHandler(handler)
+    
+    from app.utils.json_provider import OrjsonProvider
+    app.json = OrjsonProvider(app)
+    
+    # SQLite doesn't use a QueuePool, so pool sizing options don't apply to it
+    if (app.config.get('SQLALCHEMY_DATABASE_URI') or '').startswith('sqlite'):
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+            key: value for key, value in app.config['SQLALCHEMY_ENGINE_OPTIONS'].items()
+            if key not in ('pool_size', 'max_overflow')
+        }
+    
     # Initialize extensions
     db.init_app(app)
     migrate.init_app(app, db)
     jwt.init_app(app)
     CORS(app)
     
+    if app.config['SLOW_QUERY_MS'] > 0:
+        from app.utils.sql_logging import log_slow_queries
+        with app.app_context():
+            log_slow_queries(db.engine, app.config['SLOW_QUERY_MS'])
+    
+    # Cache of user_id -> JWT claims so token issuance doesn't hit the users table every time.
+    # Routes that change role/email must invalidate via app.extensions['claims_cache'].pop(user_id)
+    from app.utils.cache import TTLStore
+    claims_cache = TTLStore(
+        maxsize=app.config['CLAIMS_CACHE_MAXSIZE'],
+        ttl=app.config['CLAIMS_CACHE_TTL']
+    )
+    app.extensions['claims_cache'] = claims_cache
+    
+    # Short-lived cache of recently verified logins so repeated logins skip password hashing
+    app.extensions['login_cache'] = TTLStore(
+        maxsize=app.config['LOGIN_CACHE_MAXSIZE'],
+        ttl=app.config['LOGIN_CACHE_TTL']
+    )
+
+    # user_id -> time of the last role/account change; tokens issued before it are rejected.
+    # Entries only need to outlive the longest-lived token.
+    app.extensions['token_revocations'] = TTLStore(
+        maxsize=app.config['TOKEN_REVOCATIONS_MAXSIZE'],
+        ttl=app.config['JWT_REFRESH_TOKEN_EXPIRES'].total_seconds()
+    )
+    
+    # Per-user cache of rendered dashboard responses (progress summary, achievements, current plan)
+    app.extensions['user_cache'] = TTLStore(
+        maxsize=app.config['USER_CACHE_MAXSIZE'],
+        ttl=app.config['USER_CACHE_TTL']
+    )
+    
+    # trainer_id -> frozenset of assigned client ids; admin assignment changes drop entries
+    app.extensions['trainer_clients'] = TTLStore(
+        maxsize=app.config['TRAINER_CLIENTS_CACHE_MAXSIZE'],
+        ttl=app.config['TRAINER_CLIENTS_CACHE_TTL']
+    )
+    
+    # Background jobs for /api/pose/process-video and /api/plans/workout/generate with async=true
+    from app.services.jobs import JobQueue
+    app.extensions['video_jobs'] = JobQueue(
+        'video',
+        max_workers=app.config['VIDEO_JOB_WORKERS'],
+        job_ttl=app.config['VIDEO_JOB_TTL']
+    )
+    app.extensions['plan_jobs'] = JobQueue(
+        'plan',
+        max_workers=app.config['PLAN_JOB_WORKERS'],
+        job_ttl=app.config['PLAN_JOB_TTL'],
+        max_tracked=app.config['PLAN_JOB_MAX_TRACKED']
+    )
+    
+    # Processed videos by write time, so old ones can be expired without scanning the directory
+    from app.services.video_jobs import OutputIndex, VIDEO_OUTPUT_DIR
+    app.extensions['video_outputs'] = OutputIndex()
+    app.extensions['video_outputs'].seed(VIDEO_OUTPUT_DIR)
+    
+    # Bounds concurrent pose inference so request threads don't oversubscribe the CPU
+    from app.utils.concurrency import SlotPool
+    app.extensions['pose_slots'] = SlotPool(
+        size=app.config['POSE_MAX_CONCURRENCY'],
+        timeout=app.config['POSE_SLOT_TIMEOUT']
+    )
+    
+    @jwt.token_in_blocklist_loader
+    def check_token_revoked(jwt_header, jwt_payload):
+        from app.utils.tokens import is_token_revoked
+        return is_token_revoked(jwt_payload)
+
     # Configure JWT to include role in token claims
     @jwt.additional_claims_loader
     def add_claims_to_access_token(identity):
+        claims = claims_cache.get(identity)
+        if claims is not None:
+            return claims
+
         from app.models.user import User
-        user = User.query.get(identity)
-        if user:
-            return {
-                'role': user.role,
-                'email': user.email
-            }
-        return {'role': 'user'}
-    
-    # Register blueprints
-    try:
-        from app.routes import auth, user, workout, progress, plan, pose, admin, trainer
-        app.register_blueprint(auth.bp, url_prefix='/api/auth')
-        app.register_blueprint(user.bp, url_prefix='/api/users')
-        app.register_blueprint(workout.bp, url_prefix='/api/workouts')
-        app.register_blueprint(progress.bp, url_prefix='/api/progress')
-        app.register_blueprint(plan.bp, url_prefix='/api/plans')
-        app.register_blueprint(pose.bp, url_prefix='/api/pose')
-        app.register_blueprint(admin.bp, url_prefix='/api/admin')
-        app.register_blueprint(trainer.bp, url_prefix='/api/trainer')
-    except ImportError:
-        pass  # Routes will be created
+        row = db.session.query(User.role, User.email).filter_by(user_id=identity).one_or_none()
+        if not row:
+            return {'role': 'user'}
+
+        claims = {
+            'role': row.role,
+            'email': row.email
+        }
+        claims_cache.set(identity, claims)
+        return claims
+    
+    # Register blueprints (import errors propagate instead of silently dropping routes)
+    for module_path, url_prefix in BLUEPRINTS:
+        app.register_blueprint(import_module(module_path).bp, url_prefix=url_prefix)
     
     @app.route('/')
     def root():
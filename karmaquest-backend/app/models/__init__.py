@@ -1,6 +1,6 @@
-from app.models.user import User, UserProfile
+from app.models.user import User, UserProfile, TrainerAssignment
 from app.models.workout import WorkoutSession, ExerciseLog
 from app.models.progress import UserProgress
 from app.models.plan import WeeklyWorkoutPlan, WeeklyMealPlan
 
-__all__ = ['User', 'UserProfile', 'WorkoutSession', 'ExerciseLog', 'UserProgress', 'WeeklyWorkoutPlan', 'WeeklyMealPlan']
+__all__ = ['User', 'UserProfile', 'TrainerAssignment', 'WorkoutSession', 'ExerciseLog', 'UserProgress', 'WeeklyWorkoutPlan', 'WeeklyMealPlan']
@@ -0,0 +1,41 @@
+import orjson
+from types import SimpleNamespace
+from sqlalchemy import cast
+from app import db
+
+
+class RowSerializable:
+    """
+    Lets listings serialize plain column rows with the model's own to_dict.
+    to_dict only reads column attributes, so a row from query_columns()
+    stands in for an instance and no ORM objects are built.
+    JSON columns are read as their stored text and passed through to the
+    response untouched, instead of being decoded to dicts and re-encoded.
+    """
+    
+    @classmethod
+    def _json_column_names(cls):
+        return [column.name for column in cls.__table__.c if isinstance(column.type, db.JSON)]
+    
+    @classmethod
+    def query_columns(cls):
+        """Query selecting every column of the model as plain rows (JSON columns as raw text)"""
+        return db.session.query(*(
+            cast(column, db.Text).label(column.name) if isinstance(column.type, db.JSON) else column
+            for column in cls.__table__.c
+        ))
+    
+    @classmethod
+    def rows_to_dicts(cls, rows):
+        json_columns = cls._json_column_names()
+        if not json_columns:
+            return [cls.to_dict(row) for row in rows]
+        
+        dicts = []
+        for row in rows:
+            values = row._asdict()
+            for name in json_columns:
+                if values[name] is not None:
+                    values[name] = orjson.Fragment(values[name])
+            dicts.append(cls.to_dict(SimpleNamespace(**values)))
+        return dicts
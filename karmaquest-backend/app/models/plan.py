@@ -1,17 +1,45 @@
 from app import db
 from datetime import datetime
-import uuid
+from sqlalchemy import update
+from app.models.types import UUIDString, new_uuid
+from app.models.mixins import RowSerializable
 
-class WeeklyWorkoutPlan(db.Model):
+class ActivePlanMixin:
+    """Plans with an is_active flag, of which each user has at most one set"""
+    
+    @classmethod
+    def deactivate_for(cls, user_id):
+        """Clear user_id's active plan with one UPDATE (no rows are loaded); the caller commits"""
+        db.session.execute(
+            update(cls)
+            .where(cls.user_id == user_id, cls.is_active.is_(True))
+            .values(is_active=False)
+            .execution_options(synchronize_session=False)
+        )
+
+class WeeklyWorkoutPlan(ActivePlanMixin, RowSerializable, db.Model):
     __tablename__ = 'weekly_workout_plans'
     
-    plan_id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    user_id = db.Column(db.String(36), db.ForeignKey('users.user_id', ondelete='CASCADE'), nullable=False)
+    plan_id = db.Column(UUIDString, primary_key=True, default=new_uuid)
+    user_id = db.Column(UUIDString, db.ForeignKey('users.user_id', ondelete='CASCADE'), nullable=False)
     start_date = db.Column(db.Date, nullable=False)
     end_date = db.Column(db.Date, nullable=False)
     plan_data = db.Column(db.JSON, nullable=False)
     is_active = db.Column(db.Boolean, default=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # Bumped by every write to the row; versions plan responses for conditional GETs
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    # Active-plan lookup and history ordering are both per user. The active-plan
+    # index is partial and unique: at most one active plan per user, and the
+    # index only holds the active rows that lookups actually hit.
+    __table_args__ = (
+        db.Index('ix_weekly_workout_plans_active_user', 'user_id', unique=True,
+                 postgresql_where=db.text('is_active'), sqlite_where=db.text('is_active')),
+        db.Index('ix_weekly_workout_plans_user_created', 'user_id', 'created_at'),
+    )
+    
+    user = db.relationship('User', back_populates='workout_plans', lazy='raise_on_sql')
     
     def to_dict(self):
         return {
@@ -24,11 +52,11 @@ class WeeklyWorkoutPlan(db.Model):
             'created_at': self.created_at.isoformat()
         }
 
-class WeeklyMealPlan(db.Model):
+class WeeklyMealPlan(ActivePlanMixin, RowSerializable, db.Model):
     __tablename__ = 'weekly_meal_plans'
     
-    meal_plan_id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    user_id = db.Column(db.String(36), db.ForeignKey('users.user_id', ondelete='CASCADE'), nullable=False)
+    meal_plan_id = db.Column(UUIDString, primary_key=True, default=new_uuid)
+    user_id = db.Column(UUIDString, db.ForeignKey('users.user_id', ondelete='CASCADE'), nullable=False)
     start_date = db.Column(db.Date, nullable=False)
     end_date = db.Column(db.Date, nullable=False)
     plan_data = db.Column(db.JSON, nullable=False)
@@ -36,6 +64,16 @@ class WeeklyMealPlan(db.Model):
     dietary_preferences = db.Column(db.JSON)
     is_active = db.Column(db.Boolean, default=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # Bumped by every write to the row; versions plan responses for conditional GETs
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    __table_args__ = (
+        db.Index('ix_weekly_meal_plans_active_user', 'user_id', unique=True,
+                 postgresql_where=db.text('is_active'), sqlite_where=db.text('is_active')),
+        db.Index('ix_weekly_meal_plans_user_created', 'user_id', 'created_at'),
+    )
+    
+    user = db.relationship('User', back_populates='meal_plans', lazy='raise_on_sql')
     
     def to_dict(self):
         return {
@@ -1,18 +1,25 @@
 from app import db
 from datetime import datetime
-import uuid
+from app.models.types import UUIDString, new_uuid
+from app.models.mixins import RowSerializable
 
-class UserProgress(db.Model):
+class UserProgress(RowSerializable, db.Model):
     __tablename__ = 'user_progress'
     
-    progress_id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    user_id = db.Column(db.String(36), db.ForeignKey('users.user_id'), nullable=False)
+    progress_id = db.Column(UUIDString, primary_key=True, default=new_uuid)
+    user_id = db.Column(UUIDString, db.ForeignKey('users.user_id'), nullable=False)
     date = db.Column(db.Date, default=datetime.utcnow)
     weight = db.Column(db.Float)
     body_measurements = db.Column(db.JSON)
     progress_photo_url = db.Column(db.String(500))
     notes = db.Column(db.Text)
     
+    __table_args__ = (
+        db.Index('ix_user_progress_user_date', 'user_id', 'date'),
+    )
+    
+    user = db.relationship('User', back_populates='progress', lazy='raise_on_sql')
+    
     def to_dict(self):
         return {
             'progress_id': self.progress_id,
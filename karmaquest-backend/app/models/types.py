@@ -0,0 +1,63 @@
+"""
+Shared column types for model keys
+"""
+
+import os
+import threading
+import time
+import uuid
+from sqlalchemy.types import TypeDecorator, Uuid
+
+
+class UUIDString(TypeDecorator):
+    """
+    UUID key column that keeps plain string values in Python.
+    Stored as native 16-byte uuid on PostgreSQL (CHAR(32) elsewhere), so API
+    payloads, JWT identities and JSON id lists are unchanged.
+    Malformed ids (e.g. from a URL) bind as NULL and simply match nothing
+    instead of raising a database error.
+    """
+    impl = Uuid(as_uuid=False)
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        try:
+            return str(uuid.UUID(str(value)))
+        except ValueError:
+            return None
+
+
+# Last (timestamp, counter) handed out by new_uuid(), so ids made within one
+# millisecond still sort in creation order
+_last_v7 = [0, 0]
+_v7_lock = threading.Lock()
+
+
+def new_uuid():
+    """
+    Time-ordered UUIDv7 string so new rows append to the end of the key index.
+    Within a millisecond the 12-bit rand_a field is a counter (RFC 9562 method 1),
+    so ids from this process are strictly increasing, e.g. rows of one bulk insert.
+    """
+    rand = int.from_bytes(os.urandom(8), 'big')
+    with _v7_lock:
+        millis = max(time.time_ns() // 1_000_000, _last_v7[0])
+        if millis == _last_v7[0]:
+            counter = _last_v7[1] + 1
+            if counter > 0xFFF:
+                # Counter exhausted: borrow the next millisecond
+                millis, counter = millis + 1, rand >> 53 & 0x7FF
+        else:
+            # Random start in the lower half leaves room to count up
+            counter = rand >> 53 & 0x7FF
+        _last_v7[:] = millis, counter
+    value = (
+        (millis & 0xFFFFFFFFFFFF) << 80  # 48-bit unix timestamp (ms)
+        | 0x7 << 76                      # version 7
+        | counter << 64                  # 12-bit counter
+        | 0b10 << 62                     # RFC 4122 variant
+        | rand & 0x3FFFFFFFFFFFFFFF      # 62 random bits
+    )
+    return str(uuid.UUID(int=value))
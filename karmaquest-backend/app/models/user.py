@@ -1,20 +1,39 @@
 
 from app import db
+from flask import current_app
 from datetime import datetime
-import uuid
+from argon2 import PasswordHasher
+from argon2.exceptions import VerificationError, InvalidHashError
+from sqlalchemy.orm import deferred, joinedload, raiseload
+from app.models.types import UUIDString, new_uuid
 import bcrypt
 
+# Hashes created before the switch to argon2 are bcrypt; they are upgraded on next successful login
+LEGACY_BCRYPT_PREFIXES = ('$2a$', '$2b$', '$2y$')
+
+_password_hashers = {}
+
+def _password_hasher(time_cost=None):
+    """Argon2 hasher built from app config, cached per parameter set"""
+    config = current_app.config
+    params = (time_cost or config['ARGON2_TIME_COST'], config['ARGON2_MEMORY_COST'], config['ARGON2_PARALLELISM'])
+    hasher = _password_hashers.get(params)
+    if hasher is None:
+        hasher = PasswordHasher(time_cost=params[0], memory_cost=params[1], parallelism=params[2])
+        _password_hashers[params] = hasher
+    return hasher
+
 class User(db.Model):
     __tablename__ = 'users'
     
-    user_id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    user_id = db.Column(UUIDString, primary_key=True, default=new_uuid)
     email = db.Column(db.String(255), unique=True, nullable=False, index=True)
     password_hash = db.Column(db.String(255), nullable=False)
     first_name = db.Column(db.String(100), nullable=False)
     last_name = db.Column(db.String(100), nullable=False)
     date_of_birth = db.Column(db.Date)
     gender = db.Column(db.String(20))
-    profile_picture_url = db.Column(db.Text)  # Changed to Text for base64 images
+    profile_picture_url = deferred(db.Column(db.String(500)))  # URL of the stored avatar file
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     is_active = db.Column(db.Boolean, default=True)
@@ -23,47 +42,147 @@ class User(db.Model):
     
     # Role-based fields
     role = db.Column(db.String(20), default='user', nullable=False)  # 'user', 'trainer', 'admin'
-    created_by = db.Column(db.String(36), db.ForeignKey('users.user_id'), nullable=True)
+    created_by = db.Column(UUIDString, db.ForeignKey('users.user_id'), nullable=True)
     trainer_specialization = db.Column(db.Text, nullable=True)
-    assigned_users = db.Column(db.JSON, default=list)
+    
+    # Admin listing filters by role and sorts by created_at; stats filter by role + created_at / is_active
+    __table_args__ = (
+        db.Index('ix_users_role_created', 'role', 'created_at'),
+        db.Index('ix_users_role_active', 'role', 'is_active'),
+    )
     
     # Relationships
-    profile = db.relationship('UserProfile', backref='user', uselist=False, cascade='all, delete-orphan')
-    sessions = db.relationship('WorkoutSession', backref='user', cascade='all, delete-orphan')
-    progress = db.relationship('UserProgress', backref='user', cascade='all, delete-orphan')
-    workout_plans = db.relationship('WeeklyWorkoutPlan', backref='user', cascade='all, delete-orphan', foreign_keys='WeeklyWorkoutPlan.user_id')
-    meal_plans = db.relationship('WeeklyMealPlan', backref='user', cascade='all, delete-orphan', foreign_keys='WeeklyMealPlan.user_id')
+    # Loader strategies are explicit; routes opt into eager loading per query.
+    # The reverse 'user' side on each child is raise_on_sql since nothing reads it.
+    profile = db.relationship('UserProfile', back_populates='user', uselist=False, cascade='all, delete-orphan', lazy='select')
+    sessions = db.relationship('WorkoutSession', back_populates='user', cascade='all, delete-orphan', lazy='select')
+    progress = db.relationship('UserProgress', back_populates='user', cascade='all, delete-orphan', lazy='select')
+    workout_plans = db.relationship('WeeklyWorkoutPlan', back_populates='user', cascade='all, delete-orphan', foreign_keys='WeeklyWorkoutPlan.user_id', lazy='select')
+    meal_plans = db.relationship('WeeklyMealPlan', back_populates='user', cascade='all, delete-orphan', foreign_keys='WeeklyMealPlan.user_id', lazy='select')
+    # Trainer -> client assignments; selectin because to_dict always serializes them
+    assignments = db.relationship('TrainerAssignment', back_populates='trainer', cascade='all, delete-orphan', foreign_keys='TrainerAssignment.trainer_id', lazy='selectin')
+    
+    @property
+    def assigned_users(self):
+        """IDs of the clients assigned to this trainer"""
+        return [a.user_id for a in self.assignments]
+    
+    @assigned_users.setter
+    def assigned_users(self, user_ids):
+        # dict.fromkeys drops duplicates while keeping order
+        self.assignments = [TrainerAssignment(user_id=uid) for uid in dict.fromkeys(user_ids or [])]
     
-    def set_password(self, password):
-        self.password_hash = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+    def set_password(self, password, time_cost=None):
+        """Hash with the configured argon2 cost; time_cost overrides it for low-risk flows"""
+        self.password_hash = _password_hasher(time_cost).hash(password)
     
     def check_password(self, password):
-        return bcrypt.checkpw(password.encode('utf-8'), self.password_hash.encode('utf-8'))
+        # Legacy bcrypt hash - verify with bcrypt and rehash with argon2 on success
+        if self.password_hash.startswith(LEGACY_BCRYPT_PREFIXES):
+            if not bcrypt.checkpw(password.encode('utf-8'), self.password_hash.encode('utf-8')):
+                return False
+            self.set_password(password)
+            return True
+        
+        hasher = _password_hasher()
+        try:
+            hasher.verify(self.password_hash, password)
+        except (VerificationError, InvalidHashError):
+            return False
+        
+        # Upgrade hashes created with older cost parameters
+        if hasher.check_needs_rehash(self.password_hash):
+            self.set_password(password)
+        return True
     
-    def to_dict(self):
-        return {
-            'user_id': self.user_id,
-            'email': self.email,
-            'first_name': self.first_name,
-            'last_name': self.last_name,
-            'date_of_birth': self.date_of_birth.isoformat() if self.date_of_birth else None,
-            'gender': self.gender,
-            'profile_picture_url': self.profile_picture_url,
-            'created_at': self.created_at.isoformat(),
-            'updated_at': self.updated_at.isoformat(),
-            'is_active': self.is_active,
-            'is_verified': self.is_verified,
-            'last_login': self.last_login.isoformat() if self.last_login else None,
-            'role': self.role,
-            'trainer_specialization': self.trainer_specialization,
-            'assigned_users': self.assigned_users or []
-        }
+    def to_dict(self, include_picture=True):
+        """Serialize the user; listings pass include_picture=False to avoid loading the deferred image"""
+        data = _user_payload(self, self.assigned_users)
+        if include_picture:
+            data['profile_picture_url'] = self.profile_picture_url
+        return data
+    
+    @classmethod
+    def get_with_profile(cls, user_id):
+        """
+        User and profile in one joined query. Other relationships raise instead of
+        lazy loading, so a stray access shows up as an error rather than an extra query.
+        """
+        return db.session.get(cls, user_id, options=[joinedload(cls.profile), raiseload('*')])
+    
+    @classmethod
+    def email_taken(cls, email):
+        """EXISTS lookup on the unique email index; no row is loaded"""
+        return db.session.query(cls.query.filter_by(email=email).exists()).scalar()
+    
+    @classmethod
+    def list_columns(cls):
+        """Columns needed to serialize users straight from result rows (no profile picture)"""
+        return (cls.user_id, cls.email, cls.first_name, cls.last_name, cls.date_of_birth, cls.gender,
+                cls.created_at, cls.updated_at, cls.is_active, cls.is_verified, cls.last_login,
+                cls.role, cls.trainer_specialization)
+    
+    @staticmethod
+    def rows_to_dicts(rows):
+        """
+        Batch-serialize rows selected with list_columns().
+        Skips ORM instance hydration for listings; trainer assignments for the
+        whole batch come from a single query.
+        """
+        trainer_ids = [row.user_id for row in rows if row.role == 'trainer']
+        assigned = {}
+        if trainer_ids:
+            for trainer_id, user_id in db.session.query(TrainerAssignment.trainer_id, TrainerAssignment.user_id).filter(
+                TrainerAssignment.trainer_id.in_(trainer_ids)
+            ):
+                assigned.setdefault(trainer_id, []).append(user_id)
+        return [_user_payload(row, assigned.get(row.user_id, [])) for row in rows]
+
+def _isoformat(value):
+    return value.isoformat() if value else None
+
+def _user_payload(user, assigned_users):
+    """Shared by User.to_dict and User.rows_to_dicts; user is an instance or a list_columns() row"""
+    return {
+        'user_id': user.user_id,
+        'email': user.email,
+        'first_name': user.first_name,
+        'last_name': user.last_name,
+        'date_of_birth': _isoformat(user.date_of_birth),
+        'gender': user.gender,
+        'created_at': _isoformat(user.created_at),
+        'updated_at': _isoformat(user.updated_at),
+        'is_active': user.is_active,
+        'is_verified': user.is_verified,
+        'last_login': _isoformat(user.last_login),
+        'role': user.role,
+        'trainer_specialization': user.trainer_specialization,
+        'assigned_users': assigned_users
+    }
+
+class TrainerAssignment(db.Model):
+    __tablename__ = 'trainer_assignments'
+    
+    trainer_id = db.Column(UUIDString, db.ForeignKey('users.user_id', ondelete='CASCADE'), primary_key=True)
+    user_id = db.Column(UUIDString, db.ForeignKey('users.user_id', ondelete='CASCADE'), primary_key=True)
+    
+    trainer = db.relationship('User', back_populates='assignments', foreign_keys=[trainer_id], lazy='raise_on_sql')
+    
+    # Reverse lookup: which trainer(s) a user is assigned to
+    __table_args__ = (
+        db.Index('ix_trainer_assignments_user_trainer', 'user_id', 'trainer_id'),
+    )
+    
+    @classmethod
+    def client_ids(cls, trainer_id):
+        """Ids of every client assigned to trainer_id; a range scan of the primary key"""
+        return frozenset(db.session.scalars(db.select(cls.user_id).filter_by(trainer_id=trainer_id)))
 
 class UserProfile(db.Model):
     __tablename__ = 'user_profiles'
     
-    profile_id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    user_id = db.Column(db.String(36), db.ForeignKey('users.user_id'), nullable=False)
+    profile_id = db.Column(UUIDString, primary_key=True, default=new_uuid)
+    user_id = db.Column(UUIDString, db.ForeignKey('users.user_id'), nullable=False, index=True)
     current_weight = db.Column(db.Float)
     height = db.Column(db.Float)
     target_weight = db.Column(db.Float)
@@ -72,6 +191,8 @@ class UserProfile(db.Model):
     medical_conditions = db.Column(db.JSON)
     preferences = db.Column(db.JSON)
     
+    user = db.relationship('User', back_populates='profile', lazy='raise_on_sql')
+    
     def to_dict(self):
         return {
             'profile_id': self.profile_id,
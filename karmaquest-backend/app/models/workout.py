@@ -1,13 +1,14 @@
 
 from app import db
 from datetime import datetime
-import uuid
+from app.models.types import UUIDString, new_uuid
+from app.models.mixins import RowSerializable
 
-class WorkoutSession(db.Model):
+class WorkoutSession(RowSerializable, db.Model):
     __tablename__ = 'workout_sessions'
     
-    session_id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    user_id = db.Column(db.String(36), db.ForeignKey('users.user_id'), nullable=False)
+    session_id = db.Column(UUIDString, primary_key=True, default=new_uuid)
+    user_id = db.Column(UUIDString, db.ForeignKey('users.user_id'), nullable=False)
     session_date = db.Column(db.DateTime, default=datetime.utcnow)
     duration_seconds = db.Column(db.Integer, default=0)
     total_exercises = db.Column(db.Integer, default=0)
@@ -18,36 +19,64 @@ class WorkoutSession(db.Model):
     workout_type = db.Column(db.String(50), default='General')  # General, AI-Video, Manual, etc.
     video_url = db.Column(db.String(500))  # Store AI analyzed video URL
     
+    # History, weekly/monthly ranges, streaks and the trainer views all filter by
+    # user and order/range by date. ORDER BY session_date DESC walks this index
+    # backwards, so no separate descending index is needed.
+    __table_args__ = (
+        db.Index('ix_workout_sessions_user_date', 'user_id', 'session_date'),
+    )
+    
     # Relationships
-    exercises = db.relationship('ExerciseLog', backref='session', cascade='all, delete-orphan')
+    exercises = db.relationship('ExerciseLog', back_populates='session', cascade='all, delete-orphan', lazy='selectin')
+    user = db.relationship('User', back_populates='sessions', lazy='raise_on_sql')
+    
+    @classmethod
+    def is_owned_by(cls, session_id, user_id):
+        """EXISTS ownership check; no session row (or its exercises) is loaded"""
+        return db.session.query(cls.query.filter_by(session_id=session_id, user_id=user_id).exists()).scalar()
     
     def to_dict(self):
-        # Get first exercise for AI workouts to show exercise type
-        first_exercise = None
-        if self.exercises and len(self.exercises) > 0:
-            first_exercise = self.exercises[0]
-        
-        return {
-            'session_id': self.session_id,
-            'user_id': self.user_id,
-            'session_date': self.session_date.isoformat(),
-            'duration_seconds': self.duration_seconds,
-            'total_exercises': self.total_exercises,
-            'total_reps': self.total_reps,
-            'total_calories': self.total_calories,
-            'avg_posture_score': self.avg_posture_score,
-            'session_notes': self.session_notes,
-            'workout_type': self.workout_type,
-            'video_url': self.video_url,
-            'primary_exercise': first_exercise.exercise_type if first_exercise else None,
-            'exercises': [ex.to_dict() for ex in self.exercises]
-        }
+        return _session_payload(self, [ex.to_dict() for ex in self.exercises])
+    
+    @classmethod
+    def rows_to_dicts(cls, rows):
+        """
+        Batch-serialize query_columns() rows. Exercise logs for the whole batch
+        come from a single column query instead of per-session relationship loads.
+        """
+        exercises = {row.session_id: [] for row in rows}
+        if exercises:
+            exercise_rows = ExerciseLog.query_columns().filter(ExerciseLog.session_id.in_(exercises))
+            for exercise in ExerciseLog.rows_to_dicts(exercise_rows):
+                exercises[exercise['session_id']].append(exercise)
+        return [_session_payload(row, exercises[row.session_id]) for row in rows]
+
+def _session_payload(session, exercises):
+    """Shared by WorkoutSession.to_dict and rows_to_dicts; session is an instance or a query_columns() row"""
+    # Get first exercise for AI workouts to show exercise type
+    first_exercise = exercises[0] if exercises else None
+    
+    return {
+        'session_id': session.session_id,
+        'user_id': session.user_id,
+        'session_date': session.session_date.isoformat(),
+        'duration_seconds': session.duration_seconds,
+        'total_exercises': session.total_exercises,
+        'total_reps': session.total_reps,
+        'total_calories': session.total_calories,
+        'avg_posture_score': session.avg_posture_score,
+        'session_notes': session.session_notes,
+        'workout_type': session.workout_type,
+        'video_url': session.video_url,
+        'primary_exercise': first_exercise['exercise_type'] if first_exercise else None,
+        'exercises': exercises
+    }
 
-class ExerciseLog(db.Model):
+class ExerciseLog(RowSerializable, db.Model):
     __tablename__ = 'exercise_logs'
     
-    log_id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    session_id = db.Column(db.String(36), db.ForeignKey('workout_sessions.session_id'), nullable=False)
+    log_id = db.Column(UUIDString, primary_key=True, default=new_uuid)
+    session_id = db.Column(UUIDString, db.ForeignKey('workout_sessions.session_id'), nullable=False, index=True)
     exercise_type = db.Column(db.String(50), nullable=False)  # squat, pushup, lunge, plank, deadlift
     sets = db.Column(db.Integer, default=1)  # Number of sets (calculated from reps, 10 reps = 1 set)
     correct_reps = db.Column(db.Integer, default=0)
@@ -58,6 +87,14 @@ class ExerciseLog(db.Model):
     calories_burned = db.Column(db.Float, default=0)
     posture_issues = db.Column(db.JSON)
     
+    # Per-exercise history filters on exercise_type and joins back to the user's
+    # sessions; session_id in the index keeps that join index-only
+    __table_args__ = (
+        db.Index('ix_exercise_logs_type_session', 'exercise_type', 'session_id'),
+    )
+    
+    session = db.relationship('WorkoutSession', back_populates='exercises', lazy='raise_on_sql')
+    
     def to_dict(self):
         return {
             'log_id': self.log_id,
@@ -2,15 +2,41 @@
 Admin routes for system management
 """
 
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.utils.decorators import admin_required
-from app.models.user import User, UserProfile
+from app.utils.tokens import revoke_user_tokens
+from app.utils.current_user import invalidate_assigned_clients
+from app.models.user import User, UserProfile, TrainerAssignment
 from app.models.workout import WorkoutSession
+from app.services.dynamic_plan_generator import DynamicPlanGenerator
 from app import db
+from sqlalchemy import func, case, delete, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import undefer
+import logging
+
+logger = logging.getLogger(__name__)
 
 bp = Blueprint('admin', __name__)
 
+# Most users one plan regeneration request may queue
+PLAN_REGENERATION_MAX_USERS = 1000
+
+# Dialect inserts that support ON CONFLICT DO NOTHING
+_UPSERT_INSERTS = {
+    'postgresql': postgresql.insert,
+    'sqlite': sqlite.insert
+}
+
+
+def _insert_ignoring_duplicates(model):
+    """INSERT that skips rows hitting the primary key, where the database supports it"""
+    dialect_insert = _UPSERT_INSERTS.get(db.session.get_bind().dialect.name)
+    if dialect_insert is None:
+        return insert(model)
+    return dialect_insert(model).on_conflict_do_nothing()
+
 
 @bp.route('/trainers', methods=['POST'])
 @jwt_required()
@@ -21,10 +47,10 @@ def create_trainer():
         data = request.get_json()
         admin_id = get_jwt_identity()
         
-        print(f"[Admin] Creating trainer account: {data.get('email')}")
+        logger.info("Creating trainer account: %s", data.get('email'))
         
         # Check if email already exists
-        if User.query.filter_by(email=data['email']).first():
+        if User.email_taken(data['email']):
             return jsonify({
                 'success': False, 
                 'error': 'Email already exists'
@@ -50,7 +76,7 @@ def create_trainer():
         
         db.session.commit()
         
-        print(f"[Admin] ✅ Trainer created: {trainer.user_id}")
+        logger.info("Trainer created: %s", trainer.user_id)
         return jsonify({
             'success': True, 
             'data': trainer.to_dict()
@@ -58,7 +84,7 @@ def create_trainer():
         
     except Exception as e:
         db.session.rollback()
-        print(f"[Admin] ❌ Error creating trainer: {str(e)}")
+        logger.error("Error creating trainer: %s", e)
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
@@ -89,15 +115,15 @@ def list_users():
                 )
             )
         
-        # Paginate results
-        pagination = query.order_by(User.created_at.desc()).paginate(
+        # Paginate plain column rows; listings don't need full ORM instances
+        pagination = query.with_entities(*User.list_columns()).order_by(User.created_at.desc()).paginate(
             page=page, per_page=per_page, error_out=False
         )
         
         return jsonify({
             'success': True,
             'data': {
-                'users': [u.to_dict() for u in pagination.items],
+                'users': User.rows_to_dicts(pagination.items),
                 'total': pagination.total,
                 'pages': pagination.pages,
                 'current_page': page
@@ -105,7 +131,7 @@ def list_users():
         })
         
     except Exception as e:
-        print(f"[Admin] ❌ Error listing users: {str(e)}")
+        logger.error("Error listing users: %s", e)
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
@@ -115,7 +141,7 @@ def list_users():
 def get_user(user_id):
     """Get detailed information about a specific user"""
     try:
-        user = User.query.get(user_id)
+        user = db.session.get(User, user_id, options=[undefer(User.profile_picture_url)])
         if not user:
             return jsonify({'success': False, 'error': 'User not found'}), 404
         
@@ -134,7 +160,7 @@ def get_user(user_id):
         })
         
     except Exception as e:
-        print(f"[Admin] ❌ Error getting user: {str(e)}")
+        logger.error("Error getting user: %s", e)
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
@@ -144,7 +170,7 @@ def get_user(user_id):
 def update_user(user_id):
     """Update user information"""
     try:
-        user = User.query.get(user_id)
+        user = db.session.get(User, user_id)
         if not user:
             return jsonify({'success': False, 'error': 'User not found'}), 404
         
@@ -152,8 +178,7 @@ def update_user(user_id):
         
         # Check if email is being changed and validate uniqueness
         if 'email' in data and data['email'] != user.email:
-            existing_user = User.query.filter_by(email=data['email']).first()
-            if existing_user:
+            if User.email_taken(data['email']):
                 return jsonify({
                     'success': False, 
                     'error': 'Email already exists'
@@ -161,18 +186,24 @@ def update_user(user_id):
         
         # Update allowed fields
         allowed_fields = ['first_name', 'last_name', 'email', 'is_active', 'role', 'trainer_specialization', 'assigned_users']
+        token_state = (user.role, user.email, user.is_active)
         for key, value in data.items():
             if key in allowed_fields and hasattr(user, key):
                 setattr(user, key, value)
         
         db.session.commit()
+        # Tokens carry role/email claims, so changing them (or deactivating) invalidates existing ones
+        if (user.role, user.email, user.is_active) != token_state:
+            revoke_user_tokens(user_id)
+        if 'assigned_users' in data:
+            invalidate_assigned_clients(user_id)
         
-        print(f"[Admin] ✅ User updated: {user_id}")
+        logger.info("User updated: %s", user_id)
         return jsonify({'success': True, 'data': user.to_dict()})
         
     except Exception as e:
         db.session.rollback()
-        print(f"[Admin] ❌ Error updating user: {str(e)}")
+        logger.error("Error updating user: %s", e)
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
@@ -182,7 +213,7 @@ def update_user(user_id):
 def delete_user(user_id):
     """Delete a user account"""
     try:
-        user = User.query.get(user_id)
+        user = db.session.get(User, user_id)
         if not user:
             return jsonify({'success': False, 'error': 'User not found'}), 404
         
@@ -196,8 +227,9 @@ def delete_user(user_id):
         email = user.email
         db.session.delete(user)
         db.session.commit()
+        revoke_user_tokens(user_id)
         
-        print(f"[Admin] ✅ User deleted: {email}")
+        logger.info("User deleted: %s", email)
         return jsonify({
             'success': True, 
             'message': f'User {email} deleted successfully'
@@ -205,7 +237,7 @@ def delete_user(user_id):
         
     except Exception as e:
         db.session.rollback()
-        print(f"[Admin] ❌ Error deleting user: {str(e)}")
+        logger.error("Error deleting user: %s", e)
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
@@ -215,32 +247,34 @@ def delete_user(user_id):
 def get_system_stats():
     """Get system statistics"""
     try:
-        total_users = User.query.filter_by(role='user').count()
-        total_trainers = User.query.filter_by(role='trainer').count()
-        total_workouts = WorkoutSession.query.count()
-        active_users = User.query.filter_by(role='user', is_active=True).count()
-        
         # Recent users (last 7 days)
         from datetime import datetime, timedelta
         week_ago = datetime.utcnow() - timedelta(days=7)
-        recent_users = User.query.filter(
-            User.created_at >= week_ago,
-            User.role == 'user'
-        ).count()
+        
+        # All user counts in a single pass over the users table
+        is_user = User.role == 'user'
+        user_counts = db.session.query(
+            func.count(case((is_user, 1))).label('total_users'),
+            func.count(case((User.role == 'trainer', 1))).label('total_trainers'),
+            func.count(case((is_user & User.is_active.is_(True), 1))).label('active_users'),
+            func.count(case((is_user & (User.created_at >= week_ago), 1))).label('recent_users')
+        ).one()
+        
+        total_workouts = db.session.query(func.count(WorkoutSession.session_id)).scalar()
         
         return jsonify({
             'success': True,
             'data': {
-                'total_users': total_users,
-                'total_trainers': total_trainers,
+                'total_users': user_counts.total_users,
+                'total_trainers': user_counts.total_trainers,
                 'total_workouts': total_workouts,
-                'active_users': active_users,
-                'new_users_this_week': recent_users
+                'active_users': user_counts.active_users,
+                'new_users_this_week': user_counts.recent_users
             }
         })
         
     except Exception as e:
-        print(f"[Admin] ❌ Error getting stats: {str(e)}")
+        logger.error("Error getting stats: %s", e)
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
@@ -250,25 +284,96 @@ def get_system_stats():
 def assign_users_to_trainer(trainer_id):
     """Assign users to a trainer"""
     try:
-        trainer = User.query.get(trainer_id)
+        trainer = db.session.get(User, trainer_id)
         if not trainer or trainer.role != 'trainer':
             return jsonify({'success': False, 'error': 'Trainer not found'}), 404
         
-        data = request.get_json()
-        user_ids = data.get('user_ids', [])
-        
-        # Update trainer's assigned users
-        trainer.assigned_users = user_ids
+        requested = (request.get_json(silent=True) or {}).get('user_ids', [])
+        if not isinstance(requested, list) or not all(isinstance(uid, str) for uid in requested):
+            return jsonify({'success': False, 'error': 'user_ids must be a list of user ids'}), 400
+        user_ids = list(dict.fromkeys(requested))
+        
+        # Only existing regular users can be clients; malformed ids bind as NULL and match nothing
+        clients = set(db.session.scalars(
+            select(User.user_id).where(User.user_id.in_(user_ids), User.role == 'user')
+        )) if user_ids else set()
+        unknown = [uid for uid in user_ids if uid not in clients]
+        if unknown:
+            return jsonify({'success': False, 'error': 'Unknown users or not regular users', 'user_ids': unknown}), 400
+        
+        # Replace trainer's assigned users: drop only the stale rows, then insert the
+        # new list in one statement, letting the primary key skip rows that already exist
+        db.session.execute(
+            delete(TrainerAssignment).where(
+                TrainerAssignment.trainer_id == trainer_id,
+                TrainerAssignment.user_id.notin_(user_ids)
+            )
+        )
+        if user_ids:
+            db.session.execute(
+                _insert_ignoring_duplicates(TrainerAssignment).values(
+                    [{'trainer_id': trainer_id, 'user_id': uid} for uid in user_ids]
+                )
+            )
         db.session.commit()
+        invalidate_assigned_clients(trainer_id)
         
-        print(f"[Admin] ✅ Assigned {len(user_ids)} users to trainer {trainer_id}")
+        logger.info("Assigned %s users to trainer %s", len(user_ids), trainer_id)
         return jsonify({
             'success': True,
             'message': f'Assigned {len(user_ids)} users to trainer',
             'data': trainer.to_dict()
         })
         
-    except Exception as e:
+    except Exception:
         db.session.rollback()
-        print(f"[Admin] ❌ Error assigning users: {str(e)}")
+        logger.exception("Error assigning users to trainer %s", trainer_id)
+        return jsonify({'success': False, 'error': 'Could not assign users'}), 500
+
+
+@bp.route('/plans/regenerate', methods=['POST'])
+@jwt_required()
+@admin_required()
+def regenerate_plans():
+    """
+    Regenerate dynamic workout/meal plans for many users in the background
+    
+    Request Body:
+        {"user_ids": ["...", ...]}
+    """
+    try:
+        user_ids = (request.get_json(silent=True) or {}).get('user_ids')
+        
+        if not isinstance(user_ids, list) or not user_ids:
+            return jsonify({'success': False, 'error': 'user_ids must be a non-empty list'}), 400
+        if len(user_ids) > PLAN_REGENERATION_MAX_USERS:
+            return jsonify({'success': False, 'error': f'At most {PLAN_REGENERATION_MAX_USERS} users per request'}), 400
+        
+        requested = list(dict.fromkeys(str(uid) for uid in user_ids))
+        known = set(db.session.scalars(select(User.user_id).where(User.user_id.in_(requested))))
+        
+        jobs = DynamicPlanGenerator.generate_plans_batch([uid for uid in requested if uid in known])
+        
+        logger.info("Queued plan regeneration for %s users", len(jobs))
+        return jsonify({
+            'success': True,
+            'data': {
+                'jobs': jobs,
+                'not_found': [uid for uid in requested if uid not in known]
+            }
+        }), 202
+    except Exception as e:
+        logger.error("Error queueing plan regeneration: %s", e)
         return jsonify({'success': False, 'error': str(e)}), 500
+
+
+@bp.route('/plans/jobs/<job_id>', methods=['GET'])
+@jwt_required()
+@admin_required()
+def get_plan_job_status(job_id):
+    """Status of any plan generation job, e.g. one queued by /plans/regenerate"""
+    job = current_app.extensions['plan_jobs'].get(job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': 'Job not found or expired'}), 404
+    
+    return jsonify({'success': True, **job}), 200
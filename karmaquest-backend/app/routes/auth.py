@@ -1,18 +1,43 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import create_access_token, create_refresh_token, jwt_required, get_jwt_identity
 from app import db
 from app.models import User, UserProfile
+from sqlalchemy.orm import selectinload, undefer
 from datetime import datetime
+import hashlib
+import hmac
+import logging
 import os
 
+logger = logging.getLogger(__name__)
+
 bp = Blueprint('auth', __name__)
 
+def _login_cache_key(email, password):
+    secret = current_app.secret_key.encode('utf-8')
+    return hmac.new(secret, f"{email}:{password}".encode('utf-8'), hashlib.sha256).digest()
+
+def _verify_password(user, password):
+    """Check the password, skipping the KDF when the same credentials were verified moments ago"""
+    login_cache = current_app.extensions['login_cache']
+    key = _login_cache_key(user.email, password)
+    
+    # Entry is bound to the current hash, so a password change invalidates it
+    if login_cache.get(key) == (user.user_id, user.password_hash):
+        return True
+    
+    if not user.check_password(password):
+        return False
+    
+    login_cache.set(key, (user.user_id, user.password_hash))
+    return True
+
 @bp.route('/register', methods=['POST'])
 def register():
     try:
         data = request.get_json()
         
-        if User.query.filter_by(email=data['email']).first():
+        if User.email_taken(data['email']):
             return jsonify({'success': False, 'error': 'Email already registered'}), 400
         
         user = User(
@@ -54,10 +79,11 @@ def login():
         email = data['email']
         password = data['password']
         
-        print(f"[Auth] Login attempt for: {email}")
+        logger.debug("Login attempt for: %s", email)
         
-        # Query user first
-        user = User.query.filter_by(email=email).first()
+        # Query user first (profile is returned in the response, so load it up front)
+        user = User.query.options(selectinload(User.profile), undefer(User.profile_picture_url))\
+            .filter_by(email=email).first()
         
         # If user doesn't exist, check if this is the admin email (create admin on first login)
         if not user:
@@ -65,14 +91,15 @@ def login():
             admin_password = os.getenv('ADMIN_PASSWORD', 'Admin@KarmaQuest2025!')
             
             if email == admin_email and password == admin_password:
-                print(f"[Auth] 🔑 Creating admin user on first login")
+                logger.info("Creating admin user on first login")
                 user = User(
                     email=email,
                     first_name='Admin',
                     last_name='User',
                     role='admin'
                 )
-                user.set_password(password)
+                # Credential comes from env vars, so a cheaper hash is fine; it's upgraded on next login
+                user.set_password(password, time_cost=current_app.config['ADMIN_ARGON2_TIME_COST'])
                 db.session.add(user)
                 db.session.flush()
                 
@@ -84,7 +111,7 @@ def login():
                 access_token = create_access_token(identity=user.user_id)
                 refresh_token = create_refresh_token(identity=user.user_id)
                 
-                print(f"[Auth] ✅ Admin created and logged in")
+                logger.info("Admin created and logged in")
                 return jsonify({
                     'success': True,
                     'data': {
@@ -95,12 +122,12 @@ def login():
                     }
                 }), 200
             else:
-                print(f"[Auth] ❌ User not found: {email}")
+                logger.warning("User not found: %s", email)
                 return jsonify({'success': False, 'error': 'Invalid credentials'}), 401
         
         # User exists - verify password
-        if not user.check_password(password):
-            print(f"[Auth] ❌ Invalid password for: {email}")
+        if not _verify_password(user, password):
+            logger.warning("Invalid password for: %s", email)
             return jsonify({'success': False, 'error': 'Invalid credentials'}), 401
         
         # Update last login
@@ -110,7 +137,7 @@ def login():
         access_token = create_access_token(identity=user.user_id)
         refresh_token = create_refresh_token(identity=user.user_id)
         
-        print(f"[Auth] ✅ Login successful for {user.role or 'user'}: {email}")
+        logger.info("Login successful for %s: %s", user.role or 'user', email)
         return jsonify({
             'success': True,
             'data': {
@@ -122,7 +149,7 @@ def login():
             }
         }), 200
     except Exception as e:
-        print(f"[Auth] ❌ Login error: {str(e)}")
+        logger.error("Login error: %s", e)
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @bp.route('/logout', methods=['POST'])
@@ -135,7 +162,13 @@ def logout():
 def refresh():
     current_user = get_jwt_identity()
     access_token = create_access_token(identity=current_user)
-    refresh_token = create_refresh_token(identity=current_user)
+    
+    # Refresh tokens are long-lived; unless rotation is enabled, hand the presented one
+    # back (clients store whatever comes back) instead of signing a new one
+    if current_app.config['JWT_ROTATE_REFRESH_TOKENS']:
+        refresh_token = create_refresh_token(identity=current_user)
+    else:
+        refresh_token = request.headers.get('Authorization', '').split(' ', 1)[-1]
     
     return jsonify({
         'success': True,
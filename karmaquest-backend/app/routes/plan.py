@@ -1,118 +1,170 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app import db
 from app.models.plan import WeeklyWorkoutPlan, WeeklyMealPlan
 from app.models.user import User
 from app.services.plan_generator import PlanGeneratorService
 from app.services.dynamic_plan_generator import DynamicPlanGenerator
+from app.utils.current_user import get_current_user
+from app.utils.cache import cached_per_user, invalidate_user_cache, CURRENT_WORKOUT_PLAN
 from datetime import datetime, timedelta
+import logging
+
+logger = logging.getLogger(__name__)
 
 bp = Blueprint('plan', __name__)
 
+def _wants_async():
+    """Clients opt into background generation with ?async=true or {"async": true}"""
+    body = request.get_json(silent=True) or {}
+    value = request.args.get('async') or body.get('async') or ''
+    return str(value).lower() in ('1', 'true', 'yes')
+
+
+def _generate_workout_plan(user_id):
+    """
+    Generate and save a new active workout plan for user_id
+    
+    Returns:
+        (payload, status_code) - also used as the result of background jobs
+    """
+    logger.debug("Generating plan for user: %s", user_id)
+    
+    user = User.get_with_profile(user_id)
+    
+    if not user:
+        logger.debug("User not found: %s", user_id)
+        return {'success': False, 'error': 'User not found'}, 404
+    
+    logger.debug("User found: %s", user.email)
+    
+    # Use a default profile object if user.profile doesn't exist
+    profile = user.profile
+    if not profile:
+        logger.debug("No profile found, creating default profile")
+        # Create a simple profile object with defaults
+        from types import SimpleNamespace
+        profile = SimpleNamespace(
+            user_id=user_id,
+            fitness_level='beginner',
+            fitness_goal='maintenance'
+        )
+    else:
+        logger.debug("Profile found: %s", profile)
+    
+    start_date = datetime.utcnow().date()
+    end_date = start_date + timedelta(days=6)
+    
+    logger.debug("Start date: %s, End date: %s", start_date, end_date)
+    
+    # Generate personalized plan using DynamicPlanGenerator
+    logger.debug("Generating DYNAMIC personalized plan based on workout history...")
+    
+    # Try to generate dynamic plan based on workout history
+    # (it deactivates the old plans and saves the new ones in a single commit)
+    result = DynamicPlanGenerator.generate_plans_from_workout(user_id)
+    
+    if result['success']:
+        logger.debug("Dynamic plans generated successfully!")
+        invalidate_user_cache(user_id, CURRENT_WORKOUT_PLAN)
+        workout_plan_obj = result['workout_plan']
+        
+        return {
+            'success': True,
+            'data': {'plan': workout_plan_obj.to_dict()},
+            'message': 'Personalized plan generated based on your workout history!'
+        }, 201
+    
+    # Fallback to static plan if no workout history
+    logger.debug("No workout history found, generating default plan...")
+    plan_data = PlanGeneratorService.generate_workout_plan(profile, start_date)
+    logger.debug("Default plan data generated: %s", plan_data is not None)
+    
+    # Create new plan
+    plan = WeeklyWorkoutPlan(
+        user_id=user_id,
+        start_date=start_date,
+        end_date=end_date,
+        plan_data=plan_data,
+        is_active=True
+    )
+    
+    logger.debug("Saving default plan to database...")
+    # Deactivate old plans in the same commit as the new one
+    WeeklyWorkoutPlan.deactivate_for(user_id)
+    db.session.add(plan)
+    db.session.commit()
+    invalidate_user_cache(user_id, CURRENT_WORKOUT_PLAN)
+    logger.debug("Default plan saved successfully")
+    
+    return {
+        'success': True,
+        'data': {'plan': plan.to_dict()},
+        'message': 'Complete a workout to get personalized plans!'
+    }, 201
+
+
+def _generate_workout_plan_job(user_id):
+    """Background job wrapper; the job result is the response payload"""
+    try:
+        payload, _ = _generate_workout_plan(user_id)
+        return payload
+    except Exception:
+        db.session.rollback()
+        raise
+
+
 @bp.route('/workout/generate', methods=['POST'])
 @jwt_required()
 def generate_workout_plan():
     try:
         user_id = get_jwt_identity()
-        print(f"[Plan] Generating plan for user: {user_id}")
-        
-        user = User.query.get(user_id)
-        
-        if not user:
-            print(f"[Plan] User not found: {user_id}")
-            return jsonify({'success': False, 'error': 'User not found'}), 404
-        
-        print(f"[Plan] User found: {user.email}")
-        
-        # Create a default profile object if user.profile doesn't exist
-        if not user.profile:
-            print(f"[Plan] No profile found, creating default profile")
-            # Create a simple profile object with defaults
-            from types import SimpleNamespace
-            user.profile = SimpleNamespace(
-                user_id=user_id,
-                fitness_level='beginner',
-                fitness_goal='maintenance'
-            )
-        else:
-            print(f"[Plan] Profile found: {user.profile}")
-        
-        # Get JSON data if available, but don't fail if not
-        data = {}
-        if request.is_json:
-            data = request.get_json() or {}
-        
-        start_date = datetime.utcnow().date()
-        end_date = start_date + timedelta(days=6)
         
-        print(f"[Plan] Start date: {start_date}, End date: {end_date}")
-        
-        # Deactivate old plans
-        old_plans_count = WeeklyWorkoutPlan.query.filter_by(user_id=user_id, is_active=True).count()
-        print(f"[Plan] Deactivating {old_plans_count} old plans")
-        WeeklyWorkoutPlan.query.filter_by(user_id=user_id, is_active=True).update({'is_active': False})
-        
-        # Generate personalized plan using DynamicPlanGenerator
-        print(f"[Plan] 🎯 Generating DYNAMIC personalized plan based on workout history...")
-        
-        # Try to generate dynamic plan based on workout history
-        result = DynamicPlanGenerator.generate_plans_from_workout(user_id)
-        
-        if result['success']:
-            print(f"[Plan] ✅ Dynamic plans generated successfully!")
-            workout_plan_obj = result['workout_plan']
-            
-            return jsonify({
-                'success': True,
-                'data': {'plan': workout_plan_obj.to_dict()},
-                'message': 'Personalized plan generated based on your workout history!'
-            }), 201
-        else:
-            # Fallback to static plan if no workout history
-            print(f"[Plan] ⚠️ No workout history found, generating default plan...")
-            plan_data = PlanGeneratorService.generate_workout_plan(user.profile, start_date)
-            print(f"[Plan] Default plan data generated: {plan_data is not None}")
-            
-            # Create new plan
-            plan = WeeklyWorkoutPlan(
-                user_id=user_id,
-                start_date=start_date,
-                end_date=end_date,
-                plan_data=plan_data,
-                is_active=True
-            )
-            
-            print(f"[Plan] Saving default plan to database...")
-            db.session.add(plan)
-            db.session.commit()
-            print(f"[Plan] ✅ Default plan saved successfully")
-            
+        # Background mode: return a job id to poll at /workout/status/<job_id>
+        if _wants_async():
+            job_id = current_app.extensions['plan_jobs'].submit(_generate_workout_plan_job, user_id, owner=user_id)
             return jsonify({
                 'success': True,
-                'data': {'plan': plan.to_dict()},
-                'message': 'Complete a workout to get personalized plans!'
-            }), 201
+                'job_id': job_id,
+                'status': 'queued',
+                'status_url': f'/api/plans/workout/status/{job_id}'
+            }), 202
+        
+        payload, status_code = _generate_workout_plan(user_id)
+        return jsonify(payload), status_code
     except Exception as e:
         db.session.rollback()
-        print(f"[Plan] ❌ Error generating plan: {str(e)}")
-        import traceback
-        print(f"[Plan] Traceback: {traceback.format_exc()}")
+        logger.exception("Error generating plan: %s", e)
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@bp.route('/workout/status/<job_id>', methods=['GET'])
+@jwt_required()
+def get_workout_plan_job_status(job_id):
+    """Status of a background plan generation job started by the current user"""
+    job = current_app.extensions['plan_jobs'].get(job_id, owner=get_jwt_identity())
+    if job is None:
+        return jsonify({'success': False, 'error': 'Job not found or expired'}), 404
+    
+    return jsonify({'success': True, **job}), 200
+
 @bp.route('/workout/current', methods=['GET'])
 @jwt_required()
+@cached_per_user(CURRENT_WORKOUT_PLAN)
 def get_current_workout_plan():
     try:
         user_id = get_jwt_identity()
         
-        plan = WeeklyWorkoutPlan.query.filter_by(user_id=user_id, is_active=True).first()
+        # Row-based read: no ORM object or identity-map bookkeeping for a read-only response
+        row = WeeklyWorkoutPlan.query_columns()\
+            .filter(WeeklyWorkoutPlan.user_id == user_id, WeeklyWorkoutPlan.is_active.is_(True))\
+            .first()
         
-        if not plan:
+        if not row:
             return jsonify({'success': False, 'error': 'No active workout plan found'}), 404
         
         return jsonify({
             'success': True,
-            'data': {'plan': plan.to_dict()}
+            'data': {'plan': WeeklyWorkoutPlan.rows_to_dicts([row])[0]}
         }), 200
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -123,14 +175,15 @@ def get_workout_plan_history():
     try:
         user_id = get_jwt_identity()
         
-        plans = WeeklyWorkoutPlan.query.filter_by(user_id=user_id)\
+        rows = WeeklyWorkoutPlan.query_columns()\
+            .filter(WeeklyWorkoutPlan.user_id == user_id)\
             .order_by(WeeklyWorkoutPlan.created_at.desc())\
             .limit(10)\
             .all()
         
         return jsonify({
             'success': True,
-            'data': {'plans': [p.to_dict() for p in plans]}
+            'data': {'plans': WeeklyWorkoutPlan.rows_to_dicts(rows)}
         }), 200
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -140,7 +193,7 @@ def get_workout_plan_history():
 def regenerate_workout_plan(plan_id):
     try:
         user_id = get_jwt_identity()
-        user = User.query.get(user_id)
+        user = get_current_user()
         
         if not user or not user.profile:
             return jsonify({'success': False, 'error': 'User profile not found'}), 404
@@ -155,6 +208,7 @@ def regenerate_workout_plan(plan_id):
         
         old_plan.plan_data = plan_data
         db.session.commit()
+        invalidate_user_cache(user_id, CURRENT_WORKOUT_PLAN)
         
         return jsonify({
             'success': True,
@@ -169,7 +223,7 @@ def regenerate_workout_plan(plan_id):
 def generate_meal_plan():
     try:
         user_id = get_jwt_identity()
-        user = User.query.get(user_id)
+        user = get_current_user()
         
         if not user or not user.profile:
             return jsonify({'success': False, 'error': 'User profile not found'}), 404
@@ -179,7 +233,7 @@ def generate_meal_plan():
         end_date = start_date + timedelta(days=6)
         
         # Deactivate old plans
-        WeeklyMealPlan.query.filter_by(user_id=user_id, is_active=True).update({'is_active': False})
+        WeeklyMealPlan.deactivate_for(user_id)
         
         # Generate plan data
         plan_data, daily_calories = PlanGeneratorService.generate_meal_plan(user.profile, start_date)
@@ -212,14 +266,17 @@ def get_current_meal_plan():
     try:
         user_id = get_jwt_identity()
         
-        plan = WeeklyMealPlan.query.filter_by(user_id=user_id, is_active=True).first()
+        # Row-based read: no ORM object or identity-map bookkeeping for a read-only response
+        row = WeeklyMealPlan.query_columns()\
+            .filter(WeeklyMealPlan.user_id == user_id, WeeklyMealPlan.is_active.is_(True))\
+            .first()
         
-        if not plan:
+        if not row:
             return jsonify({'success': False, 'error': 'No active meal plan found'}), 404
         
         return jsonify({
             'success': True,
-            'data': {'plan': plan.to_dict()}
+            'data': {'plan': WeeklyMealPlan.rows_to_dicts([row])[0]}
         }), 200
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -230,14 +287,15 @@ def get_meal_plan_history():
     try:
         user_id = get_jwt_identity()
         
-        plans = WeeklyMealPlan.query.filter_by(user_id=user_id)\
+        rows = WeeklyMealPlan.query_columns()\
+            .filter(WeeklyMealPlan.user_id == user_id)\
             .order_by(WeeklyMealPlan.created_at.desc())\
             .limit(10)\
             .all()
         
         return jsonify({
             'success': True,
-            'data': {'plans': [p.to_dict() for p in plans]}
+            'data': {'plans': WeeklyMealPlan.rows_to_dicts(rows)}
         }), 200
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -3,18 +3,63 @@ Real-Time Pose Detection API Routes
 Handles camera frame uploads and video processing
 """
 
-from flask import Blueprint, request, jsonify, send_file
-from app.services.pose_detection_service import get_pose_service
-from app.services.video_pose_processor import get_video_processor
+from flask import Blueprint, request, jsonify, send_file, current_app
 from app.services.rep_counter import get_supported_exercises
+from app.services.video_jobs import VIDEO_OUTPUT_DIR, new_output_path, new_upload_file, process_video_file
+from app.utils.concurrency import ServerBusy, pose_slot
+from werkzeug.exceptions import RequestEntityTooLarge
 import logging
-import tempfile
+import shutil
 import os
 
 logger = logging.getLogger(__name__)
 
 bp = Blueprint('pose', __name__)
 
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+# The pose service pulls in TensorFlow/OpenCV, so it is imported on first use
+# rather than when the app (or a test fixture) is created
+
+def get_pose_service():
+    from app.services.pose_detection_service import get_pose_service as _get_pose_service
+    return _get_pose_service()
+
+
+def _wants_async():
+    """Clients opt into background processing with async=true (form field or query string)"""
+    value = request.form.get('async') or request.args.get('async') or ''
+    return value.lower() in ('1', 'true', 'yes')
+
+
+def _frame_from_request():
+    """
+    Image and accompanying fields for /detect and /analyze-frame.
+    Prefers a raw multipart upload (field 'frame'), which skips base64 entirely;
+    falls back to the JSON body's base64 'image'.
+    
+    Returns:
+        (image, fields) - image is bytes or a base64 string, None if missing
+    """
+    frame = request.files.get('frame')
+    if frame is not None:
+        return frame.read() or None, request.form
+    
+    data = request.get_json(silent=True) or {}
+    return data.get('image'), data
+
+
+def _busy_response(error):
+    """503 with Retry-After when every pose inference slot stayed taken"""
+    logger.warning("Pose inference slots exhausted")
+    response = jsonify({
+        'success': False,
+        'error': str(error)
+    })
+    response.headers['Retry-After'] = '1'
+    return response, 503
+
 
 @bp.route('/detect', methods=['POST'])
 def detect_pose():
@@ -26,6 +71,7 @@ def detect_pose():
             "image": "base64_encoded_image_string",
             "session_id": "optional_session_id"
         }
+        or multipart/form-data with the JPEG/PNG in field 'frame'
     
     Response:
         {
@@ -36,9 +82,9 @@ def detect_pose():
         }
     """
     try:
-        data = request.get_json()
+        image, _ = _frame_from_request()
         
-        if not data or 'image' not in data:
+        if not image:
             return jsonify({
                 'success': False,
                 'error': 'Missing image data'
@@ -48,13 +94,17 @@ def detect_pose():
         pose_service = get_pose_service()
         
         # Detect pose
-        result = pose_service.detect_pose(data['image'])
+        with pose_slot():
+            result = pose_service.detect_pose(image)
         
         if not result['success']:
             return jsonify(result), 500
         
         return jsonify(result), 200
     
+    except ServerBusy as e:
+        return _busy_response(e)
+    
     except Exception as e:
         logger.error(f"Error in pose detection endpoint: {e}")
         return jsonify({
@@ -74,6 +124,7 @@ def analyze_frame():
             "exercise_type": "squat" | "pushup" | "lunge",
             "session_id": "optional_session_id"
         }
+        or multipart/form-data with the JPEG/PNG in field 'frame' (other fields as form fields)
     
     Response:
         {
@@ -89,25 +140,26 @@ def analyze_frame():
     """
     try:
         logger.info("=== Frame Analysis Request ===")
-        data = request.get_json()
+        image, fields = _frame_from_request()
         
-        if not data or 'image' not in data:
+        if not image:
             logger.error("Missing image data in request")
             return jsonify({
                 'success': False,
                 'error': 'Missing image data'
             }), 400
         
-        exercise_type = data.get('exercise_type', 'squat')
+        exercise_type = fields.get('exercise_type', 'squat')
         logger.info(f"Exercise type: {exercise_type}")
-        logger.info(f"Image data length: {len(data['image'])} chars")
+        logger.info(f"Image data length: {len(image)} {'bytes' if isinstance(image, bytes) else 'chars'}")
         
         # Get pose detection service
         pose_service = get_pose_service()
         
         # Detect pose and analyze form
         logger.info("Calling pose detection service...")
-        result = pose_service.detect_pose(data['image'])
+        with pose_slot():
+            result = pose_service.detect_pose(image)
         
         if not result['success']:
             logger.error(f"Pose detection failed: {result.get('error')}")
@@ -119,6 +171,9 @@ def analyze_frame():
         logger.info(f"✓ Success! Returning {len(result.get('keypoints', []))} keypoints")
         return jsonify(result), 200
     
+    except ServerBusy as e:
+        return _busy_response(e)
+    
     except Exception as e:
         logger.error(f"Exception in frame analysis endpoint: {e}", exc_info=True)
         return jsonify({
@@ -218,9 +273,11 @@ def process_video():
         - Multipart form data with video file
         - Field name: 'video'
         - Optional field: 'exercise_type' (squats, pushups, bicep_curls, shoulder_press, lunges)
+        - Optional field: 'async' - 'true' to process in the background
     
     Response:
         - JSON with download URL for processed video and rep count
+        - With async: 202 with job_id; poll /api/pose/status/<job_id> for the same payload
     """
     try:
         logger.info("=== Video Processing Request ===")
@@ -249,58 +306,51 @@ def process_video():
         logger.info(f"Content type: {video_file.content_type}")
         logger.info(f"Exercise type: {exercise_type}")
         
-        # Save uploaded video to temporary file
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.mp4') as tmp_input:
-            video_file.save(tmp_input.name)
-            input_path = tmp_input.name
-            logger.info(f"Saved to temp file: {input_path}")
-        
-        # Create output path in a persistent temp directory
-        import time
-        output_filename = f"processed_{int(time.time() * 1000)}.mp4"
-        output_dir = os.path.join(tempfile.gettempdir(), 'karmaquest_videos')
-        os.makedirs(output_dir, exist_ok=True)
-        output_path = os.path.join(output_dir, output_filename)
+        # Save uploaded video to temporary file, copying in 1 MB chunks
+        fd, input_path = new_upload_file()
+        try:
+            with os.fdopen(fd, 'wb') as tmp_input:
+                shutil.copyfileobj(video_file.stream, tmp_input, UPLOAD_CHUNK_SIZE)
+        except Exception:
+            os.unlink(input_path)
+            raise
+        logger.info(f"Saved to temp file: {input_path}")
+        
+        output_path = new_output_path()
+        
+        # Background mode: queue the job and let the client poll /status/<job_id>
+        if _wants_async():
+            job_id = current_app.extensions['video_jobs'].submit(process_video_file, input_path, output_path, exercise_type)
+            return jsonify({
+                'success': True,
+                'job_id': job_id,
+                'status': 'queued',
+                'status_url': f'/api/pose/status/{job_id}'
+            }), 202
         
         # Process video
         logger.info("Starting video processing...")
-        video_processor = get_video_processor()
-        result = video_processor.process_video(input_path, output_path, exercise_type=exercise_type)
-        
-        # Clean up input file
-        os.unlink(input_path)
+        try:
+            with pose_slot():
+                result = process_video_file(input_path, output_path, exercise_type)
+        except ServerBusy:
+            os.unlink(input_path)
+            raise
         
         if not result['success']:
-            logger.error(f"Processing failed: {result.get('error')}")
             return jsonify(result), 500
         
-        # Get the actual output filename (might be compressed with different name)
-        actual_output_path = result['output_path']
-        actual_filename = os.path.basename(actual_output_path)
-        
-        logger.info(f"✓ Processing complete!")
-        logger.info(f"  - Frames: {result['frame_count']}")
-        logger.info(f"  - Duration: {result['duration']:.2f}s")
-        logger.info(f"  - Exercise: {result['exercise_type']}")
-        logger.info(f"  - Total Reps: {result['total_reps']}")
-        logger.info(f"  - Form Score: {result['form_score']}/100 ({result['form_quality']})")
-        logger.info(f"  - Output: {actual_output_path}")
-        logger.info(f"  - Filename: {actual_filename}")
-        
-        # Return JSON with download URL using actual filename and form analysis
+        return jsonify(result), 200
+    
+    except RequestEntityTooLarge:
+        max_mb = current_app.config['MAX_CONTENT_LENGTH'] // (1024 * 1024)
         return jsonify({
-            'success': True,
-            'download_url': f'/api/pose/download/{actual_filename}',
-            'frame_count': result['frame_count'],
-            'duration': result['duration'],
-            'exercise_type': result['exercise_type'],
-            'total_reps': result['total_reps'],
-            'rep_timestamps': result['rep_timestamps'],
-            'form_score': result['form_score'],
-            'form_quality': result['form_quality'],
-            'form_feedback': result['form_feedback'],
-            'rep_scores': result['rep_scores']
-        }), 200
+            'success': False,
+            'error': f'Video too large (max {max_mb} MB)'
+        }), 413
+    
+    except ServerBusy as e:
+        return _busy_response(e)
     
     except Exception as e:
         logger.error(f"Exception in video processing: {e}", exc_info=True)
@@ -310,40 +360,59 @@ def process_video():
         }), 500
 
 
+@bp.route('/status/<job_id>', methods=['GET'])
+def get_video_job_status(job_id):
+    """
+    Status of a background video job
+    
+    Response:
+        {
+            "success": true,
+            "job_id": "...",
+            "status": "queued" | "processing" | "completed" | "failed",
+            "result": {...}  # /process-video payload once finished
+        }
+    """
+    job = current_app.extensions['video_jobs'].get(job_id)
+    if job is None:
+        return jsonify({
+            'success': False,
+            'error': 'Job not found or expired'
+        }), 404
+    
+    return jsonify({'success': True, **job}), 200
+
+
 @bp.route('/download/<filename>', methods=['GET'])
 def download_processed_video(filename):
     """
     Download a processed video file
-    Stream it efficiently to client
+    Supports Range requests so players can seek without re-downloading;
+    with USE_X_SENDFILE the front-end server streams the file itself
     
     Response:
         - Processed video file (streamed)
     """
     try:
-        output_dir = os.path.join(tempfile.gettempdir(), 'karmaquest_videos')
-        file_path = os.path.join(output_dir, filename)
-        
-        print(f"[Video] Attempting to download: {file_path}")
-        print(f"[Video] File exists: {os.path.exists(file_path)}")
+        # basename keeps requests inside the output directory
+        file_path = os.path.join(VIDEO_OUTPUT_DIR, os.path.basename(filename))
         
-        if not os.path.exists(file_path):
-            print(f"[Video] ❌ File not found: {filename}")
-            print(f"[Video] Directory contents: {os.listdir(output_dir) if os.path.exists(output_dir) else 'Directory does not exist'}")
+        if not os.path.isfile(file_path):
+            logger.warning(f"Processed video not found: {filename}")
             return jsonify({
                 'success': False,
                 'error': 'Video file not found. The video may have been cleaned up or expired.',
                 'message': 'Processed videos are temporarily stored and automatically cleaned up after some time.'
             }), 404
         
-        # Don't clean up when downloading - videos should persist
-        # _cleanup_old_videos(output_dir, max_age_hours=1)
-        
-        print(f"[Video] ✅ Streaming video: {filename}")
+        # Filenames are timestamped and never rewritten, so clients may cache them
         return send_file(
             file_path,
             mimetype='video/mp4',
             as_attachment=False,  # Stream instead of download
-            download_name=filename
+            download_name=filename,
+            conditional=True,
+            max_age=current_app.config['VIDEO_CACHE_MAX_AGE']
         )
     
     except Exception as e:
@@ -353,31 +422,3 @@ def download_processed_video(filename):
             'error': str(e)
         }), 500
 
-
-def _cleanup_old_videos(directory, max_age_hours=1):
-    """
-    Delete video files older than max_age_hours
-    Prevents disk space buildup
-    """
-    try:
-        import time
-        current_time = time.time()
-        max_age_seconds = max_age_hours * 3600
-        
-        if not os.path.exists(directory):
-            return
-        
-        deleted_count = 0
-        for filename in os.listdir(directory):
-            file_path = os.path.join(directory, filename)
-            if os.path.isfile(file_path):
-                file_age = current_time - os.path.getmtime(file_path)
-                if file_age > max_age_seconds:
-                    os.unlink(file_path)
-                    deleted_count += 1
-        
-        if deleted_count > 0:
-            logger.info(f"🗑️ Cleaned up {deleted_count} old video files")
-                    
-    except Exception as e:
-        logger.error(f"Error cleaning up old videos: {e}")
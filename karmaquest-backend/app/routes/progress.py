@@ -3,58 +3,109 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 from app import db
 from app.models.progress import UserProgress
 from app.models.workout import WorkoutSession
-from app.models.user import User
-from datetime import datetime, timedelta
-from sqlalchemy import func
+from app.models.user import UserProfile
+from datetime import date, datetime, time, timedelta
+from sqlalchemy import exists, func, select, type_coerce
+from app.utils.cache import cached_per_user, invalidate_user_cache, PROGRESS_SUMMARY, PROGRESS_ACHIEVEMENTS
 
 bp = Blueprint('progress', __name__)
 
+# (name, icon, metric, threshold) - unlocked once the user's total for metric reaches threshold
+ACHIEVEMENTS = [
+    ('First Workout', '🎯', 'workouts', 1),
+    ('10 Workouts', '💪', 'workouts', 10),
+    ('50 Workouts', '🏆', 'workouts', 50),
+    ('100 Reps', '🔥', 'reps', 100),
+    ('1000 Reps', '⭐', 'reps', 1000)
+]
+
+# Largest batch accepted by /weight/bulk
+BULK_WEIGHT_MAX_ENTRIES = 500
+
+# Days of history read per round trip while walking back through a streak;
+# almost every streak ends inside the first window
+STREAK_WINDOW_DAYS = 60
+
+
+def _current_streak(user_id, today):
+    """
+    Consecutive workout days ending today or yesterday.
+    Reads distinct session days newest-first, one date window at a time (a range
+    scan on the user/date index), and stops at the first gap.
+    """
+    day = type_coerce(func.date(WorkoutSession.session_date), db.Date).label('day')
+    
+    streak = 0
+    expected = None
+    window_end = today + timedelta(days=1)
+    while True:
+        window_start = window_end - timedelta(days=STREAK_WINDOW_DAYS)
+        days = db.session.query(day).filter(
+            WorkoutSession.user_id == user_id,
+            WorkoutSession.session_date >= datetime.combine(window_start, time.min),
+            WorkoutSession.session_date < datetime.combine(window_end, time.min)
+        ).distinct().order_by(day.desc())
+        
+        for (workout_day,) in days:
+            if expected is None:
+                if (today - workout_day).days > 1:
+                    return 0
+            elif workout_day != expected:
+                return streak
+            streak += 1
+            expected = workout_day - timedelta(days=1)
+        
+        # Only a streak that reaches back to the window's first day can continue past it
+        if expected != window_start - timedelta(days=1):
+            return streak
+        window_end = window_start
+
+def _summary_statement(user_id):
+    """
+    Single-row SELECT for /summary: session totals from one aggregate subquery,
+    plus profile existence and first/latest weigh-in as scalar subqueries
+    """
+    sessions = select(
+        func.count(WorkoutSession.session_id).label('total_workouts'),
+        func.sum(WorkoutSession.total_calories).label('total_calories'),
+        func.avg(WorkoutSession.avg_posture_score).label('avg_score'),
+        func.sum(WorkoutSession.total_reps).label('total_reps')
+    ).where(WorkoutSession.user_id == user_id).subquery()
+    
+    weigh_ins = select(UserProgress.weight).where(
+        UserProgress.user_id == user_id,
+        UserProgress.weight.isnot(None)
+    )
+    
+    return select(
+        sessions,
+        exists().where(UserProfile.user_id == user_id).label('has_profile'),
+        select(func.count()).select_from(weigh_ins.subquery()).scalar_subquery().label('weigh_ins'),
+        weigh_ins.order_by(UserProgress.date).limit(1).scalar_subquery().label('first_weight'),
+        weigh_ins.order_by(UserProgress.date.desc()).limit(1).scalar_subquery().label('latest_weight')
+    )
+
 @bp.route('/summary', methods=['GET'])
 @jwt_required()
+@cached_per_user(PROGRESS_SUMMARY)
 def get_summary():
     try:
         user_id = get_jwt_identity()
         
-        # Get total workouts
-        total_workouts = WorkoutSession.query.filter_by(user_id=user_id).count()
-        
-        # Get total calories
-        total_calories = db.session.query(func.sum(WorkoutSession.total_calories))\
-            .filter_by(user_id=user_id).scalar() or 0
-        
-        # Get average posture score
-        avg_score = db.session.query(func.avg(WorkoutSession.avg_posture_score))\
-            .filter_by(user_id=user_id).scalar() or 0
-        
-        # Get total reps
-        total_reps = db.session.query(func.sum(WorkoutSession.total_reps))\
-            .filter_by(user_id=user_id).scalar() or 0
+        # Session aggregates and weigh-in figures in one round trip
+        row = db.session.execute(_summary_statement(user_id)).one()
+        total_calories = row.total_calories or 0
+        avg_score = row.avg_score or 0
+        total_reps = row.total_reps or 0
+        total_workouts = row.total_workouts
         
         # Calculate current streak
-        sessions = WorkoutSession.query.filter_by(user_id=user_id)\
-            .order_by(WorkoutSession.session_date.desc()).all()
-        
-        current_streak = 0
-        if sessions:
-            last_date = sessions[0].session_date.date()
-            if (datetime.utcnow().date() - last_date).days <= 1:
-                current_streak = 1
-                for i in range(1, len(sessions)):
-                    diff = (sessions[i-1].session_date.date() - sessions[i].session_date.date()).days
-                    if diff <= 1:
-                        if diff == 1:
-                            current_streak += 1
-                    else:
-                        break
-        
-        # Get weight change
-        user = User.query.get(user_id)
+        current_streak = _current_streak(user_id, datetime.utcnow().date())
+        
+        # Get weight change (first vs latest weigh-in) for users with a profile
         weight_change = None
-        if user and user.profile:
-            progress_entries = UserProgress.query.filter_by(user_id=user_id)\
-                .order_by(UserProgress.date).all()
-            if progress_entries and len(progress_entries) >= 2:
-                weight_change = progress_entries[-1].weight - progress_entries[0].weight
+        if row.has_profile and row.weigh_ins >= 2:
+            weight_change = row.latest_weight - row.first_weight
         
         return jsonify({
             'success': True,
@@ -77,14 +128,15 @@ def get_weekly():
         user_id = get_jwt_identity()
         week_ago = datetime.utcnow() - timedelta(days=7)
         
-        sessions = WorkoutSession.query.filter_by(user_id=user_id)\
+        rows = WorkoutSession.query_columns()\
+            .filter(WorkoutSession.user_id == user_id)\
             .filter(WorkoutSession.session_date >= week_ago)\
             .order_by(WorkoutSession.session_date)\
             .all()
         
         return jsonify({
             'success': True,
-            'data': {'sessions': [s.to_dict() for s in sessions]}
+            'data': {'sessions': WorkoutSession.rows_to_dicts(rows)}
         }), 200
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -96,14 +148,15 @@ def get_monthly():
         user_id = get_jwt_identity()
         month_ago = datetime.utcnow() - timedelta(days=30)
         
-        sessions = WorkoutSession.query.filter_by(user_id=user_id)\
+        rows = WorkoutSession.query_columns()\
+            .filter(WorkoutSession.user_id == user_id)\
             .filter(WorkoutSession.session_date >= month_ago)\
             .order_by(WorkoutSession.session_date)\
             .all()
         
         return jsonify({
             'success': True,
-            'data': {'sessions': [s.to_dict() for s in sessions]}
+            'data': {'sessions': WorkoutSession.rows_to_dicts(rows)}
         }), 200
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -123,6 +176,7 @@ def log_weight():
         
         db.session.add(progress)
         db.session.commit()
+        invalidate_user_cache(user_id, PROGRESS_SUMMARY)
         
         return jsonify({
             'success': True,
@@ -132,21 +186,65 @@ def log_weight():
         db.session.rollback()
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@bp.route('/weight/bulk', methods=['POST'])
+@jwt_required()
+def log_weight_bulk():
+    """
+    Log several weigh-ins (e.g. backfilled offline entries) in one transaction
+    
+    Request Body:
+        {"entries": [{"weight": 80.5, "date": "2025-01-31"}, ...]}  # date optional, defaults to today
+    """
+    try:
+        user_id = get_jwt_identity()
+        entries = (request.get_json(silent=True) or {}).get('entries')
+        
+        if not isinstance(entries, list) or not entries:
+            return jsonify({'success': False, 'error': 'entries must be a non-empty list'}), 400
+        if len(entries) > BULK_WEIGHT_MAX_ENTRIES:
+            return jsonify({'success': False, 'error': f'At most {BULK_WEIGHT_MAX_ENTRIES} entries per request'}), 400
+        
+        today = datetime.utcnow().date()
+        try:
+            rows = [
+                UserProgress(
+                    user_id=user_id,
+                    weight=float(entry['weight']),
+                    date=date.fromisoformat(entry['date']) if entry.get('date') else today
+                )
+                for entry in entries
+            ]
+        except (KeyError, TypeError, ValueError):
+            return jsonify({'success': False, 'error': 'Each entry needs a numeric weight and an optional YYYY-MM-DD date'}), 400
+        
+        # One flush (batched INSERT) and one commit for the whole batch
+        db.session.add_all(rows)
+        db.session.commit()
+        invalidate_user_cache(user_id, PROGRESS_SUMMARY)
+        
+        return jsonify({
+            'success': True,
+            'data': {'progress': [row.to_dict() for row in rows]}
+        }), 201
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 500
+
 @bp.route('/weight/history', methods=['GET'])
 @jwt_required()
 def get_weight_history():
     try:
         user_id = get_jwt_identity()
         
-        progress = UserProgress.query.filter_by(user_id=user_id)\
-            .filter(UserProgress.weight.isnot(None))\
+        rows = UserProgress.query_columns()\
+            .filter(UserProgress.user_id == user_id, UserProgress.weight.isnot(None))\
             .order_by(UserProgress.date.desc())\
             .limit(50)\
             .all()
         
         return jsonify({
             'success': True,
-            'data': {'progress': [p.to_dict() for p in progress]}
+            'data': {'progress': UserProgress.rows_to_dicts(rows)}
         }), 200
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -177,27 +275,23 @@ def log_measurements():
 
 @bp.route('/achievements', methods=['GET'])
 @jwt_required()
+@cached_per_user(PROGRESS_ACHIEVEMENTS)
 def get_achievements():
     try:
         user_id = get_jwt_identity()
         
-        # Calculate achievements
-        total_workouts = WorkoutSession.query.filter_by(user_id=user_id).count()
-        total_reps = db.session.query(func.sum(WorkoutSession.total_reps))\
-            .filter_by(user_id=user_id).scalar() or 0
-        
-        achievements = []
-        
-        if total_workouts >= 1:
-            achievements.append({'name': 'First Workout', 'icon': '🎯', 'unlocked': True})
-        if total_workouts >= 10:
-            achievements.append({'name': '10 Workouts', 'icon': '💪', 'unlocked': True})
-        if total_workouts >= 50:
-            achievements.append({'name': '50 Workouts', 'icon': '🏆', 'unlocked': True})
-        if total_reps >= 100:
-            achievements.append({'name': '100 Reps', 'icon': '🔥', 'unlocked': True})
-        if total_reps >= 1000:
-            achievements.append({'name': '1000 Reps', 'icon': '⭐', 'unlocked': True})
+        # Both counters in one round trip
+        total_workouts, total_reps = db.session.query(
+            func.count(WorkoutSession.session_id),
+            func.coalesce(func.sum(WorkoutSession.total_reps), 0)
+        ).filter_by(user_id=user_id).one()
+        
+        totals = {'workouts': total_workouts, 'reps': total_reps}
+        achievements = [
+            {'name': name, 'icon': icon, 'unlocked': True}
+            for name, icon, metric, threshold in ACHIEVEMENTS
+            if totals[metric] >= threshold
+        ]
         
         return jsonify({
             'success': True,
@@ -4,15 +4,91 @@ Trainer routes for client management
 
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from app.utils.decorators import trainer_required
-from app.models.user import User
+from app.utils.decorators import trainer_required, assigned_client_required
+from app.utils.cache import invalidate_user_cache, CURRENT_WORKOUT_PLAN
+from app.utils.current_user import get_assigned_client_ids
+from app.models.user import User, TrainerAssignment
 from app.models.workout import WorkoutSession, ExerciseLog
 from app.models.plan import WeeklyWorkoutPlan, WeeklyMealPlan
 from app import db
 from datetime import datetime, timedelta
+import hashlib
+import logging
+from sqlalchemy import and_, case, distinct, exists, func, update
+from sqlalchemy.orm import aliased
+
+logger = logging.getLogger(__name__)
 
 bp = Blueprint('trainer', __name__)
 
+# Performance windows longer than this are aggregated in date-range batches
+# of PERFORMANCE_BATCH_DAYS, so no single statement scans years of sessions
+PERFORMANCE_BATCH_THRESHOLD_DAYS = 180
+PERFORMANCE_BATCH_DAYS = 90
+
+
+def _session_totals(user_id, start_date, days):
+    """
+    Workout count, duration/calorie sums and posture score sum/count for the
+    user's sessions since start_date. Short windows use one aggregate; long ones
+    sum consecutive session_date ranges, each an index range scan on
+    (user_id, session_date). The last range is open-ended.
+    """
+    if days > PERFORMANCE_BATCH_THRESHOLD_DAYS:
+        step = timedelta(days=PERFORMANCE_BATCH_DAYS)
+        bounds = []
+        lower = start_date
+        while lower + step < datetime.utcnow():
+            bounds.append((lower, lower + step))
+            lower += step
+        bounds.append((lower, None))
+    else:
+        bounds = [(start_date, None)]
+    
+    totals = {'workouts': 0, 'seconds': 0, 'calories': 0, 'score_sum': 0, 'scored': 0}
+    for lower, upper in bounds:
+        query = db.session.query(
+            func.count(WorkoutSession.session_id),
+            func.coalesce(func.sum(WorkoutSession.duration_seconds), 0),
+            func.coalesce(func.sum(WorkoutSession.total_calories), 0),
+            func.coalesce(func.sum(WorkoutSession.avg_posture_score), 0),
+            func.count(WorkoutSession.avg_posture_score)
+        ).filter(WorkoutSession.user_id == user_id, WorkoutSession.session_date >= lower)
+        if upper is not None:
+            query = query.filter(WorkoutSession.session_date < upper)
+        
+        for key, value in zip(totals, query.one()):
+            totals[key] += value
+    return totals
+
+
+def _plan_etag(plan_id, updated_at):
+    """Validator for a plan response; changes whenever the plan row is written"""
+    return hashlib.md5(f"{plan_id}:{updated_at.isoformat() if updated_at else ''}".encode()).hexdigest()
+
+
+def _active_plan_not_modified(model, plan_key, user_id):
+    """
+    True when the request's If-None-Match already names the client's active
+    plan. Only the key and updated_at are read, never the plan JSON.
+    """
+    if not request.if_none_match:
+        return False
+    version = db.session.query(plan_key, model.updated_at)\
+        .filter(model.user_id == user_id, model.is_active.is_(True))\
+        .first()
+    return version is not None and request.if_none_match.contains(_plan_etag(*version))
+
+
+def _plan_response(model, plan, plan_id):
+    """JSON response for a plan row, tagged with its ETag"""
+    response = jsonify({
+        'success': True,
+        'data': {'plan': model.rows_to_dicts([plan])[0]}
+    })
+    response.set_etag(_plan_etag(plan_id, plan.updated_at))
+    return response
+
 
 @bp.route('/dashboard/stats', methods=['GET'])
 @jwt_required()
@@ -21,63 +97,52 @@ def get_dashboard_stats():
     """Get aggregated dashboard statistics for trainer"""
     try:
         trainer_id = get_jwt_identity()
-        trainer = User.query.get(trainer_id)
-        
-        if not trainer:
-            return jsonify({'success': False, 'error': 'Trainer not found'}), 404
         
-        assigned_user_ids = trainer.assigned_users or []
+        # A trainer without clients has nothing to aggregate
+        if not get_assigned_client_ids():
+            return jsonify({'success': True, 'data': {
+                'total_clients': 0,
+                'active_clients': 0,
+                'total_workouts_this_week': 0,
+                'avg_performance_score': 0.0
+            }})
+        
+        # Calculate start of current week (Monday midnight)
+        now = datetime.utcnow()
+        start_of_week_datetime = (now - timedelta(days=now.weekday())).replace(hour=0, minute=0, second=0, microsecond=0)
+        thirty_days_ago = now - timedelta(days=30)
+        
+        # Every figure in one round trip. Assignments are outer-joined to their
+        # last 30 days of sessions only (an index range on user_id, session_date),
+        # which covers this week's count and the average score; "active" means any
+        # workout ever, checked with an EXISTS probe per client instead.
+        any_session = aliased(WorkoutSession)
+        has_workouts = exists().where(any_session.user_id == TrainerAssignment.user_id)
+        row = db.session.query(
+            func.count(distinct(TrainerAssignment.user_id)).label('total_clients'),
+            func.count(distinct(case((has_workouts, TrainerAssignment.user_id)))).label('active_clients'),
+            func.count(case((WorkoutSession.session_date >= start_of_week_datetime, 1))).label('workouts_this_week'),
+            func.avg(WorkoutSession.avg_posture_score).label('avg_score')
+        ).select_from(TrainerAssignment)\
+            .outerjoin(WorkoutSession, and_(
+                WorkoutSession.user_id == TrainerAssignment.user_id,
+                WorkoutSession.session_date >= thirty_days_ago
+            ))\
+            .filter(TrainerAssignment.trainer_id == trainer_id)\
+            .one()
         
-        # Initialize stats
         stats = {
-            'total_clients': len(assigned_user_ids),
-            'active_clients': 0,
-            'total_workouts_this_week': 0,
-            'avg_performance_score': 0.0
+            'total_clients': row.total_clients,
+            'active_clients': row.active_clients,
+            'total_workouts_this_week': row.workouts_this_week,
+            'avg_performance_score': round(row.avg_score, 1) if row.avg_score is not None else 0.0
         }
         
-        if not assigned_user_ids:
-            return jsonify({'success': True, 'data': stats})
-        
-        # Calculate active clients (clients with at least one workout)
-        active_clients_count = db.session.query(WorkoutSession.user_id)\
-            .filter(WorkoutSession.user_id.in_(assigned_user_ids))\
-            .distinct()\
-            .count()
-        stats['active_clients'] = active_clients_count
-        
-        # Calculate start of current week (Monday)
-        from datetime import datetime, timedelta
-        today = datetime.utcnow().date()
-        start_of_week = today - timedelta(days=today.weekday())  # Monday
-        start_of_week_datetime = datetime.combine(start_of_week, datetime.min.time())
-        
-        # Count workouts this week
-        workouts_this_week = WorkoutSession.query\
-            .filter(WorkoutSession.user_id.in_(assigned_user_ids))\
-            .filter(WorkoutSession.session_date >= start_of_week_datetime)\
-            .count()
-        stats['total_workouts_this_week'] = workouts_this_week
-        
-        # Calculate average performance score from recent workouts (last 30 days)
-        thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-        recent_sessions = WorkoutSession.query\
-            .filter(WorkoutSession.user_id.in_(assigned_user_ids))\
-            .filter(WorkoutSession.session_date >= thirty_days_ago)\
-            .filter(WorkoutSession.avg_posture_score.isnot(None))\
-            .all()
-        
-        if recent_sessions:
-            total_score = sum(s.avg_posture_score for s in recent_sessions)
-            stats['avg_performance_score'] = round(total_score / len(recent_sessions), 1)
-        
-        print(f"[Trainer] ✅ Dashboard stats calculated for trainer {trainer_id}: {stats}")
+        logger.debug("Dashboard stats for trainer %s: %s", trainer_id, stats)
         return jsonify({'success': True, 'data': stats})
         
     except Exception as e:
-        print(f"[Trainer] ❌ Error getting dashboard stats: {str(e)}")
-        import traceback
-        print(traceback.format_exc())
+        logger.exception("Error getting dashboard stats")
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
@@ -88,36 +153,39 @@ def get_assigned_clients():
     """Get list of clients assigned to this trainer"""
     try:
         trainer_id = get_jwt_identity()
-        trainer = User.query.get(trainer_id)
         
-        if not trainer:
-            return jsonify({'success': False, 'error': 'Trainer not found'}), 404
-        
-        assigned_user_ids = trainer.assigned_users or []
-        
-        if not assigned_user_ids:
+        if not get_assigned_client_ids():
             return jsonify({
                 'success': True,
                 'data': {'clients': []}
             })
         
-        # Get client details with workout stats
-        clients = User.query.filter(User.user_id.in_(assigned_user_ids)).all()
-        
-        client_data = []
-        for client in clients:
-            # Get recent workout count
-            workout_count = WorkoutSession.query.filter_by(user_id=client.user_id).count()
-            
-            # Get last workout date
-            last_session = WorkoutSession.query.filter_by(user_id=client.user_id)\
-                .order_by(WorkoutSession.session_date.desc()).first()
-            
-            client_info = client.to_dict()
+        # Workout count and last workout date per client, grouped once and
+        # outer-joined to the assigned clients so everything is one round trip
+        workout_stats = db.session.query(
+            WorkoutSession.user_id,
+            func.count(WorkoutSession.session_id).label('total_workouts'),
+            func.max(WorkoutSession.session_date).label('last_workout_date')
+        ).join(TrainerAssignment, and_(
+            TrainerAssignment.user_id == WorkoutSession.user_id,
+            TrainerAssignment.trainer_id == trainer_id
+        )).group_by(WorkoutSession.user_id).subquery()
+        
+        # Assigned clients as plain rows, straight from the assignment table
+        clients = db.session.query(
+            *User.list_columns(),
+            workout_stats.c.total_workouts,
+            workout_stats.c.last_workout_date
+        ).join(TrainerAssignment, TrainerAssignment.user_id == User.user_id)\
+            .outerjoin(workout_stats, workout_stats.c.user_id == User.user_id)\
+            .filter(TrainerAssignment.trainer_id == trainer_id)\
+            .all()
+        
+        client_data = User.rows_to_dicts(clients)
+        for client_info, row in zip(client_data, clients):
             # Add workout stats at top level for frontend compatibility
-            client_info['total_workouts'] = workout_count
-            client_info['last_workout_date'] = last_session.session_date.isoformat() if last_session else None
-            client_data.append(client_info)
+            client_info['total_workouts'] = row.total_workouts or 0
+            client_info['last_workout_date'] = row.last_workout_date.isoformat() if row.last_workout_date else None
         
         return jsonify({
             'success': True,
@@ -125,28 +193,20 @@ def get_assigned_clients():
         })
         
     except Exception as e:
-        print(f"[Trainer] ❌ Error getting clients: {str(e)}")
+        logger.exception("Error getting clients")
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
 @bp.route('/clients/<user_id>/performance', methods=['GET'])
 @jwt_required()
 @trainer_required()
+@assigned_client_required()
 def get_client_performance(user_id):
     """Get detailed performance data for a client"""
     try:
-        trainer_id = get_jwt_identity()
-        trainer = User.query.get(trainer_id)
-        
-        # Verify this client is assigned to this trainer
-        if user_id not in (trainer.assigned_users or []):
-            return jsonify({
-                'success': False,
-                'error': 'Client not assigned to you'
-            }), 403
-        
         # Get client details
-        client = User.query.get(user_id)
+        client = db.session.query(User.user_id, User.first_name, User.last_name, User.email)\
+            .filter_by(user_id=user_id).one_or_none()
         if not client:
             return jsonify({'success': False, 'error': 'Client not found'}), 404
         
@@ -154,30 +214,46 @@ def get_client_performance(user_id):
         days = request.args.get('days', 30, type=int)
         start_date = datetime.utcnow() - timedelta(days=days)
         
-        # Get workout history
-        sessions = WorkoutSession.query.filter_by(user_id=user_id)\
-            .filter(WorkoutSession.session_date >= start_date)\
-            .order_by(WorkoutSession.session_date.desc())\
-            .all()
+        in_window = (WorkoutSession.user_id == user_id, WorkoutSession.session_date >= start_date)
         
-        # Calculate statistics
-        total_workouts = len(sessions)
-        total_duration = sum((s.duration_seconds or 0) / 60 for s in sessions)  # Convert to minutes
-        avg_duration = total_duration / total_workouts if total_workouts > 0 else 0
-        total_calories = sum(s.total_calories or 0 for s in sessions)
+        # Calculate statistics in the database
+        totals = _session_totals(user_id, start_date, days)
         
-        # Calculate average form score
-        form_scores = [s.avg_posture_score for s in sessions if s.avg_posture_score is not None]
-        avg_form_score = sum(form_scores) / len(form_scores) if form_scores else 0
+        total_workouts = totals['workouts']
+        total_duration = totals['seconds'] / 60  # Convert to minutes
+        avg_duration = total_duration / total_workouts if total_workouts > 0 else 0
+        total_calories = totals['calories']
+        avg_form_score = totals['score_sum'] / totals['scored'] if totals['scored'] else 0
+        
+        # Get workout history - only the columns the listing shows. Exercise
+        # counts for every session in the window come from one grouped COUNT,
+        # outer-joined back, rather than a subquery evaluated per session row.
+        exercise_counts = db.session.query(
+            ExerciseLog.session_id,
+            func.count(ExerciseLog.log_id).label('exercise_count')
+        ).join(WorkoutSession, WorkoutSession.session_id == ExerciseLog.session_id)\
+            .filter(*in_window)\
+            .group_by(ExerciseLog.session_id)\
+            .subquery()
+        sessions = db.session.query(
+            WorkoutSession.session_id,
+            WorkoutSession.session_date,
+            WorkoutSession.duration_seconds,
+            WorkoutSession.total_calories,
+            WorkoutSession.avg_posture_score,
+            WorkoutSession.total_exercises,
+            exercise_counts.c.exercise_count
+        ).outerjoin(exercise_counts, exercise_counts.c.session_id == WorkoutSession.session_id)\
+            .filter(*in_window)\
+            .order_by(WorkoutSession.session_date.desc())\
+            .all()
         
-        # Build workout history with exercise counts
         workout_history = []
         for session in sessions:
-            exercise_count = len(session.exercises) if session.exercises else session.total_exercises or 0
             workout_history.append({
                 'session_id': session.session_id,
                 'date': session.session_date.isoformat(),
-                'exercises_count': exercise_count,
+                'exercises_count': session.exercise_count or session.total_exercises or 0,
                 'duration': round((session.duration_seconds or 0) / 60),  # Convert seconds to minutes
                 'calories_burned': round(session.total_calories or 0),
                 'form_score': session.avg_posture_score
@@ -199,37 +275,42 @@ def get_client_performance(user_id):
         })
         
     except Exception as e:
-        print(f"[Trainer] ❌ Error getting client performance: {str(e)}")
+        logger.exception("Error getting client performance")
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
 @bp.route('/clients/<user_id>/sessions/<session_id>', methods=['GET'])
 @jwt_required()
 @trainer_required()
+@assigned_client_required()
 def get_client_workout_session(user_id, session_id):
     """Get detailed workout session for a client including video and exercise logs"""
     try:
-        trainer_id = get_jwt_identity()
-        trainer = User.query.get(trainer_id)
-        
-        # Verify this client is assigned to this trainer
-        if user_id not in (trainer.assigned_users or []):
-            return jsonify({
-                'success': False,
-                'error': 'Client not assigned to you'
-            }), 403
-        
-        # Get workout session
-        session = WorkoutSession.query.filter_by(
-            session_id=session_id,
-            user_id=user_id
-        ).first()
+        # Get workout session and its exercise logs in one round trip: the session
+        # columns outer-joined to its logs, one row per log (or one bare row)
+        rows = db.session.query(
+            WorkoutSession.session_id,
+            WorkoutSession.user_id,
+            WorkoutSession.session_date,
+            WorkoutSession.duration_seconds,
+            WorkoutSession.total_calories,
+            WorkoutSession.video_url,
+            WorkoutSession.avg_posture_score,
+            ExerciseLog.log_id,
+            ExerciseLog.exercise_type,
+            ExerciseLog.sets,
+            ExerciseLog.total_reps,
+            ExerciseLog.duration_seconds.label('log_duration_seconds'),
+            ExerciseLog.avg_form_score,
+            ExerciseLog.posture_issues
+        ).outerjoin(ExerciseLog, ExerciseLog.session_id == WorkoutSession.session_id)\
+            .filter(WorkoutSession.session_id == session_id, WorkoutSession.user_id == user_id)\
+            .all()
         
-        if not session:
+        if not rows:
             return jsonify({'success': False, 'error': 'Session not found'}), 404
         
-        # Get exercise logs for this session
-        exercise_logs = ExerciseLog.query.filter_by(session_id=session_id).all()
+        session = rows[0]
         
         # Build response with session details and exercises
         session_data = {
@@ -244,14 +325,16 @@ def get_client_workout_session(user_id, session_id):
         }
         
         # Add exercise details
-        for log in exercise_logs:
+        for log in rows:
+            if log.log_id is None:
+                continue
             session_data['exercise_logs'].append({
                 'exercise_log_id': log.log_id,  # Use log_id from model
                 'exercise_name': log.exercise_type,
                 'sets_completed': log.sets or 0,
                 'reps_completed': log.total_reps or 0,
                 'weight_used': None,  # Not in current model
-                'duration': log.duration_seconds,
+                'duration': log.log_duration_seconds,
                 'form_score': log.avg_form_score,
                 'feedback': log.posture_issues  # Using posture_issues as feedback
             })
@@ -262,25 +345,18 @@ def get_client_workout_session(user_id, session_id):
         })
         
     except Exception as e:
-        print(f"[Trainer] ❌ Error getting workout session: {str(e)}")
+        logger.exception("Error getting workout session")
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
 @bp.route('/clients/<user_id>/feedback', methods=['POST'])
 @jwt_required()
 @trainer_required()
+@assigned_client_required()
 def add_client_feedback(user_id):
     """Add feedback/notes for a client"""
     try:
         trainer_id = get_jwt_identity()
-        trainer = User.query.get(trainer_id)
-        
-        # Verify this client is assigned to this trainer
-        if user_id not in (trainer.assigned_users or []):
-            return jsonify({
-                'success': False,
-                'error': 'Client not assigned to you'
-            }), 403
         
         data = request.get_json()
         feedback = data.get('feedback', '')
@@ -293,67 +369,73 @@ def add_client_feedback(user_id):
             }), 400
         
         # Add feedback to specific workout session or most recent
-        if session_id:
-            session = WorkoutSession.query.filter_by(
-                session_id=session_id,
-                user_id=user_id
-            ).first()
-        else:
-            session = WorkoutSession.query.filter_by(user_id=user_id)\
+        if not session_id:
+            session_id = db.session.query(WorkoutSession.session_id)\
+                .filter_by(user_id=user_id)\
                 .order_by(WorkoutSession.session_date.desc())\
-                .first()
-        
-        if session:
-            trainer_name = f"{trainer.first_name} {trainer.last_name}"
-            timestamp = datetime.utcnow().strftime('%Y-%m-%d %H:%M')
-            feedback_note = f"[Trainer Feedback from {trainer_name} at {timestamp}]\n{feedback}\n"
-            
-            # Append feedback to existing notes
-            if session.session_notes:
-                session.session_notes = session.session_notes + "\n\n" + feedback_note
-            else:
-                session.session_notes = feedback_note
-            
-            db.session.commit()
-            
-            print(f"[Trainer] ✅ Feedback added for client {user_id}, session {session.session_id}")
-            return jsonify({
-                'success': True,
-                'message': 'Feedback added successfully',
-                'data': {
-                    'session_id': session.session_id,
-                    'feedback': feedback_note
-                }
-            })
-        else:
+                .limit(1)\
+                .scalar()
+            if not session_id:
+                return jsonify({
+                    'success': False,
+                    'error': 'Workout session not found'
+                }), 404
+        
+        trainer = db.session.query(User.first_name, User.last_name).filter_by(user_id=trainer_id).one()
+        trainer_name = f"{trainer.first_name} {trainer.last_name}"
+        timestamp = datetime.utcnow().strftime('%Y-%m-%d %H:%M')
+        feedback_note = f"[Trainer Feedback from {trainer_name} at {timestamp}]\n{feedback}\n"
+        
+        # Append feedback to existing notes in one UPDATE. The notes never travel
+        # to Python and back, and concurrent feedback can't overwrite each other.
+        existing_notes = func.nullif(WorkoutSession.session_notes, '', type_=db.Text)
+        result = db.session.execute(
+            update(WorkoutSession)
+            .where(WorkoutSession.session_id == session_id, WorkoutSession.user_id == user_id)
+            .values(session_notes=func.coalesce(existing_notes + '\n\n', '') + feedback_note)
+            .execution_options(synchronize_session=False)
+        )
+        
+        if not result.rowcount:
+            db.session.rollback()
             return jsonify({
                 'success': False,
                 'error': 'Workout session not found'
             }), 404
         
+        db.session.commit()
+        
+        logger.debug("Feedback added for client %s, session %s", user_id, session_id)
+        return jsonify({
+            'success': True,
+            'message': 'Feedback added successfully',
+            'data': {
+                'session_id': session_id,
+                'feedback': feedback_note
+            }
+        })
+        
     except Exception as e:
         db.session.rollback()
-        print(f"[Trainer] ❌ Error adding feedback: {str(e)}")
+        logger.exception("Error adding feedback")
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
 @bp.route('/clients/<user_id>/workout-plan', methods=['GET'])
 @jwt_required()
 @trainer_required()
+@assigned_client_required()
 def get_client_workout_plan(user_id):
     """Get client's current workout plan"""
     try:
-        trainer_id = get_jwt_identity()
-        trainer = User.query.get(trainer_id)
+        # The trainer already has this version of the plan
+        if _active_plan_not_modified(WeeklyWorkoutPlan, WeeklyWorkoutPlan.plan_id, user_id):
+            return '', 304
         
-        # Verify this client is assigned to this trainer
-        if user_id not in (trainer.assigned_users or []):
-            return jsonify({
-                'success': False,
-                'error': 'Client not assigned to you'
-            }), 403
-        
-        plan = WeeklyWorkoutPlan.query.filter_by(user_id=user_id, is_active=True).first()
+        # Row-based read: no ORM object or identity-map bookkeeping for a read-only response
+        plan = WeeklyWorkoutPlan.query_columns()\
+            .filter(WeeklyWorkoutPlan.user_id == user_id, WeeklyWorkoutPlan.is_active.is_(True))\
+            .first()
         
         if not plan:
             # Return empty plan structure instead of error
@@ -373,32 +455,20 @@ def get_client_workout_plan(user_id):
                 }
             })
         
-        return jsonify({
-            'success': True,
-            'data': {'plan': plan.to_dict()}
-        })
+        return _plan_response(WeeklyWorkoutPlan, plan, plan.plan_id)
         
     except Exception as e:
-        print(f"[Trainer] ❌ Error getting workout plan: {str(e)}")
+        logger.exception("Error getting workout plan")
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
 @bp.route('/clients/<user_id>/workout-plan', methods=['PUT'])
 @jwt_required()
 @trainer_required()
+@assigned_client_required()
 def adjust_client_workout_plan(user_id):
     """Adjust client's workout plan"""
     try:
-        trainer_id = get_jwt_identity()
-        trainer = User.query.get(trainer_id)
-        
-        # Verify this client is assigned to this trainer
-        if user_id not in (trainer.assigned_users or []):
-            return jsonify({
-                'success': False,
-                'error': 'Client not assigned to you'
-            }), 403
-        
         data = request.get_json()
         plan_data = data.get('plan_data')
         
@@ -417,38 +487,39 @@ def adjust_client_workout_plan(user_id):
             }), 404
         
         plan.plan_data = plan_data
+        # Serialize before commit; afterwards the expired plan would be reloaded
+        plan_dict = plan.to_dict()
         db.session.commit()
+        invalidate_user_cache(user_id, CURRENT_WORKOUT_PLAN)
         
-        print(f"[Trainer] ✅ Workout plan adjusted for client {user_id}")
+        logger.debug("Workout plan adjusted for client %s", user_id)
         return jsonify({
             'success': True,
             'message': 'Workout plan updated successfully',
-            'data': {'plan': plan.to_dict()}
+            'data': {'plan': plan_dict}
         })
         
     except Exception as e:
         db.session.rollback()
-        print(f"[Trainer] ❌ Error adjusting workout plan: {str(e)}")
+        logger.exception("Error adjusting workout plan")
         return jsonify({'success': False, 'error': str(e)}), 500
 
 
 @bp.route('/clients/<user_id>/meal-plan', methods=['GET'])
 @jwt_required()
 @trainer_required()
+@assigned_client_required()
 def get_client_meal_plan(user_id):
     """Get client's current meal plan"""
     try:
-        trainer_id = get_jwt_identity()
-        trainer = User.query.get(trainer_id)
-        
-        # Verify this client is assigned to this trainer
-        if user_id not in (trainer.assigned_users or []):
-            return jsonify({
-                'success': False,
-                'error': 'Client not assigned to you'
-            }), 403
+        # The trainer already has this version of the plan
+        if _active_plan_not_modified(WeeklyMealPlan, WeeklyMealPlan.meal_plan_id, user_id):
+            return '', 304
         
-        plan = WeeklyMealPlan.query.filter_by(user_id=user_id, is_active=True).first()
+        # Row-based read: no ORM object or identity-map bookkeeping for a read-only response
+        plan = WeeklyMealPlan.query_columns()\
+            .filter(WeeklyMealPlan.user_id == user_id, WeeklyMealPlan.is_active.is_(True))\
+            .first()
         
         if not plan:
             return jsonify({
@@ -456,11 +527,8 @@ def get_client_meal_plan(user_id):
                 'error': 'No active meal plan found'
             }), 404
         
-        return jsonify({
-            'success': True,
-            'data': {'plan': plan.to_dict()}
-        })
+        return _plan_response(WeeklyMealPlan, plan, plan.meal_plan_id)
         
     except Exception as e:
-        print(f"[Trainer] ❌ Error getting meal plan: {str(e)}")
+        logger.exception("Error getting meal plan")
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -1,16 +1,36 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app, send_from_directory
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app import db
 from app.models.user import User, UserProfile
+from app.utils.cache import invalidate_user_cache, DYNAMIC_PLANS
+from app.services.avatar_storage import AvatarError, is_data_url, is_own_avatar, save_avatar, save_data_url, delete_avatar
+from sqlalchemy.orm import joinedload, undefer
+import logging
+import os
+
+logger = logging.getLogger(__name__)
 
 bp = Blueprint('user', __name__)
 
+# Fields PUT /profile copies straight from the request body
+USER_FIELDS = ('first_name', 'last_name', 'date_of_birth', 'gender')
+PROFILE_NUMERIC_FIELDS = ('current_weight', 'height', 'target_weight')  # empty values clear the field
+PROFILE_FIELDS = ('fitness_goal', 'fitness_level', 'medical_conditions', 'preferences')
+
+def _avatar_settings():
+    config = current_app.config
+    return {
+        'upload_dir': config['AVATAR_UPLOAD_DIR'],
+        'max_bytes': config['AVATAR_MAX_BYTES'],
+        'base_url': config['AVATAR_BASE_URL'] or request.host_url
+    }
+
 @bp.route('/profile', methods=['GET'])
 @jwt_required()
 def get_profile():
     try:
         user_id = get_jwt_identity()
-        user = User.query.get(user_id)
+        user = db.session.get(User, user_id, options=[undefer(User.profile_picture_url), joinedload(User.profile)])
         
         if not user:
             return jsonify({'success': False, 'error': 'User not found'}), 404
@@ -30,65 +50,51 @@ def get_profile():
 def update_profile():
     try:
         user_id = get_jwt_identity()
-        print(f"[Profile Update] User ID: {user_id}")
-        
-        user = User.query.get(user_id)
+        user = db.session.get(User, user_id, options=[undefer(User.profile_picture_url), joinedload(User.profile)])
         
         if not user:
-            print(f"[Profile Update] User not found: {user_id}")
             return jsonify({'success': False, 'error': 'User not found'}), 404
         
         # Get JSON data if available
         data = {}
         if request.is_json:
             data = request.get_json() or {}
-        print(f"[Profile Update] Data received: {data}")
-        
-        # Update user fields
-        if 'first_name' in data:
-            user.first_name = data['first_name']
-        if 'last_name' in data:
-            user.last_name = data['last_name']
-        if 'date_of_birth' in data:
-            user.date_of_birth = data['date_of_birth']
-        if 'gender' in data:
-            user.gender = data['gender']
+        logger.debug("Profile update for %s: %s", user_id, sorted(data))
+        
+        for field in USER_FIELDS:
+            if field in data:
+                setattr(user, field, data[field])
+        
+        replaced_picture = None
         if 'profile_picture_url' in data:
-            user.profile_picture_url = data['profile_picture_url']
-            print(f"[Profile Update] Setting profile picture URL")
+            picture = data['profile_picture_url']
+            # Older clients still send the image inline; store it on disk and keep only the URL
+            if is_data_url(picture):
+                picture = save_data_url(user_id, picture, **_avatar_settings())
+            elif picture and picture != user.profile_picture_url and not is_own_avatar(picture, user_id):
+                # Only URLs this server issued to the user may be stored; anything else
+                # (e.g. another user's avatar) would be deleted as "ours" on the next change
+                raise AvatarError('profile_picture_url must be an image or an avatar URL issued to you')
+            if picture != user.profile_picture_url:
+                replaced_picture = user.profile_picture_url
+            user.profile_picture_url = picture
         
         # Update or create profile
         if not user.profile:
-            print(f"[Profile Update] Creating new profile for user: {user_id}")
-            new_profile = UserProfile(user_id=user_id)
-            db.session.add(new_profile)
-            db.session.flush()  # Flush to get the profile_id
-            user.profile = new_profile
+            user.profile = UserProfile(user_id=user_id)
         
         profile = user.profile
-        print(f"[Profile Update] Profile ID: {profile.profile_id if profile else 'None'}")
-        
-        if 'current_weight' in data:
-            profile.current_weight = float(data['current_weight']) if data['current_weight'] else None
-            print(f"[Profile Update] Setting current_weight: {profile.current_weight}")
-        if 'height' in data:
-            profile.height = float(data['height']) if data['height'] else None
-            print(f"[Profile Update] Setting height: {profile.height}")
-        if 'target_weight' in data:
-            profile.target_weight = float(data['target_weight']) if data['target_weight'] else None
-            print(f"[Profile Update] Setting target_weight: {profile.target_weight}")
-        if 'fitness_goal' in data:
-            profile.fitness_goal = data['fitness_goal']
-        if 'fitness_level' in data:
-            profile.fitness_level = data['fitness_level']
-        if 'medical_conditions' in data:
-            profile.medical_conditions = data['medical_conditions']
-        if 'preferences' in data:
-            profile.preferences = data['preferences']
+        for field in PROFILE_NUMERIC_FIELDS:
+            if field in data:
+                setattr(profile, field, float(data[field]) if data[field] else None)
+        for field in PROFILE_FIELDS:
+            if field in data:
+                setattr(profile, field, data[field])
         
-        print(f"[Profile Update] Committing changes...")
         db.session.commit()
-        print(f"[Profile Update] ✅ Success")
+        # The old file goes only once no row points at it
+        delete_avatar(replaced_picture, current_app.config['AVATAR_UPLOAD_DIR'], user_id)
+        invalidate_user_cache(user_id, DYNAMIC_PLANS)
         
         return jsonify({
             'success': True,
@@ -97,19 +103,57 @@ def update_profile():
                 'profile': profile.to_dict()
             }
         }), 200
+    except AvatarError as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        db.session.rollback()
+        logger.exception("Profile update failed")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@bp.route('/profile/avatar', methods=['POST'])
+@jwt_required()
+def upload_avatar():
+    try:
+        user_id = get_jwt_identity()
+        user = db.session.get(User, user_id, options=[undefer(User.profile_picture_url)])
+        
+        if not user:
+            return jsonify({'success': False, 'error': 'User not found'}), 404
+        
+        if 'avatar' not in request.files or request.files['avatar'].filename == '':
+            return jsonify({'success': False, 'error': 'No avatar file provided'}), 400
+        
+        avatar_file = request.files['avatar']
+        extension = os.path.splitext(avatar_file.filename)[1]
+        url = save_avatar(user_id, avatar_file.read(), extension, **_avatar_settings())
+        
+        replaced_picture = user.profile_picture_url
+        user.profile_picture_url = url
+        db.session.commit()
+        # The old file goes only once no row points at it
+        delete_avatar(replaced_picture, current_app.config['AVATAR_UPLOAD_DIR'], user_id)
+        
+        return jsonify({
+            'success': True,
+            'data': {'user': user.to_dict()}
+        }), 200
+    except AvatarError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
     except Exception as e:
         db.session.rollback()
-        print(f"[Profile Update] ❌ Error: {str(e)}")
-        import traceback
-        print(f"[Profile Update] Traceback: {traceback.format_exc()}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@bp.route('/avatars/<filename>', methods=['GET'])
+def get_avatar(filename):
+    return send_from_directory(current_app.config['AVATAR_UPLOAD_DIR'], filename, max_age=86400)
+
 @bp.route('/profile/goals', methods=['PUT'])
 @jwt_required()
 def update_goals():
     try:
         user_id = get_jwt_identity()
-        user = User.query.get(user_id)
+        user = db.session.get(User, user_id, options=[joinedload(User.profile)])
         
         if not user or not user.profile:
             return jsonify({'success': False, 'error': 'Profile not found'}), 404
@@ -125,6 +169,7 @@ def update_goals():
             profile.fitness_level = data['fitness_level']
         
         db.session.commit()
+        invalidate_user_cache(user_id, DYNAMIC_PLANS)
         
         return jsonify({
             'success': True,
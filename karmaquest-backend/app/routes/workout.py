@@ -1,10 +1,120 @@
-from flask import Blueprint, request, jsonify
+import logging
+from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app import db
 from app.models.workout import WorkoutSession, ExerciseLog
+from app.services.dynamic_plan_generator import DynamicPlanGenerator, exercise_category
+from sqlalchemy import and_, func, or_
+from sqlalchemy.orm import lazyload, raiseload, selectinload
+from app.utils.transactions import no_expire_on_commit
+from app.utils.cache import invalidate_user_cache, PROGRESS_SUMMARY, PROGRESS_ACHIEVEMENTS, CURRENT_WORKOUT_PLAN, DYNAMIC_PLANS
 from datetime import datetime
+import uuid
 
 bp = Blueprint('workout', __name__)
+logger = logging.getLogger(__name__)
+
+# Body of every "Session not found" 404, encoded once (compact, as jsonify emits outside debug)
+_SESSION_NOT_FOUND_BODY = b'{"error":"Session not found","success":false}\n'
+
+# Largest batch accepted by /sessions/<session_id>/exercises/bulk
+BULK_EXERCISE_MAX_ENTRIES = 100
+
+# Request body fields -> accepted JSON types, checked in one pass by _parse_body.
+# null is accepted for any field, as before.
+_NUMBER = (int, float)
+_MISSING = object()
+UPDATE_SESSION_FIELDS = {
+    'duration_seconds': _NUMBER,
+    'session_notes': str
+}
+COMPLETE_SESSION_FIELDS = {
+    'duration_seconds': _NUMBER,
+    'total_exercises': _NUMBER,
+    'total_reps': _NUMBER,
+    'total_calories': _NUMBER,
+    'avg_posture_score': _NUMBER,
+    'session_notes': str,
+    'video_url': str,
+    'workout_type': str,
+    'exercise_type': str
+}
+EXERCISE_LOG_FIELDS = {
+    'exercise_type': str,
+    'sets': _NUMBER,
+    'correct_reps': _NUMBER,
+    'incorrect_reps': _NUMBER,
+    'total_reps': _NUMBER,
+    'avg_form_score': _NUMBER,
+    'duration_seconds': _NUMBER,
+    'calories_burned': _NUMBER,
+    'posture_issues': (list, dict)
+}
+# Values for exercise fields the client leaves out (posture_issues gets a fresh list)
+EXERCISE_LOG_DEFAULTS = {
+    'sets': 1,
+    'correct_reps': 0,
+    'incorrect_reps': 0,
+    'total_reps': 0,
+    'avg_form_score': 0,
+    'duration_seconds': 0,
+    'calories_burned': 0
+}
+
+EXERCISE_TYPES = ['squat', 'pushup', 'lunge', 'plank', 'deadlift']
+
+
+def _parse_body(data, fields):
+    """
+    The known fields present in a JSON body, type-checked in one pass; unknown keys
+    are dropped. ValueError (with a client-facing message) on a non-object body or
+    a field of the wrong type.
+    """
+    if not isinstance(data, dict):
+        raise ValueError('Request body must be a JSON object')
+    body = {}
+    for name, types in fields.items():
+        value = data.get(name, _MISSING)
+        if value is _MISSING:
+            continue
+        if value is not None and (not isinstance(value, types) or isinstance(value, bool)):
+            raise ValueError(f'Invalid value for {name}')
+        body[name] = value
+    return body
+
+
+def _session_not_found():
+    """404 for a missing or foreign session; a fresh Response, since after_request hooks mutate it"""
+    return current_app.response_class(_SESSION_NOT_FOUND_BODY, status=404, mimetype='application/json')
+
+
+def _stage_plans(user_id, workout_data):
+    """
+    Generate new workout and meal plans from a completed workout and stage them as
+    the active ones in the current transaction; the caller commits
+    """
+    # Generate dynamic plans before touching any plan rows, so a generator
+    # failure leaves nothing half-written in the transaction
+    workout_plan_data, meal_plan_data = DynamicPlanGenerator.generate_dynamic_plans(
+        user_id, workout_data
+    )
+    
+    logger.debug("Plans generated for user %s", user_id)
+    
+    DynamicPlanGenerator.stage_plans(user_id, workout_plan_data, meal_plan_data)
+
+def _regenerate_plans_job(user_id, workout_data):
+    """Background job: regenerate the plans and commit them in one transaction"""
+    try:
+        _stage_plans(user_id, workout_data)
+        db.session.commit()
+        invalidate_user_cache(user_id, CURRENT_WORKOUT_PLAN)
+        logger.debug("Dynamic plans saved for user %s", user_id)
+        return {'success': True}
+    except Exception:
+        db.session.rollback()
+        raise
+
 
 @bp.route('/sessions/start', methods=['POST'])
 @jwt_required()
@@ -14,7 +124,9 @@ def start_session():
         session = WorkoutSession(user_id=user_id)
         
         db.session.add(session)
-        db.session.commit()
+        with no_expire_on_commit(db.session):
+            db.session.commit()
+        invalidate_user_cache(user_id, PROGRESS_SUMMARY, PROGRESS_ACHIEVEMENTS, DYNAMIC_PLANS)
         
         return jsonify({
             'success': True,
@@ -32,16 +144,21 @@ def update_session(session_id):
         session = WorkoutSession.query.filter_by(session_id=session_id, user_id=user_id).first()
         
         if not session:
-            return jsonify({'success': False, 'error': 'Session not found'}), 404
+            return _session_not_found()
         
-        data = request.get_json()
+        try:
+            data = _parse_body(request.get_json(silent=True), UPDATE_SESSION_FIELDS)
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
         
         if 'duration_seconds' in data:
             session.duration_seconds = data['duration_seconds']
         if 'session_notes' in data:
             session.session_notes = data['session_notes']
         
-        db.session.commit()
+        with no_expire_on_commit(db.session):
+            db.session.commit()
+        invalidate_user_cache(user_id, DYNAMIC_PLANS)
         
         return jsonify({
             'success': True,
@@ -56,25 +173,39 @@ def update_session(session_id):
 def complete_session(session_id):
     try:
         user_id = get_jwt_identity()
-        session = WorkoutSession.query.filter_by(session_id=session_id, user_id=user_id).first()
+        # Totals come from an aggregate query below, so exercises aren't loaded here
+        session = WorkoutSession.query.options(lazyload(WorkoutSession.exercises))\
+            .filter_by(session_id=session_id, user_id=user_id)\
+            .first()
         
         if not session:
-            return jsonify({'success': False, 'error': 'Session not found'}), 404
+            return _session_not_found()
         
-        data = request.get_json() or {}
+        try:
+            data = _parse_body(request.get_json(silent=True) or {}, COMPLETE_SESSION_FIELDS)
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        
+        # Exercise totals in one aggregate query instead of summing loaded rows
+        exercise_count, exercise_reps, exercise_calories, exercise_form_score = db.session.query(
+            func.count(ExerciseLog.log_id),
+            func.coalesce(func.sum(ExerciseLog.total_reps), 0),
+            func.coalesce(func.sum(ExerciseLog.calories_burned), 0),
+            func.avg(ExerciseLog.avg_form_score)
+        ).filter(ExerciseLog.session_id == session_id).one()
         
         session.duration_seconds = data.get('duration_seconds', session.duration_seconds)
-        session.total_exercises = len(session.exercises) if session.exercises else data.get('total_exercises', 0)
-        session.total_reps = sum(ex.total_reps for ex in session.exercises) if session.exercises else data.get('total_reps', 0)
+        session.total_exercises = exercise_count if exercise_count else data.get('total_exercises', 0)
+        session.total_reps = exercise_reps if exercise_count else data.get('total_reps', 0)
         
         # Use provided total_calories if available, otherwise calculate from exercises
         if 'total_calories' in data:
             session.total_calories = data['total_calories']
-        elif session.exercises:
-            session.total_calories = sum(ex.calories_burned for ex in session.exercises)
+        elif exercise_count:
+            session.total_calories = exercise_calories
         
-        if session.exercises:
-            session.avg_posture_score = sum(ex.avg_form_score for ex in session.exercises) / len(session.exercises)
+        if exercise_count:
+            session.avg_posture_score = exercise_form_score
         elif 'avg_posture_score' in data:
             session.avg_posture_score = data['avg_posture_score']
         
@@ -87,16 +218,13 @@ def complete_session(session_id):
         if 'workout_type' in data:
             session.workout_type = data['workout_type']
         
-        db.session.commit()
-        
         # ===== GENERATE DYNAMIC PLANS BASED ON WORKOUT PERFORMANCE =====
-        print(f"[Workout] Generating dynamic plans for user {user_id} after workout completion...")
+        logger.debug("Generating dynamic plans for user %s after workout completion", user_id)
         
+        regenerate_async = current_app.config['PLAN_REGENERATION_ASYNC']
+        plans_staged = False
+        job_id = None
         try:
-            from app.services.dynamic_plan_generator import DynamicPlanGenerator
-            from app.models.plan import WeeklyWorkoutPlan, WeeklyMealPlan
-            from datetime import datetime, timedelta
-            
             # Prepare workout data for plan generation
             workout_data = {
                 'total_reps': session.total_reps or 0,
@@ -111,104 +239,60 @@ def complete_session(session_id):
             # Option 1: Get exercise from the request data (for AI workouts where exercise is sent directly)
             if 'exercise_type' in data and data['exercise_type']:
                 workout_data['exercise_type'] = data['exercise_type']
-                print(f"[Workout] 🎯 Exercise from request data: '{data['exercise_type']}'")
+                logger.debug("Exercise from request data: %r", data['exercise_type'])
             
             # Option 2: Get primary exercise from exercise logs (if already logged)
-            elif session.exercises and len(session.exercises) > 0:
-                primary_exercise = session.exercises[0]
+            elif exercise_count:
+                primary_exercise = db.session.query(ExerciseLog.exercise_type, ExerciseLog.sets)\
+                    .filter_by(session_id=session_id)\
+                    .order_by(ExerciseLog.log_id)\
+                    .first()
                 workout_data['exercise_type'] = primary_exercise.exercise_type
                 workout_data['sets'] = primary_exercise.sets or 1
                 
-                print(f"[Workout] 📋 Found {len(session.exercises)} exercises in session")
-                print(f"[Workout] 📋 Primary exercise from logs: '{primary_exercise.exercise_type}'")
+                logger.debug("Primary exercise of %s logged: %r", exercise_count, primary_exercise.exercise_type)
             
             # Map exercise to category if we have a valid exercise type
             if workout_data['exercise_type'] != 'mixed':
-                
-                # Map exercise to category - MORE COMPREHENSIVE MAPPING
-                exercise_category_map = {
-                    # Push exercises
-                    'pushups': 'Push', 'push-ups': 'Push', 'push_ups': 'Push',
-                    'bench_press': 'Push', 'benchpress': 'Push',
-                    'shoulder_press': 'Push', 'shoulderpress': 'Push',
-                    'dips': 'Push', 'tricep_extensions': 'Push', 'tricep_extension': 'Push',
-                    # Pull exercises
-                    'pullups': 'Pull', 'pull-ups': 'Pull', 'pull_ups': 'Pull',
-                    'rows': 'Pull', 'row': 'Pull', 'bent_over_row': 'Pull',
-                    'lat_pulldown': 'Pull', 'latpulldown': 'Pull',
-                    'face_pulls': 'Pull', 'facepulls': 'Pull', 'face_pull': 'Pull',
-                    'bicep_curls': 'Pull', 'bicep_curl': 'Pull', 'bicepcurls': 'Pull',
-                    # Legs exercises
-                    'squats': 'Legs', 'squat': 'Legs',
-                    'lunges': 'Legs', 'lunge': 'Legs',
-                    'leg_press': 'Legs', 'legpress': 'Legs',
-                    'deadlifts': 'Legs', 'deadlift': 'Legs',
-                    # Core exercises
-                    'plank': 'Core', 'planks': 'Core',
-                    'crunches': 'Core', 'crunch': 'Core',
-                    'russian_twists': 'Core', 'russian_twist': 'Core', 'russiantwists': 'Core',
-                    'leg_raises': 'Core', 'leg_raise': 'Core', 'legraises': 'Core'
-                }
-                
-                # Map the exercise type to category
-                exercise_type_normalized = workout_data['exercise_type'].lower().replace(' ', '_')
-                workout_data['exercise_category'] = exercise_category_map.get(
-                    exercise_type_normalized, 'Full Body'
-                )
-                
-                print(f"[Workout] 🎯 Exercise type: {workout_data['exercise_type']}")
-                print(f"[Workout] 🎯 Normalized: {exercise_type_normalized}")
-                print(f"[Workout] 🎯 Detected category: {workout_data['exercise_category']}")
+                workout_data['exercise_category'] = exercise_category(workout_data['exercise_type'])
             
-            print(f"[Workout] Final workout data: {workout_data}")
-            
-            # Generate dynamic plans
-            workout_plan_data, meal_plan_data = DynamicPlanGenerator.generate_dynamic_plans(
-                user_id, workout_data
-            )
-            
-            print(f"[Workout] Plans generated successfully")
-            
-            # Save workout plan
-            start_date = datetime.utcnow().date()
-            end_date = start_date + timedelta(days=6)
-            
-            # Deactivate old workout plans
-            WeeklyWorkoutPlan.query.filter_by(user_id=user_id, is_active=True).update({'is_active': False})
-            
-            # Create new workout plan
-            workout_plan = WeeklyWorkoutPlan(
-                user_id=user_id,
-                start_date=start_date,
-                end_date=end_date,
-                plan_data=workout_plan_data,
-                is_active=True
-            )
-            db.session.add(workout_plan)
-            
-            # Deactivate old meal plans
-            WeeklyMealPlan.query.filter_by(user_id=user_id, is_active=True).update({'is_active': False})
-            
-            # Create new meal plan
-            meal_plan = WeeklyMealPlan(
-                user_id=user_id,
-                start_date=start_date,
-                end_date=end_date,
-                plan_data=meal_plan_data,
-                is_active=True
-            )
-            db.session.add(meal_plan)
-            
-            db.session.commit()
+            logger.debug("Workout data for plan generation: %s", workout_data)
             
-            print(f"[Workout] ✅ Dynamic plans saved successfully")
+            # Generate the plans off the request thread unless configured inline;
+            # inline, they're staged to commit together with the session below
+            if not regenerate_async:
+                _stage_plans(user_id, workout_data)
+                plans_staged = True
             
-        except Exception as plan_error:
-            print(f"[Workout] ⚠️ Error generating dynamic plans: {str(plan_error)}")
-            import traceback
-            print(f"[Workout] Traceback: {traceback.format_exc()}")
+        except Exception:
+            workout_data = None
             # Don't fail the workout completion if plan generation fails
-            pass
+            logger.exception("Error generating dynamic plans for user %s", user_id)
+        
+        # Session fields, plan deactivations and new plans in one commit
+        with no_expire_on_commit(db.session):
+            db.session.commit()
+        
+        if plans_staged:
+            invalidate_user_cache(user_id, CURRENT_WORKOUT_PLAN)
+            logger.debug("Dynamic plans saved for user %s", user_id)
+        elif regenerate_async and workout_data:
+            # The job reads the session's history, so it's queued after the commit
+            job_id = current_app.extensions['plan_jobs'].submit(_regenerate_plans_job, user_id, workout_data, owner=user_id)
+            logger.debug("Plan generation queued for user %s", user_id)
+        
+        invalidate_user_cache(user_id, PROGRESS_SUMMARY, PROGRESS_ACHIEVEMENTS, DYNAMIC_PLANS)
+        
+        # Session is saved; new plans are still being generated, poll the job for them
+        if job_id:
+            return jsonify({
+                'success': True,
+                'data': {'session': session.to_dict()},
+                'job_id': job_id,
+                'status': 'queued',
+                'status_url': f'/api/plans/workout/status/{job_id}',
+                'message': 'Workout completed! Your new personalized plans are being generated.'
+            }), 202
         
         return jsonify({
             'success': True,
@@ -224,10 +308,13 @@ def complete_session(session_id):
 def get_session(session_id):
     try:
         user_id = get_jwt_identity()
-        session = WorkoutSession.query.filter_by(session_id=session_id, user_id=user_id).first()
+        # Session plus one SELECT ... IN for its exercises; any other lazy load raises
+        session = WorkoutSession.query.options(selectinload(WorkoutSession.exercises), raiseload('*'))\
+            .filter_by(session_id=session_id, user_id=user_id)\
+            .first()
         
         if not session:
-            return jsonify({'success': False, 'error': 'Session not found'}), 404
+            return _session_not_found()
         
         return jsonify({
             'success': True,
@@ -242,21 +329,50 @@ def get_history():
     try:
         user_id = get_jwt_identity()
         limit = request.args.get('limit', 20, type=int)
-        offset = request.args.get('offset', 0, type=int)
-        
-        sessions = WorkoutSession.query.filter_by(user_id=user_id)\
-            .order_by(WorkoutSession.session_date.desc())\
-            .limit(limit)\
-            .offset(offset)\
-            .all()
+        cursor = request.args.get('cursor')
+        
+        query = WorkoutSession.query_columns().filter(WorkoutSession.user_id == user_id)
+        
+        # Keyset pagination: the cursor is the (session_date, session_id) of the last
+        # session on the previous page, so deep pages cost the same as the first.
+        # ?offset= is still honoured for older clients.
+        if cursor:
+            try:
+                cursor_date, cursor_id = _parse_history_cursor(cursor)
+            except ValueError:
+                return jsonify({'success': False, 'error': 'Invalid cursor'}), 400
+            query = query.filter(or_(
+                WorkoutSession.session_date < cursor_date,
+                and_(WorkoutSession.session_date == cursor_date, WorkoutSession.session_id < cursor_id)
+            ))
+        
+        query = query.order_by(WorkoutSession.session_date.desc(), WorkoutSession.session_id.desc())\
+            .limit(limit)
+        if not cursor:
+            query = query.offset(request.args.get('offset', 0, type=int))
+        rows = query.all()
+        
+        next_cursor = None
+        if rows and len(rows) == limit:
+            last = rows[-1]
+            next_cursor = f"{last.session_date.isoformat()}|{last.session_id}"
         
         return jsonify({
             'success': True,
-            'data': {'sessions': [s.to_dict() for s in sessions]}
+            'data': {
+                'sessions': WorkoutSession.rows_to_dicts(rows),
+                'next_cursor': next_cursor
+            }
         }), 200
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
+
+def _parse_history_cursor(cursor):
+    """Split a history cursor into (session_date, session_id); ValueError if malformed"""
+    session_date, _, session_id = cursor.partition('|')
+    return datetime.fromisoformat(session_date), str(uuid.UUID(session_id))
+
 @bp.route('/sessions/<session_id>', methods=['DELETE'])
 @jwt_required()
 def delete_session(session_id):
@@ -265,10 +381,11 @@ def delete_session(session_id):
         session = WorkoutSession.query.filter_by(session_id=session_id, user_id=user_id).first()
         
         if not session:
-            return jsonify({'success': False, 'error': 'Session not found'}), 404
+            return _session_not_found()
         
         db.session.delete(session)
         db.session.commit()
+        invalidate_user_cache(user_id, PROGRESS_SUMMARY, PROGRESS_ACHIEVEMENTS, DYNAMIC_PLANS)
         
         return jsonify({
             'success': True,
@@ -283,31 +400,20 @@ def delete_session(session_id):
 def log_exercise(session_id):
     try:
         user_id = get_jwt_identity()
-        session = WorkoutSession.query.filter_by(session_id=session_id, user_id=user_id).first()
+        if not WorkoutSession.is_owned_by(session_id, user_id):
+            return _session_not_found()
         
-        if not session:
-            return jsonify({'success': False, 'error': 'Session not found'}), 404
-        
-        data = request.get_json()
-        
-        print(f"[Exercise] 📝 Logging exercise for session {session_id}")
-        print(f"[Exercise] 📝 Exercise type from frontend: {data.get('exercise_type')}")
-        
-        exercise = ExerciseLog(
-            session_id=session_id,
-            exercise_type=data['exercise_type'],
-            sets=data.get('sets', 1),
-            correct_reps=data.get('correct_reps', 0),
-            incorrect_reps=data.get('incorrect_reps', 0),
-            total_reps=data.get('total_reps', 0),
-            avg_form_score=data.get('avg_form_score', 0),
-            duration_seconds=data.get('duration_seconds', 0),
-            calories_burned=data.get('calories_burned', 0),
-            posture_issues=data.get('posture_issues', [])
-        )
+        try:
+            exercise = _exercise_log(session_id, request.get_json(silent=True))
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        
+        logger.debug("Logging %r for session %s", exercise.exercise_type, session_id)
         
         db.session.add(exercise)
-        db.session.commit()
+        with no_expire_on_commit(db.session):
+            db.session.commit()
+        invalidate_user_cache(user_id, DYNAMIC_PLANS)
         
         return jsonify({
             'success': True,
@@ -317,15 +423,70 @@ def log_exercise(session_id):
         db.session.rollback()
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@bp.route('/sessions/<session_id>/exercises/bulk', methods=['POST'])
+@jwt_required()
+def log_exercises_bulk(session_id):
+    """
+    Log every exercise of a session in one request and one transaction
+    
+    Request Body:
+        {"exercises": [{"exercise_type": "squats", "total_reps": 12, ...}, ...]}  # fields as for /exercises
+    """
+    try:
+        user_id = get_jwt_identity()
+        if not WorkoutSession.is_owned_by(session_id, user_id):
+            return _session_not_found()
+        
+        entries = (request.get_json(silent=True) or {}).get('exercises')
+        
+        if not isinstance(entries, list) or not entries:
+            return jsonify({'success': False, 'error': 'exercises must be a non-empty list'}), 400
+        if len(entries) > BULK_EXERCISE_MAX_ENTRIES:
+            return jsonify({'success': False, 'error': f'At most {BULK_EXERCISE_MAX_ENTRIES} exercises per request'}), 400
+        
+        try:
+            exercises = [_exercise_log(session_id, entry) for entry in entries]
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        
+        logger.debug("Logging %s exercises for session %s", len(exercises), session_id)
+        
+        # One flush (batched INSERT) and one commit for the whole batch
+        db.session.add_all(exercises)
+        with no_expire_on_commit(db.session):
+            db.session.commit()
+        invalidate_user_cache(user_id, DYNAMIC_PLANS)
+        
+        return jsonify({
+            'success': True,
+            'data': {'exercises': [exercise.to_dict() for exercise in exercises]}
+        }), 201
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+def _exercise_log(session_id, data):
+    """Build an ExerciseLog from a request payload; ValueError if it's invalid or has no exercise_type"""
+    body = _parse_body(data, EXERCISE_LOG_FIELDS)
+    if not body.get('exercise_type'):
+        raise ValueError('exercise_type is required')
+    return ExerciseLog(session_id=session_id, **{**EXERCISE_LOG_DEFAULTS, 'posture_issues': [], **body})
+
 @bp.route('/exercises/types', methods=['GET'])
 @jwt_required()
 def get_exercise_types():
-    return jsonify({
+    # Static list: clients and proxies may reuse it for a day, then revalidate by ETag
+    response = jsonify({
         'success': True,
         'data': {
-            'types': ['squat', 'pushup', 'lunge', 'plank', 'deadlift']
+            'types': EXERCISE_TYPES
         }
-    }), 200
+    })
+    response.cache_control.public = True
+    response.cache_control.max_age = 86400
+    response.add_etag()
+    return response.make_conditional(request)
 
 @bp.route('/exercises/history/<exercise_type>', methods=['GET'])
 @jwt_required()
@@ -333,8 +494,8 @@ def get_exercise_history(exercise_type):
     try:
         user_id = get_jwt_identity()
         
-        exercises = db.session.query(ExerciseLog)\
-            .join(WorkoutSession)\
+        rows = ExerciseLog.query_columns()\
+            .join(WorkoutSession, WorkoutSession.session_id == ExerciseLog.session_id)\
             .filter(WorkoutSession.user_id == user_id)\
             .filter(ExerciseLog.exercise_type == exercise_type)\
             .order_by(WorkoutSession.session_date.desc())\
@@ -343,7 +504,7 @@ def get_exercise_history(exercise_type):
         
         return jsonify({
             'success': True,
-            'data': {'exercises': [ex.to_dict() for ex in exercises]}
+            'data': {'exercises': ExerciseLog.rows_to_dicts(rows)}
         }), 200
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -0,0 +1,101 @@
+"""
+Avatar Storage Service
+Stores profile pictures as files on disk and returns the URL to keep in the users table
+"""
+
+import base64
+import binascii
+import os
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'webp'}
+
+MIME_EXTENSIONS = {
+    'image/png': 'png',
+    'image/jpeg': 'jpg',
+    'image/jpg': 'jpg',
+    'image/gif': 'gif',
+    'image/webp': 'webp'
+}
+
+AVATAR_URL_PATH = '/api/users/avatars/'
+
+
+class AvatarError(ValueError):
+    """Raised when uploaded avatar data is invalid"""
+
+
+def is_data_url(value):
+    """True if value is an inline base64 data URL rather than a stored avatar URL"""
+    return isinstance(value, str) and value.startswith('data:')
+
+
+def save_avatar(user_id, image_bytes, extension, upload_dir, max_bytes, base_url=''):
+    """
+    Write avatar bytes to disk and return the URL to store on the user
+
+    Args:
+        user_id: Owner of the avatar (used in the filename)
+        image_bytes: Raw image bytes
+        extension: File extension without the dot
+        upload_dir: Directory avatars are written to
+        max_bytes: Maximum accepted size
+        base_url: Optional scheme+host prefix for absolute URLs
+    """
+    extension = (extension or '').lower().lstrip('.')
+    if extension == 'jpeg':
+        extension = 'jpg'
+    if extension not in ALLOWED_EXTENSIONS:
+        raise AvatarError(f'Unsupported image type: {extension or "unknown"}')
+    if not image_bytes:
+        raise AvatarError('Empty image')
+    if len(image_bytes) > max_bytes:
+        raise AvatarError(f'Image too large (max {max_bytes // (1024 * 1024)} MB)')
+
+    os.makedirs(upload_dir, exist_ok=True)
+    filename = f"{user_id}_{int(time.time() * 1000)}.{extension}"
+    with open(os.path.join(upload_dir, filename), 'wb') as f:
+        f.write(image_bytes)
+
+    logger.info("Saved avatar %s (%d bytes)", filename, len(image_bytes))
+    return f"{base_url.rstrip('/')}{AVATAR_URL_PATH}{filename}"
+
+
+def save_data_url(user_id, data_url, upload_dir, max_bytes, base_url=''):
+    """Decode a data:image/...;base64 URL and store it with save_avatar"""
+    try:
+        header, encoded = data_url.split(',', 1)
+        mime_type = header[len('data:'):].split(';', 1)[0]
+        image_bytes = base64.b64decode(encoded, validate=True)
+    except (ValueError, binascii.Error):
+        raise AvatarError('Invalid base64 image data')
+
+    return save_avatar(user_id, image_bytes, MIME_EXTENSIONS.get(mime_type), upload_dir, max_bytes, base_url)
+
+
+def _issued_filename(url):
+    """Filename of an avatar URL this service issued, or None for any other value"""
+    if not isinstance(url, str) or AVATAR_URL_PATH not in url:
+        return None
+    return os.path.basename(url.split(AVATAR_URL_PATH, 1)[1]) or None
+
+
+def is_own_avatar(url, user_id):
+    """True if url is an avatar this service stored for user_id"""
+    filename = _issued_filename(url)
+    return filename is not None and filename.startswith(f"{user_id}_")
+
+
+def delete_avatar(url, upload_dir, user_id):
+    """Remove user_id's stored avatar file; ignores URLs this service didn't issue to them"""
+    if not is_own_avatar(url, user_id):
+        return
+    file_path = os.path.join(upload_dir, _issued_filename(url))
+    try:
+        if os.path.isfile(file_path):
+            os.unlink(file_path)
+    except OSError as e:
+        logger.error("Error deleting avatar %s: %s", file_path, e)
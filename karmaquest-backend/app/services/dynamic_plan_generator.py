@@ -3,11 +3,66 @@ Dynamic Plan Generator - AI-driven workout and meal plan generation
 Generates personalized 7-day plans based on actual workout performance data
 """
 
+import logging
+import re
+from bisect import bisect_left, bisect_right
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, List, NamedTuple, Optional, Tuple
 import math
+from sqlalchemy import func
+from flask import current_app
 from app.models.workout import WorkoutSession, ExerciseLog
-from app.models.user import User
+from app.models.user import UserProfile
+from app.utils.cache import invalidate_user_cache, CURRENT_WORKOUT_PLAN, DYNAMIC_PLANS
+
+logger = logging.getLogger(__name__)
+
+
+# Scoring ladders as (ascending thresholds, values): a metric at or above the
+# i-th threshold earns values[i + 1], below the first it earns values[0]
+FREQUENCY_POINTS = ((6, 12, 20), (0, 10, 20, 30))        # Workouts in the last 30 days
+FORM_POINTS = ((65, 75, 85), (0, 10, 20, 30))            # Average form score
+VOLUME_POINTS = ((5, 10, 15), (0, 10, 15, 20))           # Reps in the latest workout
+EXPERIENCE_POINTS = ((5, 15, 30), (0, 10, 15, 20))       # Total workouts
+FITNESS_LEVELS = ((40, 70), ('beginner', 'intermediate', 'advanced'))
+
+# Workouts in the last 30 days -> activity multiplier:
+# sedentary, lightly (1-2/wk), moderately (3-4/wk), very active (5+/wk)
+ACTIVITY_MULTIPLIERS = ((6, 12, 20), (1.2, 1.375, 1.55, 1.725))
+# Calories per workout minute -> TDEE bonus; strictly above 6 is moderate, above 10 high
+INTENSITY_BONUS = ((6, 10), (0, 100, 200))
+
+
+# Exercise type -> plan category in one case-insensitive match. Words may be joined
+# by a space, underscore or hyphen, or run together, and plurals are optional.
+_EXERCISE_CATEGORY_RE = re.compile(
+    r'(?P<Push>push[ _-]?ups?|bench[ _-]?press|shoulder[ _-]?press|dips|tricep[ _-]?extensions?)'
+    r'|(?P<Pull>pull[ _-]?ups?|rows?|bent[ _-]?over[ _-]?row|lat[ _-]?pulldown|face[ _-]?pulls?|bicep[ _-]?curls?)'
+    r'|(?P<Legs>squats?|lunges?|leg[ _-]?press|deadlifts?)'
+    r'|(?P<Core>planks?|crunch(?:es)?|russian[ _-]?twists?|leg[ _-]?raises?)',
+    re.IGNORECASE
+)
+
+
+def exercise_category(exercise_type):
+    """Plan category (Push, Pull, Legs, Core) for an exercise type, 'Full Body' if unknown"""
+    match = _EXERCISE_CATEGORY_RE.fullmatch(exercise_type.strip())
+    return match.lastgroup if match else 'Full Body'
+
+
+def _ladder(ladder, value):
+    """Value of the highest threshold in ladder that value reaches"""
+    thresholds, values = ladder
+    return values[bisect_right(thresholds, value)]
+
+
+class VolumeAdjustment(NamedTuple):
+    """How one exercise's sets/reps differ from the day's base targets"""
+    notes: str
+    rep_factor: float = 1.0  # Scales base reps, floored at min_reps
+    min_reps: int = 0
+    extra_reps: int = 0
+    extra_sets: int = 0      # Added to base sets, capped at 5
 
 
 class DynamicPlanGenerator:
@@ -43,6 +98,62 @@ class DynamicPlanGenerator:
         }
     }
     
+    # Candidate exercises per category, primary before accessory
+    CATEGORY_EXERCISES = {
+        category: tuple(data['primary'] + data['accessory'])
+        for category, data in EXERCISE_DATABASE.items()
+    }
+    CATEGORY_PRIMARY = {
+        category: tuple(data['primary'])
+        for category, data in EXERCISE_DATABASE.items()
+    }
+    # Exercise name -> lowercase, underscore-separated form matched against weaknesses
+    NORMALIZED_EXERCISE_NAMES = {
+        name: name.lower().replace(' ', '_').replace('-', '_')
+        for names in CATEGORY_EXERCISES.values()
+        for name in names
+    }
+    
+    # Lowercase exercise name -> adjustment when it's picked to train a weakness
+    WEAKNESS_ADJUSTMENTS = {
+        'squats': VolumeAdjustment('🏋️ Heavy compound - focus on explosive power', 0.75, 6, extra_sets=1),
+        'deadlifts': VolumeAdjustment('🏋️ Heavy compound - focus on explosive power', 0.75, 6, extra_sets=1),
+        'pull-ups': VolumeAdjustment('🎯 Use assistance if needed - full range of motion', 0.6, 5),
+        'dips': VolumeAdjustment('🎯 Use assistance if needed - full range of motion', 0.6, 5),
+    }
+    WEAKNESS_DEFAULT = VolumeAdjustment('💪 Focus on form and control')
+    
+    # Lowercase exercise name -> adjustment when it's picked as a primary exercise
+    PRIMARY_ADJUSTMENTS = {
+        'squats': VolumeAdjustment('🏋️ Compound movement - control the weight', 0.75, 6, extra_sets=1),
+        'deadlifts': VolumeAdjustment('🏋️ Compound movement - control the weight', 0.75, 6, extra_sets=1),
+        'bench press': VolumeAdjustment('🏋️ Compound movement - control the weight', 0.75, 6, extra_sets=1),
+        'push-ups': VolumeAdjustment('✅ Full range of motion, squeeze at the top'),
+        'pull-ups': VolumeAdjustment('✅ Full range of motion, squeeze at the top'),
+    }
+    PRIMARY_ISOLATION = VolumeAdjustment('🎯 Isolation - squeeze at peak contraction', extra_reps=2)
+    PRIMARY_DEFAULT = VolumeAdjustment('💪 Maintain proper form')
+    
+    # Each exercise category gets a different starting point for meal rotation
+    MEAL_ROTATION_OFFSETS = {
+        'Push': 0,
+        'Pull': 1,
+        'Legs': 2,
+        'Core': 3,
+        'Full Body': 4
+    }
+    
+    # Workout day type -> categories trained that day
+    WORKOUT_TYPE_CATEGORIES = {
+        'full': ('Push', 'Pull', 'Legs', 'Core'),
+        'upper': ('Push', 'Pull'),
+        'lower': ('Legs', 'Core'),
+        'push': ('Push',),
+        'pull': ('Pull',),
+        'legs': ('Legs', 'Core')
+    }
+    
+    
     @classmethod
     def generate_plans_from_workout(cls, user_id: str) -> Dict:
         """
@@ -58,15 +169,29 @@ class DynamicPlanGenerator:
             }
         """
         from app import db
-        from app.models.plan import WeeklyWorkoutPlan, WeeklyMealPlan
         
-        # Get most recent completed workout
-        latest_session = WorkoutSession.query.filter_by(user_id=user_id)\
-            .order_by(WorkoutSession.session_date.desc())\
+        # Most recent workout and its first logged exercise, as one row of just the
+        # columns used. The outer join keeps an exercise-less latest session from
+        # falling through to an older one; log ids are strictly increasing (even within
+        # one bulk insert), so the first log is the first exercise recorded. The fitness goal rides along for the cache tag.
+        goal_subquery = UserProfile.query.with_entities(UserProfile.fitness_goal)\
+            .filter_by(user_id=user_id).scalar_subquery()
+        latest_session = db.session.query(
+            WorkoutSession.session_id,
+            WorkoutSession.total_reps,
+            WorkoutSession.avg_posture_score,
+            WorkoutSession.duration_seconds,
+            WorkoutSession.total_calories,
+            ExerciseLog.exercise_type,
+            ExerciseLog.sets,
+            goal_subquery.label('fitness_goal')
+        ).outerjoin(ExerciseLog, ExerciseLog.session_id == WorkoutSession.session_id)\
+            .filter(WorkoutSession.user_id == user_id)\
+            .order_by(WorkoutSession.session_date.desc(), ExerciseLog.log_id)\
             .first()
         
-        if not latest_session or not latest_session.exercises:
-            print(f"[DynamicPlan] No workout history found for user {user_id}")
+        if not latest_session or latest_session.exercise_type is None:
+            logger.debug("No workout history found for user %s", user_id)
             return {
                 'success': False,
                 'workout_plan': None,
@@ -75,85 +200,43 @@ class DynamicPlanGenerator:
             }
         
         # Extract workout data from latest session
-        primary_exercise = latest_session.exercises[0]
-        
-        # Map exercise to category
-        exercise_category_map = {
-            # Push exercises
-            'pushups': 'Push', 'push-ups': 'Push', 'push_ups': 'Push',
-            'bench_press': 'Push', 'benchpress': 'Push',
-            'shoulder_press': 'Push', 'shoulderpress': 'Push',
-            'dips': 'Push', 'tricep_extensions': 'Push', 'tricep_extension': 'Push',
-            # Pull exercises
-            'pullups': 'Pull', 'pull-ups': 'Pull', 'pull_ups': 'Pull',
-            'rows': 'Pull', 'row': 'Pull', 'bent_over_row': 'Pull',
-            'lat_pulldown': 'Pull', 'latpulldown': 'Pull',
-            'face_pulls': 'Pull', 'facepulls': 'Pull', 'face_pull': 'Pull',
-            'bicep_curls': 'Pull', 'bicep_curl': 'Pull', 'bicepcurls': 'Pull',
-            # Legs exercises
-            'squats': 'Legs', 'squat': 'Legs',
-            'lunges': 'Legs', 'lunge': 'Legs',
-            'leg_press': 'Legs', 'legpress': 'Legs',
-            'deadlifts': 'Legs', 'deadlift': 'Legs',
-            # Core exercises
-            'plank': 'Core', 'planks': 'Core',
-            'crunches': 'Core', 'crunch': 'Core',
-            'russian_twists': 'Core', 'russian_twist': 'Core', 'russiantwists': 'Core',
-            'leg_raises': 'Core', 'leg_raise': 'Core', 'legraises': 'Core'
-        }
-        
         workout_data = {
             'total_reps': latest_session.total_reps or 0,
-            'sets': primary_exercise.sets or 1,
+            'sets': latest_session.sets or 1,
             'form_score': latest_session.avg_posture_score or 70,
             'duration_seconds': latest_session.duration_seconds or 0,
             'calories_burned': latest_session.total_calories or 0,
-            'exercise_type': primary_exercise.exercise_type,
-            'exercise_category': exercise_category_map.get(
-                primary_exercise.exercise_type.lower().replace(' ', '_'), 
-                'Full Body'
-            )
+            'exercise_type': latest_session.exercise_type,
+            'exercise_category': exercise_category(latest_session.exercise_type)
         }
         
-        print(f"[DynamicPlan] 🎯 Latest workout: {primary_exercise.exercise_type}")
-        print(f"[DynamicPlan] 🎯 Category: {workout_data['exercise_category']}")
-        print(f"[DynamicPlan] Generating plans from workout data: {workout_data}")
+        logger.debug("Generating plans for user %s from %s workout: %s",
+                     user_id, workout_data['exercise_category'], workout_data)
+        
+        # Generate plans, reusing the last build while the latest session and the goal
+        # are unchanged. The tag is checked on every hit, so a goal change is noticed even
+        # by workers whose entry wasn't dropped via invalidate_user_cache()
+        store = current_app.extensions['user_cache']
+        cache_key = (DYNAMIC_PLANS, user_id)
+        cache_tag = (latest_session.session_id, latest_session.fitness_goal)
+        cached = store.get(cache_key)
         
-        # Generate plans
         try:
-            workout_plan_data, meal_plan_data = cls.generate_dynamic_plans(user_id, workout_data)
-            
-            # Save to database
-            start_date = datetime.utcnow().date()
-            end_date = start_date + timedelta(days=6)
-            
-            # Deactivate old plans
-            WeeklyWorkoutPlan.query.filter_by(user_id=user_id, is_active=True).update({'is_active': False})
-            WeeklyMealPlan.query.filter_by(user_id=user_id, is_active=True).update({'is_active': False})
-            
-            # Create new workout plan
-            workout_plan = WeeklyWorkoutPlan(
-                user_id=user_id,
-                start_date=start_date,
-                end_date=end_date,
-                plan_data=workout_plan_data,
-                is_active=True
-            )
-            db.session.add(workout_plan)
-            
-            # Create new meal plan
-            meal_plan = WeeklyMealPlan(
-                user_id=user_id,
-                start_date=start_date,
-                end_date=end_date,
-                plan_data=meal_plan_data,
-                is_active=True
-            )
-            db.session.add(meal_plan)
+            if cached is not None and cached[0] == cache_tag:
+                # Stored serialized so every new plan row gets its own copy
+                workout_plan_data, meal_plan_data = current_app.json.loads(cached[1])
+            else:
+                workout_plan_data, meal_plan_data = cls.generate_dynamic_plans(user_id, workout_data)
+                store.set(cache_key, (
+                    cache_tag,
+                    current_app.json.dumps([workout_plan_data, meal_plan_data])
+                ))
             
+            # Old pair deactivated and new pair saved in one commit
+            workout_plan, meal_plan = cls.stage_plans(user_id, workout_plan_data, meal_plan_data)
             db.session.commit()
             
-            print(f"[DynamicPlan] ✅ Plans generated and saved successfully")
+            logger.debug("Plans generated and saved for user %s", user_id)
             
             return {
                 'success': True,
@@ -164,9 +247,7 @@ class DynamicPlanGenerator:
             
         except Exception as e:
             db.session.rollback()
-            print(f"[DynamicPlan] ❌ Error generating plans: {str(e)}")
-            import traceback
-            print(f"[DynamicPlan] Traceback: {traceback.format_exc()}")
+            logger.exception("Error generating plans for user %s", user_id)
             return {
                 'success': False,
                 'workout_plan': None,
@@ -174,6 +255,56 @@ class DynamicPlanGenerator:
                 'message': f'Error generating plans: {str(e)}'
             }
     
+    @classmethod
+    def generate_plans_batch(cls, user_ids: List[str]) -> Dict[str, str]:
+        """
+        Queue generate_plans_from_workout for many users (admin or scheduled
+        regeneration) on the plan job pool. Each job runs in its own app context
+        and session; the pool's worker count bounds how many hit the database at once.
+        
+        Returns:
+            {user_id: job_id} - poll with current_app.extensions['plan_jobs'].get(job_id)
+        """
+        jobs = current_app.extensions['plan_jobs']
+        return {user_id: jobs.submit(_regenerate_plans_job, user_id, owner=user_id) for user_id in user_ids}
+    
+    @classmethod
+    def stage_plans(cls, user_id: str, workout_plan_data: Dict, meal_plan_data: Dict) -> Tuple:
+        """
+        Stage new 7-day workout and meal plans as the user's active ones,
+        deactivating the old pair; the caller commits
+        
+        Returns:
+            (WeeklyWorkoutPlan, WeeklyMealPlan)
+        """
+        from app import db
+        from app.models.plan import WeeklyWorkoutPlan, WeeklyMealPlan
+        
+        start_date = datetime.utcnow().date()
+        end_date = start_date + timedelta(days=6)
+        
+        # Deactivations run now, the inserts flush at commit - after them, as the
+        # one-active-plan-per-user index requires
+        WeeklyWorkoutPlan.deactivate_for(user_id)
+        WeeklyMealPlan.deactivate_for(user_id)
+        
+        workout_plan = WeeklyWorkoutPlan(
+            user_id=user_id,
+            start_date=start_date,
+            end_date=end_date,
+            plan_data=workout_plan_data,
+            is_active=True
+        )
+        meal_plan = WeeklyMealPlan(
+            user_id=user_id,
+            start_date=start_date,
+            end_date=end_date,
+            plan_data=meal_plan_data,
+            is_active=True
+        )
+        db.session.add_all([workout_plan, meal_plan])
+        return workout_plan, meal_plan
+    
     @classmethod
     def generate_dynamic_plans(cls, user_id: str, workout_data: Dict) -> Tuple[Dict, Dict]:
         """
@@ -210,17 +341,25 @@ class DynamicPlanGenerator:
     def _analyze_fitness_profile(cls, user_id: str, latest_workout: Dict) -> Dict:
         """Analyze user's fitness level and capabilities from workout history"""
         
-        # Get recent workout history (last 30 days)
-        recent_sessions = WorkoutSession.query.filter_by(user_id=user_id)\
-            .filter(WorkoutSession.session_date >= datetime.utcnow() - timedelta(days=30))\
-            .order_by(WorkoutSession.session_date.desc())\
-            .all()
+        # Aggregate recent workout history (last 30 days) in the database;
+        # missing scores/calories/durations count as 0, as in the per-session averages.
+        # The user's fitness goal rides along as a scalar subquery, saving a round trip
+        since = datetime.utcnow() - timedelta(days=30)
+        goal_subquery = UserProfile.query.with_entities(UserProfile.fitness_goal)\
+            .filter_by(user_id=user_id).scalar_subquery()
+        num_sessions, total_form, total_calories, total_duration, fitness_goal = WorkoutSession.query.with_entities(
+            func.count(),
+            func.coalesce(func.sum(WorkoutSession.avg_posture_score), 0),
+            func.coalesce(func.sum(WorkoutSession.total_calories), 0),
+            func.coalesce(func.sum(WorkoutSession.duration_seconds), 0),
+            goal_subquery
+        ).filter(WorkoutSession.user_id == user_id, WorkoutSession.session_date >= since).one()
         
         # Initialize profile with latest workout data
         profile = {
             'user_id': user_id,
             'latest_workout': latest_workout,
-            'total_workouts': len(recent_sessions),
+            'total_workouts': num_sessions,
             'avg_form_score': latest_workout.get('form_score', 70),
             'avg_calories_per_workout': latest_workout.get('calories_burned', 100),
             'avg_duration': latest_workout.get('duration_seconds', 300),
@@ -234,43 +373,24 @@ class DynamicPlanGenerator:
             'fitness_goal': 'maintenance'
         }
         
-        if not recent_sessions:
+        if not num_sessions:
             return profile
         
-        # Calculate averages from history
-        total_form = 0
-        total_calories = 0
-        total_duration = 0
-        exercise_performance = {}
-        
-        for session in recent_sessions:
-            if session.avg_posture_score:
-                total_form += session.avg_posture_score
-            if session.total_calories:
-                total_calories += session.total_calories
-            if session.duration_seconds:
-                total_duration += session.duration_seconds
-            
-            # Track performance by exercise
-            for exercise in session.exercises:
-                ex_type = exercise.exercise_type
-                if ex_type not in exercise_performance:
-                    exercise_performance[ex_type] = {
-                        'count': 0,
-                        'total_reps': 0,
-                        'total_sets': 0,
-                        'avg_form': 0
-                    }
-                exercise_performance[ex_type]['count'] += 1
-                exercise_performance[ex_type]['total_reps'] += exercise.total_reps or 0
-                exercise_performance[ex_type]['total_sets'] += exercise.sets or 0
-                exercise_performance[ex_type]['avg_form'] += exercise.avg_form_score or 0
+        # Per-exercise totals over the same sessions: (type, count, summed form score)
+        exercise_performance = ExerciseLog.query.with_entities(
+            ExerciseLog.exercise_type,
+            func.count(),
+            func.coalesce(func.sum(ExerciseLog.avg_form_score), 0)
+        ).join(WorkoutSession, ExerciseLog.session_id == WorkoutSession.session_id)\
+            .filter(WorkoutSession.user_id == user_id, WorkoutSession.session_date >= since)\
+            .group_by(ExerciseLog.exercise_type)\
+            .order_by(ExerciseLog.exercise_type)\
+            .all()
         
         # Calculate averages
-        num_sessions = len(recent_sessions)
-        profile['avg_form_score'] = total_form / num_sessions if num_sessions > 0 else 70
-        profile['avg_calories_per_workout'] = total_calories / num_sessions if num_sessions > 0 else 100
-        profile['avg_duration'] = total_duration / num_sessions if num_sessions > 0 else 300
+        profile['avg_form_score'] = total_form / num_sessions
+        profile['avg_calories_per_workout'] = total_calories / num_sessions
+        profile['avg_duration'] = total_duration / num_sessions
         profile['workout_frequency'] = num_sessions  # Last 30 days
         
         # Determine fitness level based on multiple factors
@@ -282,16 +402,15 @@ class DynamicPlanGenerator:
         )
         
         # Identify strengths and weaknesses
-        for ex_type, perf in exercise_performance.items():
-            avg_form = perf['avg_form'] / perf['count'] if perf['count'] > 0 else 0
-            avg_reps = perf['total_reps'] / perf['count'] if perf['count'] > 0 else 0
+        for ex_type, count, form_total in exercise_performance:
+            avg_form = form_total / count
             
             if avg_form >= 85:
                 profile['strengths'].append(ex_type)
             elif avg_form < 60:
                 profile['weaknesses'].append(ex_type)
             
-            if perf['count'] >= 5:
+            if count >= 5:
                 profile['preferred_exercises'].append(ex_type)
         
         # Determine intensity level
@@ -309,10 +428,7 @@ class DynamicPlanGenerator:
             profile['avg_duration']
         )
         
-        # Get user's fitness goal from profile
-        user = User.query.get(user_id)
-        if user and user.profile:
-            profile['fitness_goal'] = user.profile.fitness_goal or 'maintenance'
+        profile['fitness_goal'] = fitness_goal or 'maintenance'
         
         return profile
     
@@ -320,47 +436,13 @@ class DynamicPlanGenerator:
     def _determine_fitness_level(cls, total_workouts: int, avg_form: float, 
                                  frequency: int, latest_reps: int) -> str:
         """Determine fitness level from multiple metrics"""
-        score = 0
-        
-        # Workout consistency (0-30 points)
-        if frequency >= 20:
-            score += 30
-        elif frequency >= 12:
-            score += 20
-        elif frequency >= 6:
-            score += 10
-        
-        # Form quality (0-30 points)
-        if avg_form >= 85:
-            score += 30
-        elif avg_form >= 75:
-            score += 20
-        elif avg_form >= 65:
-            score += 10
-        
-        # Performance volume (0-20 points)
-        if latest_reps >= 15:
-            score += 20
-        elif latest_reps >= 10:
-            score += 15
-        elif latest_reps >= 5:
-            score += 10
-        
-        # Total experience (0-20 points)
-        if total_workouts >= 30:
-            score += 20
-        elif total_workouts >= 15:
-            score += 15
-        elif total_workouts >= 5:
-            score += 10
-        
-        # Determine level
-        if score >= 70:
-            return 'advanced'
-        elif score >= 40:
-            return 'intermediate'
-        else:
-            return 'beginner'
+        score = (
+            _ladder(FREQUENCY_POINTS, frequency)            # Workout consistency (0-30 points)
+            + _ladder(FORM_POINTS, avg_form)                # Form quality (0-30 points)
+            + _ladder(VOLUME_POINTS, latest_reps)           # Performance volume (0-20 points)
+            + _ladder(EXPERIENCE_POINTS, total_workouts)    # Total experience (0-20 points)
+        )
+        return _ladder(FITNESS_LEVELS, score)
     
     @classmethod
     def _calculate_tdee(cls, avg_calories_per_workout: float, 
@@ -370,25 +452,13 @@ class DynamicPlanGenerator:
         bmr = 1800  # Average BMR
         
         # Activity factor based on workout frequency (last 30 days)
-        if workout_frequency >= 20:  # 5+ times per week
-            activity_multiplier = 1.725  # Very active
-        elif workout_frequency >= 12:  # 3-4 times per week
-            activity_multiplier = 1.55  # Moderately active
-        elif workout_frequency >= 6:  # 1-2 times per week
-            activity_multiplier = 1.375  # Lightly active
-        else:
-            activity_multiplier = 1.2  # Sedentary
-        
-        # Calculate TDEE
-        tdee = bmr * activity_multiplier
+        tdee = bmr * _ladder(ACTIVITY_MULTIPLIERS, workout_frequency)
         
         # Adjust for workout intensity (calories per minute)
         if avg_duration > 0:
             calories_per_minute = avg_calories_per_workout / (avg_duration / 60)
-            if calories_per_minute > 10:  # High intensity
-                tdee += 200
-            elif calories_per_minute > 6:  # Moderate intensity
-                tdee += 100
+            thresholds, bonuses = INTENSITY_BONUS
+            tdee += bonuses[bisect_left(thresholds, calories_per_minute)]
         
         return int(tdee)
     
@@ -397,15 +467,18 @@ class DynamicPlanGenerator:
         """Generate personalized 7-day workout plan"""
         fitness_level = profile['fitness_level']
         latest_workout = profile['latest_workout']
-        exercise_type = latest_workout.get('exercise_type', 'squats')
+        # Read the latest workout's fields once; the day loop below reuses them
+        exercise_type = latest_workout.get('exercise_type')
         exercise_category = latest_workout.get('exercise_category', 'Legs')
+        current_sets = latest_workout.get('sets', 3)
+        current_reps = latest_workout.get('total_reps', 10)
+        form_score = latest_workout.get('form_score', 70)
+        strengths = profile['strengths']
+        weaknesses = profile['weaknesses']
         
         # Determine sets and reps based on performance
         base_sets, base_reps = cls._calculate_volume_targets(
-            fitness_level,
-            latest_workout.get('sets', 3),
-            latest_workout.get('total_reps', 10),
-            latest_workout.get('form_score', 70)
+            fitness_level, current_sets, current_reps, form_score
         )
         
         # Create 7-day plan
@@ -413,7 +486,7 @@ class DynamicPlanGenerator:
         plan_data = {'days': []}
         
         # 🎯 PERSONALIZE workout split based on exercise category completed
-        print(f"[WorkoutPlan] 🎯 Personalizing workout plan based on category: {exercise_category}")
+        logger.debug("Personalizing workout plan based on category: %s", exercise_category)
         
         # Workout split based on fitness level AND exercise category
         if fitness_level == 'beginner':
@@ -455,7 +528,7 @@ class DynamicPlanGenerator:
             else:  # Full Body
                 workout_pattern = ['push', 'pull', 'legs', 'push', 'pull', 'rest', 'active']
         
-        print(f"[WorkoutPlan] Workout pattern: {workout_pattern}")
+        logger.debug("Workout pattern: %s", workout_pattern)
         
         for day_idx, day_name in enumerate(days):
             workout_type = workout_pattern[day_idx]
@@ -481,8 +554,7 @@ class DynamicPlanGenerator:
                 # Generate workout for this day
                 exercises = cls._generate_day_exercises(
                     workout_type, fitness_level, base_sets, base_reps,
-                    profile['strengths'], profile['weaknesses'],
-                    latest_workout.get('exercise_type')
+                    strengths, weaknesses, exercise_type
                 )
                 
                 plan_data['days'].append({
@@ -529,18 +601,9 @@ class DynamicPlanGenerator:
                                 weaknesses: List, recent_exercise: Optional[str]) -> List[Dict]:
         """Generate 3-5 exercises per day ONLY - spread workouts across the week"""
         exercises = []
+        weak_tokens = {w.lower() for w in weaknesses}
         
-        # Map workout types to categories
-        type_category_map = {
-            'full': ['Push', 'Pull', 'Legs', 'Core'],
-            'upper': ['Push', 'Pull'],
-            'lower': ['Legs', 'Core'],
-            'push': ['Push'],
-            'pull': ['Pull'],
-            'legs': ['Legs', 'Core']
-        }
-        
-        categories = type_category_map.get(workout_type, ['Push'])
+        categories = cls.WORKOUT_TYPE_CATEGORIES.get(workout_type, ('Push',))
         
         # LIMIT: Only 3-5 exercises total per day (not per category!)
         max_exercises = 3 if fitness_level == 'beginner' else (4 if fitness_level == 'intermediate' else 5)
@@ -554,10 +617,8 @@ class DynamicPlanGenerator:
                 break
                 
             # Select exercises from category
-            category_exercises = cls.EXERCISE_DATABASE.get(category, {})
-            primary = category_exercises.get('primary', [])
-            accessory = category_exercises.get('accessory', [])
-            all_exercises = primary + accessory
+            primary = cls.CATEGORY_PRIMARY.get(category, ())
+            all_exercises = cls.CATEGORY_EXERCISES.get(category, ())
             
             # Add 1-2 exercises from this category
             category_limit = min(exercises_per_category, max_exercises - exercises_added)
@@ -568,27 +629,14 @@ class DynamicPlanGenerator:
                 if added_from_category >= category_limit:
                     break
                     
-                ex_lower = exercise.lower().replace(' ', '_').replace('-', '_')
+                ex_normalized = cls.NORMALIZED_EXERCISE_NAMES[exercise]
                 
                 # Prioritize exercises in weakness list
-                if any(w.lower() in ex_lower for w in weaknesses):
-                    sets = base_sets
-                    reps = base_reps
-                    
-                    # Adjust based on exercise type
-                    if exercise.lower() in ['squats', 'deadlifts']:
-                        reps = max(int(base_reps * 0.75), 6)
-                        sets = min(base_sets + 1, 5)
-                        notes = '🏋️ Heavy compound - focus on explosive power'
-                    elif exercise.lower() in ['pull-ups', 'dips']:
-                        reps = max(int(base_reps * 0.6), 5)
-                        notes = '🎯 Use assistance if needed - full range of motion'
-                    elif exercise.lower() == 'plank':
-                        reps = 1
-                        sets = 3
-                        notes = f'⏱️ Hold for {30 + (fitness_level == "advanced") * 20} seconds'
-                    else:
-                        notes = '💪 Focus on form and control'
+                if any(token in ex_normalized for token in weak_tokens):
+                    sets, reps, notes = cls._adjust_volume(
+                        exercise, cls.WEAKNESS_ADJUSTMENTS.get(exercise.lower(), cls.WEAKNESS_DEFAULT),
+                        base_sets, base_reps, fitness_level
+                    )
                     
                     exercises.append({
                         'name': exercise,
@@ -607,25 +655,12 @@ class DynamicPlanGenerator:
                     if exercises_added >= max_exercises:
                         break
                         
-                    sets = base_sets
-                    reps = base_reps
-                    
-                    # Adjust based on exercise type
-                    if exercise.lower() in ['squats', 'deadlifts', 'bench press']:
-                        reps = max(int(base_reps * 0.75), 6)
-                        sets = min(base_sets + 1, 5)
-                        notes = '🏋️ Compound movement - control the weight'
-                    elif exercise.lower() in ['push-ups', 'pull-ups']:
-                        notes = '✅ Full range of motion, squeeze at the top'
-                    elif exercise.lower() == 'plank':
-                        reps = 1
-                        sets = 3
-                        notes = f'⏱️ Hold for {30 + (fitness_level == "advanced") * 20} seconds'
-                    elif 'curl' in exercise.lower() or 'extension' in exercise.lower():
-                        reps = base_reps + 2
-                        notes = '🎯 Isolation - squeeze at peak contraction'
-                    else:
-                        notes = '💪 Maintain proper form'
+                    name = exercise.lower()
+                    adjustment = cls.PRIMARY_ADJUSTMENTS.get(name)
+                    if adjustment is None:
+                        isolation = 'curl' in name or 'extension' in name
+                        adjustment = cls.PRIMARY_ISOLATION if isolation else cls.PRIMARY_DEFAULT
+                    sets, reps, notes = cls._adjust_volume(exercise, adjustment, base_sets, base_reps, fitness_level)
                     
                     exercises.append({
                         'name': exercise,
@@ -640,6 +675,21 @@ class DynamicPlanGenerator:
         
         return exercises
     
+    @classmethod
+    def _adjust_volume(cls, exercise: str, adjustment: VolumeAdjustment, base_sets: int,
+                       base_reps: int, fitness_level: str) -> Tuple[int, int, str]:
+        """Apply an exercise's adjustment to the base targets; returns (sets, reps, notes)"""
+        if exercise.lower() == 'plank':
+            # Timed hold rather than reps
+            return 3, 1, f'⏱️ Hold for {30 + (fitness_level == "advanced") * 20} seconds'
+        
+        reps = base_reps
+        if adjustment.rep_factor != 1.0:
+            reps = max(int(base_reps * adjustment.rep_factor), adjustment.min_reps)
+        reps += adjustment.extra_reps
+        sets = min(base_sets + adjustment.extra_sets, 5) if adjustment.extra_sets else base_sets
+        return sets, reps, adjustment.notes
+    
     @classmethod
     def _generate_workout_notes(cls, workout_type: str, fitness_level: str) -> str:
         """Generate helpful notes for the workout day"""
@@ -669,20 +719,12 @@ class DynamicPlanGenerator:
         latest_workout = profile['latest_workout']
         exercise_category = latest_workout.get('exercise_category', 'Full Body')
         
-        print(f"[MealPlan] 🍽️ Generating meal plan for exercise_category: {exercise_category}")
-        print(f"[MealPlan] Latest workout data: {latest_workout}")
+        logger.debug("Generating meal plan for category %s from workout: %s", exercise_category, latest_workout)
         
         # Use exercise category to create variety in meal selection
-        # Each category gets a different starting point for meal rotation
-        category_offset = {
-            'Push': 0,
-            'Pull': 1,
-            'Legs': 2,
-            'Core': 3,
-            'Full Body': 4
-        }.get(exercise_category, 0)
+        category_offset = cls.MEAL_ROTATION_OFFSETS.get(exercise_category, 0)
         
-        print(f"[MealPlan] Category offset: {category_offset} (Push=0, Pull=1, Legs=2, Core=3)")
+        logger.debug("Category offset: %s (Push=0, Pull=1, Legs=2, Core=3)", category_offset)
         
         # Adjust calories based on fitness goal
         if fitness_goal == 'weight_loss':
@@ -1044,3 +1086,18 @@ class DynamicPlanGenerator:
         
         meal_idx = day_idx % len(snack_options)
         return snack_options[meal_idx]
+
+
+def _regenerate_plans_job(user_id):
+    """Plan job for generate_plans_batch(); the result holds ids, not ORM objects"""
+    result = DynamicPlanGenerator.generate_plans_from_workout(user_id)
+    if not result['success']:
+        return {'success': False, 'message': result['message']}
+    
+    invalidate_user_cache(user_id, CURRENT_WORKOUT_PLAN)
+    return {
+        'success': True,
+        'workout_plan_id': result['workout_plan'].plan_id,
+        'meal_plan_id': result['meal_plan'].meal_plan_id,
+        'message': result['message']
+    }
@@ -0,0 +1,59 @@
+"""
+Background Jobs
+Small in-process job queue for work that shouldn't hold a request open
+(video processing, plan generation). Clients poll a status endpoint.
+"""
+
+import logging
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app
+
+from app.utils.cache import TTLStore
+
+logger = logging.getLogger(__name__)
+
+
+class JobQueue:
+    """
+    Runs callables on a thread pool inside an app context.
+    Jobs move through queued -> processing -> completed/failed and are kept
+    for job_ttl seconds (at most max_tracked at once). A job counts as failed if it raises or returns a
+    dict with success=False; the returned dict is exposed as the job result.
+    """
+
+    def __init__(self, name, max_workers, job_ttl, max_tracked=1024):
+        self.name = name
+        # Threads are started lazily on the first submit
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f'{name}-job')
+        self._jobs = TTLStore(maxsize=max_tracked, ttl=job_ttl)
+
+    def submit(self, fn, *args, owner=None):
+        """Queue fn(*args); owner (e.g. a user_id) is stored so status routes can check access"""
+        app = current_app._get_current_object()
+        job_id = uuid.uuid4().hex
+        self._jobs.set(job_id, {'job_id': job_id, 'status': 'queued', 'owner': owner})
+        self._executor.submit(self._run, app, job_id, owner, fn, args)
+        logger.info("Queued %s job %s", self.name, job_id)
+        return job_id
+
+    def get(self, job_id, owner=None):
+        """Job state as a dict, or None if unknown, expired or owned by someone else"""
+        job = self._jobs.get(job_id)
+        if job is None or (owner is not None and job['owner'] != owner):
+            return None
+        return {key: value for key, value in job.items() if key != 'owner'}
+
+    def _run(self, app, job_id, owner, fn, args):
+        self._jobs.set(job_id, {'job_id': job_id, 'status': 'processing', 'owner': owner})
+        with app.app_context():
+            try:
+                result = fn(*args)
+                failed = isinstance(result, dict) and result.get('success') is False
+                status = 'failed' if failed else 'completed'
+            except Exception as e:
+                logger.exception("%s job %s failed", self.name, job_id)
+                result, status = {'success': False, 'error': str(e)}, 'failed'
+
+        self._jobs.set(job_id, {'job_id': job_id, 'status': status, 'owner': owner, 'result': result})
@@ -1,9 +1,12 @@
 from datetime import datetime, timedelta
+import logging
 import random
 from sqlalchemy import func
 from app import db
 from app.models.workout import WorkoutSession, ExerciseLog
 
+logger = logging.getLogger(__name__)
+
 class PlanGeneratorService:
     
     EXERCISES = {
@@ -82,56 +85,53 @@ class PlanGeneratorService:
             if not start_date:
                 start_date = datetime.utcnow().date()
             
-            print(f"[PlanGen] Starting plan generation for date: {start_date}")
+            logger.debug("Starting plan generation for date: %s", start_date)
             
             # Get user's workout history to personalize plan
             user_id = getattr(user_profile, 'user_id', None)
-            recent_sessions = []
+            total_workouts = 0
+            avg_form_score = 0
+            frequently_done_exercises = []
             
             if user_id:
                 try:
-                    print(f"[PlanGen] Fetching workout history for user: {user_id}")
-                    recent_sessions = WorkoutSession.query.filter_by(user_id=user_id)\
+                    logger.debug("Fetching workout history for user: %s", user_id)
+                    # Count and average form of the 10 latest sessions in one aggregate;
+                    # unscored (0/NULL) sessions are left out of the average
+                    recent_sessions = WorkoutSession.query.with_entities(WorkoutSession.avg_posture_score)\
+                        .filter_by(user_id=user_id)\
                         .order_by(WorkoutSession.session_date.desc())\
                         .limit(10)\
-                        .all()
-                    print(f"[PlanGen] Found {len(recent_sessions)} recent sessions")
-                except Exception as e:
-                    print(f"[PlanGen] Error fetching workout sessions: {e}")
-                    recent_sessions = []
-            
-            # Analyze workout history
-            total_workouts = len(recent_sessions)
-            avg_form_score = 0
-            frequently_done_exercises = []
+                        .subquery()
+                    total_workouts, avg_form_score = db.session.query(
+                        func.count(),
+                        func.avg(func.nullif(recent_sessions.c.avg_posture_score, 0))
+                    ).one()
+                    avg_form_score = avg_form_score or 0
+                    logger.debug("Found %s recent sessions", total_workouts)
+                except Exception:
+                    logger.exception("Error fetching workout sessions for user %s", user_id)
             
-            if recent_sessions:
-                # Calculate average form score
-                form_scores = [s.avg_posture_score for s in recent_sessions if s.avg_posture_score]
-                if form_scores:
-                    avg_form_score = sum(form_scores) / len(form_scores)
-                print(f"[PlanGen] Average form score: {avg_form_score}")
+            if total_workouts:
+                logger.debug("Average form score: %s", avg_form_score)
                 
-                # Get frequently done exercises
+                # Get frequently done exercises (counted in the database)
                 try:
-                    exercise_logs = ExerciseLog.query.join(WorkoutSession)\
-                        .filter(WorkoutSession.user_id == user_id)\
-                        .all()
-                    
-                    exercise_counts = {}
-                    for log in exercise_logs:
-                        exercise_counts[log.exercise_type] = exercise_counts.get(log.exercise_type, 0) + 1
-                    
-                    frequently_done_exercises = sorted(exercise_counts.keys(), 
-                                                     key=lambda x: exercise_counts[x], 
-                                                     reverse=True)[:3]
-                    print(f"[PlanGen] Frequently done exercises: {frequently_done_exercises}")
-                except Exception as e:
-                    print(f"[PlanGen] Error fetching exercise logs: {e}")
+                    frequently_done_exercises = [
+                        exercise_type for exercise_type, in db.session.query(ExerciseLog.exercise_type)
+                        .join(WorkoutSession, ExerciseLog.session_id == WorkoutSession.session_id)
+                        .filter(WorkoutSession.user_id == user_id)
+                        .group_by(ExerciseLog.exercise_type)
+                        .order_by(func.count().desc(), ExerciseLog.exercise_type)
+                        .limit(3)
+                    ]
+                    logger.debug("Frequently done exercises: %s", frequently_done_exercises)
+                except Exception:
+                    logger.exception("Error fetching exercise logs for user %s", user_id)
             
             # Determine fitness level based on history and profile
             fitness_level = getattr(user_profile, 'fitness_level', None) or 'beginner'
-            print(f"[PlanGen] Initial fitness level: {fitness_level}")
+            logger.debug("Initial fitness level: %s", fitness_level)
             
             # Adjust level based on workout consistency and form
             if total_workouts >= 20 and avg_form_score >= 80:
@@ -234,13 +234,11 @@ class PlanGeneratorService:
             plan_data['avg_form_score'] = round(avg_form_score, 1) if avg_form_score else None
             plan_data['personalized'] = total_workouts > 0
             
-            print(f"[PlanGen] ✅ Plan generated successfully with {len(plan_data['days'])} days")
+            logger.debug("Plan generated with %s days", len(plan_data['days']))
             return plan_data
             
         except Exception as e:
-            print(f"[PlanGen] ❌ Error in plan generation: {str(e)}")
-            import traceback
-            print(f"[PlanGen] Traceback: {traceback.format_exc()}")
+            logger.exception("Error in workout plan generation")
             # Return a basic fallback plan
             return {
                 'days': [],
@@ -81,15 +81,14 @@ class PoseDetectionService:
             raise
     
     def decode_base64_image(self, base64_string):
-        """Decode base64 image to numpy array"""
+        """Decode base64 image (optionally a data: URL) to numpy array"""
+        # Remove header if present
+        header, _, encoded = base64_string.partition(',')
+        return self.decode_image(base64.b64decode(encoded or header))
+    
+    def decode_image(self, img_bytes):
+        """Decode encoded image bytes (JPEG/PNG) to numpy array"""
         try:
-            # Remove header if present
-            if ',' in base64_string:
-                base64_string = base64_string.split(',')[1]
-            
-            # Decode base64 to bytes
-            img_bytes = base64.b64decode(base64_string)
-            
             # Convert to PIL Image
             img = Image.open(BytesIO(img_bytes))
             
@@ -261,12 +260,12 @@ class PoseDetectionService:
             })
         return edges
     
-    def detect_pose(self, base64_image):
+    def detect_pose(self, image_data):
         """
-        Main function: Detect pose from base64 encoded image
+        Main function: Detect pose from an encoded image
         
         Args:
-            base64_image: Base64 encoded image string
+            image_data: Raw image bytes (multipart upload) or base64 encoded image string
             
         Returns:
             dict with keypoints, form analysis, and skeleton edges
@@ -276,7 +275,10 @@ class PoseDetectionService:
             
             # 1. Decode image
             logger.info("Decoding image...")
-            image = self.decode_base64_image(base64_image)
+            if isinstance(image_data, (bytes, bytearray)):
+                image = self.decode_image(image_data)
+            else:
+                image = self.decode_base64_image(image_data)
             logger.info(f"Image decoded: shape={image.shape}")
             
             # 2. Preprocess
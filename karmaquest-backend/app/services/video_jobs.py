@@ -0,0 +1,136 @@
+"""
+Video Processing Jobs
+Runs the pose-detection video pipeline, either inline or as a background job
+(see app.services.jobs) so the upload request can return immediately
+"""
+
+import heapq
+import logging
+import os
+import tempfile
+import threading
+import time
+from flask import current_app
+
+logger = logging.getLogger(__name__)
+
+VIDEO_OUTPUT_DIR = os.path.join(tempfile.gettempdir(), 'karmaquest_videos')
+# Uploads sit on the same filesystem as the outputs, but in a subdirectory the
+# download route (which only serves basenames from VIDEO_OUTPUT_DIR) can't reach
+VIDEO_UPLOAD_DIR = os.path.join(VIDEO_OUTPUT_DIR, 'uploads')
+
+
+class OutputIndex:
+    """
+    Min-heap of (written_at, path) for processed videos, filled as they are written.
+    Expiring old files pops from the front of the heap instead of stat-ing
+    every file in the output directory.
+    """
+
+    def __init__(self):
+        self._heap = []
+        self._lock = threading.Lock()
+
+    def add(self, path, written_at=None):
+        with self._lock:
+            heapq.heappush(self._heap, (written_at or time.time(), path))
+
+    def seed(self, directory):
+        """Index files left in directory by an earlier process (one scan, at startup)"""
+        if not os.path.isdir(directory):
+            return
+        for entry in os.scandir(directory):
+            if entry.is_file():
+                self.add(entry.path, entry.stat().st_mtime)
+
+    def pop_expired(self, max_age, now=None):
+        """Remove and return paths written more than max_age seconds ago"""
+        cutoff = (now or time.time()) - max_age
+        expired = []
+        with self._lock:
+            while self._heap and self._heap[0][0] < cutoff:
+                expired.append(heapq.heappop(self._heap)[1])
+        return expired
+
+    def __len__(self):
+        with self._lock:
+            return len(self._heap)
+
+
+def cleanup_expired_outputs():
+    """Delete processed videos older than VIDEO_OUTPUT_MAX_AGE"""
+    index = current_app.extensions['video_outputs']
+    deleted_count = 0
+    for path in index.pop_expired(current_app.config['VIDEO_OUTPUT_MAX_AGE']):
+        try:
+            os.unlink(path)
+            deleted_count += 1
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.error("Error deleting old video %s: %s", path, e)
+    
+    if deleted_count > 0:
+        logger.info("🗑️ Cleaned up %d old video files", deleted_count)
+
+
+def new_output_path():
+    """Path for the next processed video in the shared output directory"""
+    os.makedirs(VIDEO_OUTPUT_DIR, exist_ok=True)
+    return os.path.join(VIDEO_OUTPUT_DIR, f"processed_{int(time.time() * 1000)}.mp4")
+
+
+def new_upload_file():
+    """
+    Create an empty file for an incoming upload
+
+    Returns:
+        (fd, path) - fd is open for writing and owned by the caller
+    """
+    os.makedirs(VIDEO_UPLOAD_DIR, exist_ok=True)
+    return tempfile.mkstemp(suffix='.mp4', dir=VIDEO_UPLOAD_DIR)
+
+
+def process_video_file(input_path, output_path, exercise_type):
+    """
+    Run pose detection + rep counting on a saved upload and remove the upload afterwards
+
+    Returns:
+        Response payload for /process-video (success flag, download URL, reps, form analysis)
+    """
+    # Imported here so TensorFlow/OpenCV load only when a video is actually processed
+    from app.services.video_pose_processor import get_video_processor
+
+    try:
+        result = get_video_processor().process_video(input_path, output_path, exercise_type=exercise_type)
+    finally:
+        if os.path.exists(input_path):
+            os.unlink(input_path)
+
+    if not result['success']:
+        logger.error("Processing failed: %s", result.get('error'))
+        return result
+
+    # Index the new file and expire old ones; both are cheap, so this runs on every video
+    current_app.extensions['video_outputs'].add(result['output_path'])
+    cleanup_expired_outputs()
+
+    # The actual output filename might differ (e.g. compressed copy)
+    actual_filename = os.path.basename(result['output_path'])
+    logger.info("✓ Processing complete: %s %s reps, form %s/100 (%s), output %s",
+                result['total_reps'], result['exercise_type'], result['form_score'],
+                result['form_quality'], actual_filename)
+
+    return {
+        'success': True,
+        'download_url': f'/api/pose/download/{actual_filename}',
+        'frame_count': result['frame_count'],
+        'duration': result['duration'],
+        'exercise_type': result['exercise_type'],
+        'total_reps': result['total_reps'],
+        'rep_timestamps': result['rep_timestamps'],
+        'form_score': result['form_score'],
+        'form_quality': result['form_quality'],
+        'form_feedback': result['form_feedback'],
+        'rep_scores': result['rep_scores']
+    }
@@ -0,0 +1,83 @@
+"""
+Thread-safe in-process caches shared across request handlers
+"""
+
+import threading
+from functools import wraps
+from cachetools import TTLCache
+from flask import current_app, make_response
+from flask_jwt_extended import get_jwt_identity
+
+
+class TTLStore:
+    """
+    Small TTL/LRU cache guarded by a lock.
+    cachetools caches are not thread-safe on their own, and the dev server
+    and gunicorn both serve requests from multiple threads.
+    """
+
+    def __init__(self, maxsize, ttl):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            return self._cache.get(key, default)
+
+    def set(self, key, value):
+        with self._lock:
+            self._cache[key] = value
+
+    def pop(self, key, default=None):
+        with self._lock:
+            return self._cache.pop(key, default)
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._cache
+
+    def __len__(self):
+        with self._lock:
+            return len(self._cache)
+
+
+# Names of per-user cached responses, used for invalidation on writes
+PROGRESS_SUMMARY = 'progress_summary'
+PROGRESS_ACHIEVEMENTS = 'progress_achievements'
+CURRENT_WORKOUT_PLAN = 'current_workout_plan'
+# Generated (workout, meal) plan data, tagged with the session it was built from
+DYNAMIC_PLANS = 'dynamic_plans'
+
+
+def cached_per_user(name):
+    """
+    Cache a JWT-protected GET view's successful JSON response per user.
+    The rendered body is stored, so hits skip both the queries and serialization.
+    Writes that change the underlying data call invalidate_user_cache().
+    """
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            store = current_app.extensions['user_cache']
+            key = (name, get_jwt_identity())
+            body = store.get(key)
+            if body is not None:
+                return current_app.response_class(body, mimetype='application/json')
+
+            response = make_response(fn(*args, **kwargs))
+            if response.status_code == 200:
+                store.set(key, response.get_data())
+            return response
+        return wrapper
+    return decorator
+
+
+def invalidate_user_cache(user_id, *names):
+    """Drop cached responses for user_id"""
+    store = current_app.extensions['user_cache']
+    for name in names:
+        store.pop((name, user_id), None)
@@ -0,0 +1,37 @@
+"""
+Bounded slots for CPU-heavy work done inside request handlers
+"""
+
+import threading
+from contextlib import contextmanager
+from flask import current_app
+
+
+class ServerBusy(Exception):
+    """Raised when no slot frees up within the configured wait"""
+
+
+class SlotPool:
+    """
+    Caps how many threads run a CPU-bound stage at once.
+    Request threads are cheap while they wait on uploads, but letting every one
+    of them run model inference at the same time just thrashes the CPU.
+    """
+
+    def __init__(self, size, timeout):
+        self._semaphore = threading.BoundedSemaphore(size)
+        self.timeout = timeout
+
+    @contextmanager
+    def slot(self):
+        if not self._semaphore.acquire(timeout=self.timeout):
+            raise ServerBusy('Server is busy, please retry shortly')
+        try:
+            yield
+        finally:
+            self._semaphore.release()
+
+
+def pose_slot():
+    """Hold one of the app's pose inference slots (see POSE_MAX_CONCURRENCY)"""
+    return current_app.extensions['pose_slots'].slot()
@@ -0,0 +1,46 @@
+"""
+Per-request access to the authenticated user
+"""
+
+from flask import current_app, g
+from flask_jwt_extended import get_jwt_identity
+
+
+def get_current_user():
+    """
+    The JWT identity's User (with profile), loaded on first use and kept on g,
+    so a request that needs it several times queries once and requests that
+    don't need it never query at all
+    """
+    identity = get_jwt_identity()
+    cached = g.get('current_user')
+    if cached is None or cached[0] != identity:
+        from app.models.user import User
+        cached = g.current_user = (identity, User.get_with_profile(identity))
+    return cached[1]
+
+
+def get_assigned_client_ids():
+    """
+    Ids of the clients assigned to the JWT identity (a trainer), from the
+    app-wide trainer_clients cache. A miss reads them with one query; admin
+    assignment changes call invalidate_assigned_clients().
+    """
+    identity = get_jwt_identity()
+    store = current_app.extensions['trainer_clients']
+    client_ids = store.get(identity)
+    if client_ids is None:
+        from app.models.user import TrainerAssignment
+        client_ids = TrainerAssignment.client_ids(identity)
+        store.set(identity, client_ids)
+    return client_ids
+
+
+def is_assigned_client(user_id):
+    """Whether user_id is assigned to the JWT identity (a trainer)"""
+    return user_id in get_assigned_client_ids()
+
+
+def invalidate_assigned_clients(trainer_id):
+    """Drop trainer_id's cached client ids after its assignments change"""
+    current_app.extensions['trainer_clients'].pop(trainer_id, None)
@@ -5,6 +5,20 @@ Role-based access control decorators for Flask routes
 from functools import wraps
 from flask import jsonify
 from flask_jwt_extended import verify_jwt_in_request, get_jwt
+from app.utils.current_user import is_assigned_client
+
+
+def _request_claims():
+    """
+    Claims of the request's JWT. Under @jwt_required() the token has already been
+    decoded and verified for this request, so it's reused instead of being decoded,
+    signature-checked and blocklist-checked a second time.
+    """
+    try:
+        return get_jwt()
+    except RuntimeError:
+        verify_jwt_in_request()
+        return get_jwt()
 
 
 def admin_required():
@@ -15,8 +29,7 @@ def admin_required():
     def wrapper(fn):
         @wraps(fn)
         def decorator(*args, **kwargs):
-            verify_jwt_in_request()
-            claims = get_jwt()
+            claims = _request_claims()
             if claims.get('role') != 'admin':
                 return jsonify({
                     'success': False, 
@@ -35,8 +48,7 @@ def trainer_required():
     def wrapper(fn):
         @wraps(fn)
         def decorator(*args, **kwargs):
-            verify_jwt_in_request()
-            claims = get_jwt()
+            claims = _request_claims()
             if claims.get('role') not in ['trainer', 'admin']:
                 return jsonify({
                     'success': False, 
@@ -55,8 +67,7 @@ def user_or_trainer_required():
     def wrapper(fn):
         @wraps(fn)
         def decorator(*args, **kwargs):
-            verify_jwt_in_request()
-            claims = get_jwt()
+            claims = _request_claims()
             if claims.get('role') not in ['user', 'trainer', 'admin']:
                 return jsonify({
                     'success': False, 
@@ -65,3 +76,25 @@ def user_or_trainer_required():
             return fn(*args, **kwargs)
         return decorator
     return wrapper
+
+
+def assigned_client_required():
+    """
+    Decorator for trainer routes on a single client (<user_id> in the URL).
+    Place it below trainer_required(); rejects clients that aren't assigned to
+    the trainer. Checked against the trainer's cached roster from
+    get_assigned_client_ids(), so a hit runs no query. Assignment changes drop
+    the entry in the worker that made them; other workers may act on the old
+    roster for up to TRAINER_CLIENTS_CACHE_TTL seconds.
+    """
+    def wrapper(fn):
+        @wraps(fn)
+        def decorator(*args, **kwargs):
+            if not is_assigned_client(kwargs['user_id']):
+                return jsonify({
+                    'success': False,
+                    'error': 'Client not assigned to you'
+                }), 403
+            return fn(*args, **kwargs)
+        return decorator
+    return wrapper
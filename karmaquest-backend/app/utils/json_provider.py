@@ -0,0 +1,38 @@
+"""
+orjson-backed JSON provider for Flask
+"""
+
+import orjson
+from flask.json.provider import DefaultJSONProvider
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    Drop-in replacement for Flask's stdlib json provider.
+    Keeps Flask's output conventions (sorted keys, pretty-printing in debug)
+    and falls back to Flask's default() for types orjson doesn't know.
+    """
+
+    def _dumps_bytes(self, obj, sort_keys, indent):
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=option)
+
+    def dumps(self, obj, **kwargs):
+        return self._dumps_bytes(obj, kwargs.get('sort_keys', self.sort_keys), kwargs.get('indent')).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        """
+        jsonify() without the str round trip: orjson's bytes become the body
+        directly instead of being decoded here and re-encoded by the Response
+        """
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        body = self._dumps_bytes(obj, self.sort_keys, indent)
+        return self._app.response_class(body + b'\n', mimetype=self.mimetype)
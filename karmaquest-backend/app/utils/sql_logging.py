@@ -0,0 +1,31 @@
+"""
+Slow SQL statement logging
+"""
+
+import logging
+import time
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+
+def log_slow_queries(engine, threshold_ms):
+    """Log every statement on engine that takes longer than threshold_ms, with its timing"""
+    threshold = threshold_ms / 1000.0
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def _start_timer(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('query_start_time', []).append(time.perf_counter())
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def _log_if_slow(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info['query_start_time'].pop()
+        if elapsed >= threshold:
+            logger.warning("Slow query (%.0f ms): %s", elapsed * 1000, ' '.join(statement.split()))
+
+    @event.listens_for(engine, 'handle_error')
+    def _drop_timer(context):
+        # after_cursor_execute doesn't run for failed statements
+        timers = context.connection.info.get('query_start_time') if context.connection else None
+        if timers:
+            timers.pop()
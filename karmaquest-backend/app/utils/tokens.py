@@ -0,0 +1,21 @@
+"""
+JWT revocation helpers
+"""
+
+import time
+from flask import current_app
+
+
+def revoke_user_tokens(user_id):
+    """
+    Reject every token issued to user_id before now and drop its cached claims.
+    Call after changing a user's role, email or active flag, or deleting them.
+    """
+    current_app.extensions['claims_cache'].pop(user_id, None)
+    current_app.extensions['token_revocations'].set(user_id, int(time.time()))
+
+
+def is_token_revoked(jwt_payload):
+    """True if the token was issued before its user's last revocation"""
+    revoked_at = current_app.extensions['token_revocations'].get(jwt_payload['sub'])
+    return revoked_at is not None and jwt_payload['iat'] < revoked_at
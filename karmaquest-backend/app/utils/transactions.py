@@ -0,0 +1,21 @@
+"""
+Session helpers for write endpoints
+"""
+
+from contextlib import contextmanager
+
+
+@contextmanager
+def no_expire_on_commit(scoped_session):
+    """
+    Commit inside this block without expiring loaded instances, so serializing
+    them for the response doesn't reload every row that was just written.
+    Only for objects whose state is fully known in Python after the flush.
+    """
+    session = scoped_session()
+    previous = session.expire_on_commit
+    session.expire_on_commit = False
+    try:
+        yield
+    finally:
+        session.expire_on_commit = previous
@@ -5,16 +5,93 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
 class Config:
     SECRET_KEY = os.getenv('SECRET_KEY', 'dev-secret-key')
     SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_pre_ping': True,  # drop stale connections before use instead of failing the request
+        'pool_size': int(os.getenv('DB_POOL_SIZE', '20')),
+        'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', '10')),
+        'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', '1800'))
+    }
     JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', 'jwt-secret-key')
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=2)
     JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=30)
+    JWT_ALGORITHM = 'HS256'  # symmetric HMAC; much cheaper to sign than RS256
+    JWT_ROTATE_REFRESH_TOKENS = os.getenv('JWT_ROTATE_REFRESH_TOKENS', 'false').lower() == 'true'
+    
+    # Profile pictures are stored on disk; only the URL goes in the users table
+    AVATAR_UPLOAD_DIR = os.getenv('AVATAR_UPLOAD_DIR', os.path.join(BASE_DIR, 'uploads', 'avatars'))
+    AVATAR_MAX_BYTES = int(os.getenv('AVATAR_MAX_BYTES', str(5 * 1024 * 1024)))
+    AVATAR_BASE_URL = os.getenv('AVATAR_BASE_URL', '')  # e.g. https://api.example.com; defaults to the request host
+    
+    # Argon2id password hashing cost
+    ARGON2_TIME_COST = int(os.getenv('ARGON2_TIME_COST', '2'))
+    ARGON2_MEMORY_COST = int(os.getenv('ARGON2_MEMORY_COST', '19456'))  # KiB
+    ARGON2_PARALLELISM = int(os.getenv('ARGON2_PARALLELISM', '1'))
+    ADMIN_ARGON2_TIME_COST = int(os.getenv('ADMIN_ARGON2_TIME_COST', '1'))  # admin bootstrap on first login
+    
+    # In-process cache for JWT additional claims (role, email)
+    CLAIMS_CACHE_MAXSIZE = int(os.getenv('CLAIMS_CACHE_MAXSIZE', '10000'))
+    CLAIMS_CACHE_TTL = int(os.getenv('CLAIMS_CACHE_TTL', '60'))
+    
+    # In-process cache of recently verified logins
+    LOGIN_CACHE_MAXSIZE = int(os.getenv('LOGIN_CACHE_MAXSIZE', '4096'))
+    LOGIN_CACHE_TTL = int(os.getenv('LOGIN_CACHE_TTL', '30'))
+    
+    # Cached per-user dashboard responses; writes invalidate them, the TTL bounds anything missed
+    USER_CACHE_MAXSIZE = int(os.getenv('USER_CACHE_MAXSIZE', '10000'))
+    USER_CACHE_TTL = int(os.getenv('USER_CACHE_TTL', '300'))
+    
+    # Each trainer's assigned client ids, for access checks and the empty-roster short cut.
+    # Admin assignment changes invalidate entries; the TTL bounds staleness across workers.
+    TRAINER_CLIENTS_CACHE_MAXSIZE = int(os.getenv('TRAINER_CLIENTS_CACHE_MAXSIZE', '10000'))
+    TRAINER_CLIENTS_CACHE_TTL = int(os.getenv('TRAINER_CLIENTS_CACHE_TTL', '60'))
+    
+    # Users whose older tokens are rejected after a role/account change (kept for the refresh token lifetime)
+    TOKEN_REVOCATIONS_MAXSIZE = int(os.getenv('TOKEN_REVOCATIONS_MAXSIZE', '10000'))
+    
+    # Background video processing (pose detection) - worker threads and how long finished jobs stay pollable
+    VIDEO_JOB_WORKERS = int(os.getenv('VIDEO_JOB_WORKERS', '2'))
+    VIDEO_JOB_TTL = int(os.getenv('VIDEO_JOB_TTL', '3600'))
+    PLAN_JOB_WORKERS = int(os.getenv('PLAN_JOB_WORKERS', '2'))
+    PLAN_JOB_TTL = int(os.getenv('PLAN_JOB_TTL', '600'))
+    # Plan jobs kept pollable at once; an admin batch queues one per user (up to 1000), so
+    # leave room for several batches plus user-started jobs within PLAN_JOB_TTL
+    PLAN_JOB_MAX_TRACKED = int(os.getenv('PLAN_JOB_MAX_TRACKED', '5000'))
+    
+    # Regenerate plans after a completed workout on the plan job pool (the response is a 202 with a
+    # job to poll). Off by default: the mobile app reads the current plan right after completing.
+    PLAN_REGENERATION_ASYNC = os.getenv('PLAN_REGENERATION_ASYNC', 'false').lower() == 'true'
+    
+    # Processed videos are deleted this many seconds after they are written
+    VIDEO_OUTPUT_MAX_AGE = int(os.getenv('VIDEO_OUTPUT_MAX_AGE', '3600'))
+    
+    # Pose inference (frame detection, inline video processing) running at once per process;
+    # requests wait up to POSE_SLOT_TIMEOUT seconds for a slot, then get a 503
+    POSE_MAX_CONCURRENCY = int(os.getenv('POSE_MAX_CONCURRENCY', str(os.cpu_count() or 2)))
+    POSE_SLOT_TIMEOUT = float(os.getenv('POSE_SLOT_TIMEOUT', '10'))
+    
+    # Largest accepted request body (video uploads); larger requests get a 413
+    MAX_CONTENT_LENGTH = int(os.getenv('MAX_UPLOAD_MB', '200')) * 1024 * 1024
+    
+    # Processed video downloads: browser cache lifetime, and whether to hand the file to the
+    # front-end server via X-Sendfile (requires nginx/Apache to be configured for it)
+    VIDEO_CACHE_MAX_AGE = int(os.getenv('VIDEO_CACHE_MAX_AGE', '3600'))
+    USE_X_SENDFILE = os.getenv('USE_X_SENDFILE', 'false').lower() == 'true'
+    
+    # Statements slower than this are logged by app.utils.sql_logging; 0 turns it off
+    SLOW_QUERY_MS = int(os.getenv('SLOW_QUERY_MS', '100'))
+    
+    # Level for the app.* loggers (routes and services)
+    LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
     
 class DevelopmentConfig(Config):
     DEBUG = True
+    LOG_LEVEL = os.getenv('LOG_LEVEL', 'DEBUG')
     
 class ProductionConfig(Config):
     DEBUG = False
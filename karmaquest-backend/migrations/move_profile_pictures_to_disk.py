@@ -0,0 +1,62 @@
+"""
+Migration script to move base64 profile pictures out of the users table
+Writes every inline data URL in users.profile_picture_url to AVATAR_UPLOAD_DIR
+and replaces it with the avatar URL.
+
+Run this BEFORE `flask db upgrade` to revision 83f07884cef5, which shrinks the
+column back to VARCHAR(500). Set AVATAR_BASE_URL so the stored URLs are absolute.
+"""
+
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app import create_app, db
+from app.services.avatar_storage import AvatarError, save_data_url
+from sqlalchemy import text
+
+def run_migration():
+    app = create_app()
+    
+    with app.app_context():
+        print("[Migration] Moving inline profile pictures to disk...")
+        
+        try:
+            rows = db.session.execute(text("""
+                SELECT user_id, profile_picture_url FROM users
+                WHERE profile_picture_url LIKE 'data:%'
+            """)).fetchall()
+            print(f"[Migration] Found {len(rows)} inline profile pictures")
+            
+            moved = 0
+            for user_id, data_url in rows:
+                try:
+                    url = save_data_url(
+                        user_id, data_url,
+                        upload_dir=app.config['AVATAR_UPLOAD_DIR'],
+                        max_bytes=app.config['AVATAR_MAX_BYTES'],
+                        base_url=app.config['AVATAR_BASE_URL']
+                    )
+                except AvatarError as e:
+                    # Unreadable image - drop it rather than block the column change
+                    print(f"  ⚠️  Skipping {user_id}: {e}")
+                    url = None
+                
+                db.session.execute(
+                    text("UPDATE users SET profile_picture_url = :url WHERE user_id = :user_id"),
+                    {'url': url, 'user_id': user_id}
+                )
+                moved += 1 if url else 0
+            
+            db.session.commit()
+            print(f"[Migration] ✅ Moved {moved}/{len(rows)} profile pictures to {app.config['AVATAR_UPLOAD_DIR']}")
+            
+        except Exception as e:
+            db.session.rollback()
+            print(f"[Migration] ❌ Error during migration: {str(e)}")
+            raise
+
+if __name__ == '__main__':
+    run_migration()
@@ -0,0 +1,82 @@
+"""add_trainer_assignments_table
+
+Revision ID: 3d39afd096d4
+Revises: a1b2c3d4e5f6
+Create Date: 2026-10-16 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3d39afd096d4'
+down_revision = 'a1b2c3d4e5f6'
+branch_labels = None
+depends_on = None
+
+
+users = sa.table('users',
+    sa.column('user_id', sa.String(length=36)),
+    sa.column('assigned_users', sa.JSON())
+)
+
+trainer_assignments = sa.table('trainer_assignments',
+    sa.column('trainer_id', sa.String(length=36)),
+    sa.column('user_id', sa.String(length=36))
+)
+
+
+def upgrade():
+    op.create_table('trainer_assignments',
+    sa.Column('trainer_id', sa.String(length=36), nullable=False),
+    sa.Column('user_id', sa.String(length=36), nullable=False),
+    sa.ForeignKeyConstraint(['trainer_id'], ['users.user_id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.user_id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('trainer_id', 'user_id')
+    )
+    with op.batch_alter_table('trainer_assignments', schema=None) as batch_op:
+        batch_op.create_index('ix_trainer_assignments_user_trainer', ['user_id', 'trainer_id'], unique=False)
+
+    # assigned_users was added by migrations/add_roles_migration.py, outside Alembic,
+    # so databases built purely from this history won't have it
+    conn = op.get_bind()
+    user_columns = {column['name'] for column in sa.inspect(conn).get_columns('users')}
+    if 'assigned_users' not in user_columns:
+        return
+
+    # Copy the JSON assignment lists into rows, skipping ids of users that no longer exist
+    existing_ids = {row.user_id for row in conn.execute(sa.select(users.c.user_id))}
+    rows = []
+    for trainer_id, assigned in conn.execute(
+        sa.select(users.c.user_id, users.c.assigned_users).where(users.c.assigned_users.isnot(None))
+    ):
+        for user_id in dict.fromkeys(assigned or []):
+            if user_id in existing_ids:
+                rows.append({'trainer_id': trainer_id, 'user_id': user_id})
+    if rows:
+        op.bulk_insert(trainer_assignments, rows)
+
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_column('assigned_users')
+
+
+def downgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('assigned_users', sa.JSON(), nullable=True))
+
+    conn = op.get_bind()
+    assigned = {}
+    for trainer_id, user_id in conn.execute(
+        sa.select(trainer_assignments.c.trainer_id, trainer_assignments.c.user_id)
+    ):
+        assigned.setdefault(trainer_id, []).append(user_id)
+    for trainer_id, user_ids in assigned.items():
+        conn.execute(
+            users.update().where(users.c.user_id == trainer_id).values(assigned_users=user_ids)
+        )
+
+    with op.batch_alter_table('trainer_assignments', schema=None) as batch_op:
+        batch_op.drop_index('ix_trainer_assignments_user_trainer')
+
+    op.drop_table('trainer_assignments')
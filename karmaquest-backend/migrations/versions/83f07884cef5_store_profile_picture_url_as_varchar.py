@@ -0,0 +1,34 @@
+"""store_profile_picture_url_as_varchar
+
+Revision ID: 83f07884cef5
+Revises: 3d39afd096d4
+Create Date: 2026-10-16 11:00:00.000000
+
+Run migrations/move_profile_pictures_to_disk.py first so no base64 images
+remain in the column.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '83f07884cef5'
+down_revision = '3d39afd096d4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.alter_column('profile_picture_url',
+               existing_type=sa.Text(),
+               type_=sa.String(length=500),
+               existing_nullable=True)
+
+
+def downgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.alter_column('profile_picture_url',
+               existing_type=sa.String(length=500),
+               type_=sa.Text(),
+               existing_nullable=True)
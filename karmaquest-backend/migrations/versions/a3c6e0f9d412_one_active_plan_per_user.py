@@ -0,0 +1,50 @@
+"""one active weekly plan per user
+
+Revision ID: a3c6e0f9d412
+Revises: e9b4c27d5a18
+Create Date: 2026-10-16 17:00:00.000000
+
+Replaces the (user_id, is_active) indexes with partial unique indexes on
+user_id WHERE is_active. Users that somehow have several active plans keep
+only the newest one active before the unique index is built.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a3c6e0f9d412'
+down_revision = 'e9b4c27d5a18'
+branch_labels = None
+depends_on = None
+
+
+# table, primary key, old index, new index
+TABLES = [
+    ('weekly_workout_plans', 'plan_id', 'ix_weekly_workout_plans_user_active', 'ix_weekly_workout_plans_active_user'),
+    ('weekly_meal_plans', 'meal_plan_id', 'ix_weekly_meal_plans_user_active', 'ix_weekly_meal_plans_active_user'),
+]
+
+
+def upgrade():
+    for table, pk, _, _ in TABLES:
+        op.execute(
+            f'UPDATE {table} SET is_active = false WHERE is_active AND EXISTS ('
+            f'SELECT 1 FROM {table} newer WHERE newer.user_id = {table}.user_id AND newer.is_active '
+            f'AND (newer.created_at > {table}.created_at '
+            f'OR (newer.created_at = {table}.created_at AND newer.{pk} > {table}.{pk})))'
+        )
+    
+    # CREATE INDEX CONCURRENTLY can't run inside a transaction
+    with op.get_context().autocommit_block():
+        for table, _, old_index, new_index in TABLES:
+            op.create_index(new_index, table, ['user_id'], unique=True,
+                            postgresql_where=sa.text('is_active'), postgresql_concurrently=True)
+            op.drop_index(old_index, table_name=table, postgresql_concurrently=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for table, _, old_index, new_index in reversed(TABLES):
+            op.create_index(old_index, table, ['user_id', 'is_active'], unique=False, postgresql_concurrently=True)
+            op.drop_index(new_index, table_name=table, postgresql_concurrently=True)
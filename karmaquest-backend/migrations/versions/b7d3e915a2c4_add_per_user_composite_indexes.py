@@ -0,0 +1,44 @@
+"""add per-user composite indexes
+
+Revision ID: b7d3e915a2c4
+Revises: f2a7c9d41e60
+Create Date: 2026-10-16 14:00:00.000000
+
+On PostgreSQL the indexes are built CONCURRENTLY so writes to these tables
+aren't blocked while they build.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7d3e915a2c4'
+down_revision = 'f2a7c9d41e60'
+branch_labels = None
+depends_on = None
+
+
+INDEXES = [
+    ('ix_weekly_workout_plans_user_active', 'weekly_workout_plans', ['user_id', 'is_active']),
+    ('ix_weekly_workout_plans_user_created', 'weekly_workout_plans', ['user_id', 'created_at']),
+    ('ix_weekly_meal_plans_user_active', 'weekly_meal_plans', ['user_id', 'is_active']),
+    ('ix_weekly_meal_plans_user_created', 'weekly_meal_plans', ['user_id', 'created_at']),
+    ('ix_workout_sessions_user_date', 'workout_sessions', ['user_id', 'session_date']),
+    ('ix_user_progress_user_date', 'user_progress', ['user_id', 'date']),
+    # Foreign keys used by relationship loads
+    ('ix_exercise_logs_session_id', 'exercise_logs', ['session_id']),
+    ('ix_user_profiles_user_id', 'user_profiles', ['user_id']),
+]
+
+
+def upgrade():
+    # CREATE INDEX CONCURRENTLY can't run inside a transaction
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, unique=False, postgresql_concurrently=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, columns in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
@@ -0,0 +1,38 @@
+"""add role composite indexes
+
+Revision ID: c5e8a2f1b7d3
+Revises: 83f07884cef5
+Create Date: 2026-10-16 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c5e8a2f1b7d3'
+down_revision = '83f07884cef5'
+branch_labels = None
+depends_on = None
+
+
+def _has_role_column():
+    # role was added by migrations/add_roles_migration.py, outside Alembic
+    columns = {column['name'] for column in sa.inspect(op.get_bind()).get_columns('users')}
+    return 'role' in columns
+
+
+def upgrade():
+    if not _has_role_column():
+        return
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.create_index('ix_users_role_created', ['role', 'created_at'], unique=False)
+        batch_op.create_index('ix_users_role_active', ['role', 'is_active'], unique=False)
+
+
+def downgrade():
+    if not _has_role_column():
+        return
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_index('ix_users_role_active')
+        batch_op.drop_index('ix_users_role_created')
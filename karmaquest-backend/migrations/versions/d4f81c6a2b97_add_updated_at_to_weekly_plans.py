@@ -0,0 +1,33 @@
+"""add updated_at to weekly plans
+
+Revision ID: d4f81c6a2b97
+Revises: b7d3e915a2c4
+Create Date: 2026-10-16 15:00:00.000000
+
+Existing plans start out with updated_at equal to created_at.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4f81c6a2b97'
+down_revision = 'b7d3e915a2c4'
+branch_labels = None
+depends_on = None
+
+
+TABLES = ['weekly_workout_plans', 'weekly_meal_plans']
+
+
+def upgrade():
+    for table in TABLES:
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.add_column(sa.Column('updated_at', sa.DateTime(), nullable=True))
+        op.execute(f'UPDATE {table} SET updated_at = created_at')
+
+
+def downgrade():
+    for table in reversed(TABLES):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.drop_column('updated_at')
@@ -0,0 +1,29 @@
+"""add exercise type/session index to exercise_logs
+
+Revision ID: e9b4c27d5a18
+Revises: d4f81c6a2b97
+Create Date: 2026-10-16 16:00:00.000000
+
+Built CONCURRENTLY on PostgreSQL, like the other composite indexes.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e9b4c27d5a18'
+down_revision = 'd4f81c6a2b97'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # CREATE INDEX CONCURRENTLY can't run inside a transaction
+    with op.get_context().autocommit_block():
+        op.create_index('ix_exercise_logs_type_session', 'exercise_logs', ['exercise_type', 'session_id'],
+                        unique=False, postgresql_concurrently=True)
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_exercise_logs_type_session', table_name='exercise_logs', postgresql_concurrently=True)
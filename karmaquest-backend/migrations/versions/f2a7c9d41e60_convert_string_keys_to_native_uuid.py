@@ -0,0 +1,67 @@
+"""convert string keys to native uuid
+
+Revision ID: f2a7c9d41e60
+Revises: c5e8a2f1b7d3
+Create Date: 2026-10-16 13:00:00.000000
+
+PostgreSQL only: VARCHAR(36) keys become the 16-byte uuid type. Other
+backends keep their existing columns and should be recreated from the models.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2a7c9d41e60'
+down_revision = 'c5e8a2f1b7d3'
+branch_labels = None
+depends_on = None
+
+
+# table -> key columns holding uuid strings
+UUID_COLUMNS = {
+    'users': ['user_id', 'created_by'],
+    'user_profiles': ['profile_id', 'user_id'],
+    'user_progress': ['progress_id', 'user_id'],
+    'weekly_workout_plans': ['plan_id', 'user_id'],
+    'weekly_meal_plans': ['meal_plan_id', 'user_id'],
+    'workout_sessions': ['session_id', 'user_id'],
+    'exercise_logs': ['log_id', 'session_id'],
+    'trainer_assignments': ['trainer_id', 'user_id'],
+}
+
+
+def _convert(type_sql, cast_sql):
+    conn = op.get_bind()
+    if conn.dialect.name != 'postgresql':
+        return
+    inspector = sa.inspect(conn)
+
+    # Foreign keys must be dropped while both sides change type, then recreated as they were
+    foreign_keys = []
+    for table in UUID_COLUMNS:
+        for fk in inspector.get_foreign_keys(table):
+            foreign_keys.append((table, fk))
+            op.drop_constraint(fk['name'], table, type_='foreignkey')
+
+    for table, columns in UUID_COLUMNS.items():
+        existing = {column['name'] for column in inspector.get_columns(table)}
+        for column in columns:
+            # created_by was added outside Alembic and may be missing
+            if column in existing:
+                op.execute(f'ALTER TABLE {table} ALTER COLUMN {column} TYPE {type_sql} USING {column}::{cast_sql}')
+
+    for table, fk in foreign_keys:
+        op.create_foreign_key(
+            fk['name'], table, fk['referred_table'],
+            fk['constrained_columns'], fk['referred_columns'],
+            ondelete=fk.get('options', {}).get('ondelete')
+        )
+
+
+def upgrade():
+    _convert('uuid', 'uuid')
+
+
+def downgrade():
+    _convert('VARCHAR(36)', 'text')
@@ -47,6 +47,37 @@ def client(app, db):
     return app.test_client()
 
 
+@pytest.fixture
+def query_counter(db):
+    """Record SQL statements executed while the test runs (for N+1 checks)"""
+    from sqlalchemy import event
+    
+    statements = []
+    
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    
+    event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+    yield statements
+    event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+
+
+@pytest.fixture
+def wait_for_job(client):
+    """Poll a background job's status URL until it finishes (or 5s pass); returns the job"""
+    import time
+    
+    def wait(url, headers=None):
+        deadline = time.time() + 5
+        while True:
+            job = client.get(url, headers=headers).get_json()
+            if job['status'] in ('completed', 'failed') or time.time() > deadline:
+                return job
+            time.sleep(0.05)
+    
+    return wait
+
+
 @pytest.fixture
 def runner(app):
     """Create test CLI runner"""
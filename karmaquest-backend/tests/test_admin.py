@@ -3,6 +3,7 @@ Test cases for Admin routes
 Tests: /api/admin/* endpoints
 """
 import pytest
+import time
 
 
 class TestCreateTrainer:
@@ -39,3 +40,193 @@ class TestListUsers:
         assert response.status_code == 200
         data = response.get_json()
         assert data['success'] is True
+    
+    def test_listing_matches_user_serialization(self, app, client, db, admin_headers, trainer_with_clients):
+        """Test row-based listing returns the same fields as User.to_dict"""
+        trainer, _ = trainer_with_clients
+        response = client.get('/api/admin/users?role=trainer',
+            headers=admin_headers
+        )
+        
+        assert response.status_code == 200
+        listed = response.get_json()['data']['users']
+        assert len(listed) == 1
+        
+        with app.app_context():
+            from app.models.user import User
+            expected = db.session.get(User, trainer.user_id).to_dict(include_picture=False)
+            assert listed[0] == expected
+            assert len(listed[0]['assigned_users']) > 0
+
+
+class TestUpdateUser:
+    """Test admin updating user accounts"""
+    
+    def test_role_change_refreshes_token_claims(self, app, client, db, admin_headers, sample_user):
+        """Test tokens minted after a role change carry the new role"""
+        from flask_jwt_extended import create_access_token, decode_token
+        
+        with app.app_context():
+            token = create_access_token(identity=sample_user.user_id)
+            assert decode_token(token)['role'] == 'user'
+        
+        response = client.put(f'/api/admin/users/{sample_user.user_id}',
+            headers=admin_headers,
+            json={'role': 'trainer'}
+        )
+        assert response.status_code == 200
+        
+        with app.app_context():
+            token = create_access_token(identity=sample_user.user_id)
+            assert decode_token(token)['role'] == 'trainer'
+    
+    def test_role_change_revokes_existing_tokens(self, app, client, db, admin_headers, sample_user, monkeypatch):
+        """Test tokens issued before a role change are rejected"""
+        from flask_jwt_extended import create_access_token
+        from types import SimpleNamespace
+        
+        with app.app_context():
+            token = create_access_token(identity=sample_user.user_id)
+        headers = {'Authorization': f'Bearer {token}'}
+        assert client.get('/api/users/profile', headers=headers).status_code == 200
+        
+        # Record the change a second later so it is strictly after the token's iat
+        later = time.time() + 1
+        monkeypatch.setattr('app.utils.tokens.time', SimpleNamespace(time=lambda: later))
+        response = client.put(f'/api/admin/users/{sample_user.user_id}',
+            headers=admin_headers,
+            json={'role': 'trainer'}
+        )
+        assert response.status_code == 200
+        
+        assert client.get('/api/users/profile', headers=headers).status_code == 401
+
+
+class TestSystemStats:
+    """Test admin system statistics"""
+    
+    def test_stats_counts_users_by_role(self, client, db, admin_headers, sample_trainer, multiple_users, sample_workout):
+        """Test stats aggregate users, trainers and workouts correctly"""
+        multiple_users[0].is_active = False
+        db.session.commit()
+        
+        response = client.get('/api/admin/stats', headers=admin_headers)
+        
+        assert response.status_code == 200
+        stats = response.get_json()['data']
+        # multiple_users (5) + sample_user from sample_workout
+        assert stats['total_users'] == 6
+        assert stats['total_trainers'] == 1
+        assert stats['active_users'] == 5
+        assert stats['new_users_this_week'] == 6
+        assert stats['total_workouts'] == 1
+
+
+class TestAssignUsersToTrainer:
+    """Test admin assigning clients to trainers"""
+    
+    def test_assign_replaces_existing_assignments(self, client, db, admin_headers, trainer_with_clients, multiple_users):
+        """Test assigning users replaces the trainer's previous client list"""
+        trainer, _ = trainer_with_clients
+        new_ids = [multiple_users[3].user_id, multiple_users[4].user_id]
+        
+        response = client.post(f'/api/admin/trainers/{trainer.user_id}/assign',
+            headers=admin_headers,
+            json={'user_ids': new_ids + [new_ids[0]]}
+        )
+        
+        assert response.status_code == 200
+        assert sorted(response.get_json()['data']['assigned_users']) == sorted(new_ids)
+    
+    def test_assign_keeps_overlapping_assignments(self, client, db, admin_headers, trainer_with_clients, multiple_users):
+        """Test re-assigning a list that overlaps the current clients keeps them without duplicates"""
+        trainer, clients = trainer_with_clients
+        new_ids = [clients[0].user_id, multiple_users[3].user_id]
+        
+        response = client.post(f'/api/admin/trainers/{trainer.user_id}/assign',
+            headers=admin_headers,
+            json={'user_ids': new_ids}
+        )
+        
+        assert response.status_code == 200
+        assert sorted(response.get_json()['data']['assigned_users']) == sorted(new_ids)
+    
+    def test_assign_rejects_unknown_and_non_client_ids(self, client, db, admin_headers, sample_trainer, sample_admin, multiple_users):
+        """Test malformed, unknown and staff ids get a 400 naming them, not a database error"""
+        bad_ids = ['not-a-uuid', '00000000-0000-7000-8000-000000000000', sample_admin.user_id]
+        
+        response = client.post(f'/api/admin/trainers/{sample_trainer.user_id}/assign',
+            headers=admin_headers,
+            json={'user_ids': [multiple_users[0].user_id] + bad_ids}
+        )
+        
+        assert response.status_code == 400
+        assert response.get_json()['user_ids'] == bad_ids
+        
+        response = client.post(f'/api/admin/trainers/{sample_trainer.user_id}/assign',
+            headers=admin_headers,
+            json={'user_ids': 'everyone'}
+        )
+        assert response.status_code == 400
+    
+    def test_assign_refreshes_trainer_roster(self, client, db, admin_headers, trainer_headers, trainer_with_clients, multiple_users):
+        """Test a trainer sees the new client list right after reassignment, not the cached one"""
+        trainer, clients = trainer_with_clients
+        new_id = multiple_users[3].user_id
+        client.get('/api/trainer/clients', headers=trainer_headers)
+        
+        client.post(f'/api/admin/trainers/{trainer.user_id}/assign',
+            headers=admin_headers,
+            json={'user_ids': [new_id]}
+        )
+        response = client.get('/api/trainer/clients', headers=trainer_headers)
+        
+        assert [c['user_id'] for c in response.get_json()['data']['clients']] == [new_id]
+        assert client.get(f'/api/trainer/clients/{clients[0].user_id}/performance', headers=trainer_headers).status_code == 403
+
+
+class TestRegeneratePlans:
+    """Test admin batch plan regeneration"""
+    
+    def test_full_batch_jobs_stay_pollable(self, app):
+        """Test a maximum-size batch followed by more jobs doesn't evict the batch's entries"""
+        from app.routes.admin import PLAN_REGENERATION_MAX_USERS
+        
+        jobs = app.extensions['plan_jobs']
+        with app.app_context():
+            job_ids = [jobs.submit(dict, owner='batch') for _ in range(2 * PLAN_REGENERATION_MAX_USERS)]
+        
+        assert jobs.get(job_ids[0]) is not None
+    
+    def test_batch_regeneration_queues_job_per_user(self, client, db, admin_headers, sample_user, sample_exercises, multiple_users, wait_for_job):
+        """Test each known user gets a pollable job and unknown ids are reported"""
+        with_history = sample_user.user_id
+        without_history = multiple_users[0].user_id
+        
+        response = client.post('/api/admin/plans/regenerate',
+            headers=admin_headers,
+            json={'user_ids': [with_history, without_history, with_history, 'no-such-user']}
+        )
+        
+        assert response.status_code == 202
+        data = response.get_json()['data']
+        assert sorted(data['jobs']) == sorted([with_history, without_history])
+        assert data['not_found'] == ['no-such-user']
+        
+        statuses = {
+            user_id: wait_for_job(f'/api/admin/plans/jobs/{job_id}', admin_headers)
+            for user_id, job_id in data['jobs'].items()
+        }
+        
+        assert statuses[with_history]['status'] == 'completed'
+        assert statuses[with_history]['result']['workout_plan_id']
+        assert statuses[without_history]['status'] == 'failed'
+    
+    def test_batch_regeneration_requires_admin(self, client, db, auth_headers, sample_user):
+        """Test regular users can't queue regeneration for others"""
+        response = client.post('/api/admin/plans/regenerate',
+            headers=auth_headers,
+            json={'user_ids': [sample_user.user_id]}
+        )
+        
+        assert response.status_code == 403
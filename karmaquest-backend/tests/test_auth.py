@@ -133,6 +133,31 @@ class TestUserLogin:
         assert response.status_code == 200
         db.session.refresh(sample_user)
         assert sample_user.last_login != original_last_login
+    
+    def test_repeated_login_skips_password_hashing(self, client, db, sample_user, monkeypatch):
+        """Test a repeated login with the same credentials is served from the login cache"""
+        credentials = {'email': 'testuser@example.com', 'password': 'TestPassword123!'}
+        assert client.post('/api/auth/login', json=credentials).status_code == 200
+        
+        def fail_check_password(self, password):
+            raise AssertionError('password should not be re-hashed')
+        monkeypatch.setattr(User, 'check_password', fail_check_password)
+        
+        assert client.post('/api/auth/login', json=credentials).status_code == 200
+    
+    def test_login_cache_does_not_accept_wrong_password(self, client, db, sample_user):
+        """Test a cached login does not let a different password through"""
+        client.post('/api/auth/login', json={
+            'email': 'testuser@example.com',
+            'password': 'TestPassword123!'
+        })
+        
+        response = client.post('/api/auth/login', json={
+            'email': 'testuser@example.com',
+            'password': 'WrongPassword123!'
+        })
+        
+        assert response.status_code == 401
 
 
 class TestAdminLogin:
@@ -196,6 +221,21 @@ class TestTokenRefresh:
         assert 'access_token' in data['data']
         assert 'refresh_token' in data['data']
     
+    def test_refresh_returns_presented_refresh_token(self, client, db, sample_user):
+        """Test refresh doesn't rotate the refresh token unless rotation is enabled"""
+        login_response = client.post('/api/auth/login', json={
+            'email': 'testuser@example.com',
+            'password': 'TestPassword123!'
+        })
+        refresh_token = login_response.get_json()['data']['refresh_token']
+        
+        response = client.post('/api/auth/refresh-token', headers={
+            'Authorization': f'Bearer {refresh_token}'
+        })
+        
+        assert response.status_code == 200
+        assert response.get_json()['data']['refresh_token'] == refresh_token
+    
     def test_refresh_token_without_token(self, client, db):
         """Test refresh endpoint without token should fail"""
         response = client.post('/api/auth/refresh-token')
@@ -243,3 +283,28 @@ class TestProtectedEndpoints:
         response = client.get('/api/users/profile', headers=auth_headers)
         
         assert response.status_code == 200
+
+
+class TestPasswordHashing:
+    """Test password hashing and legacy hash migration"""
+    
+    def test_new_passwords_use_argon2(self, db, sample_user):
+        """Test newly set passwords are stored as argon2 hashes"""
+        assert sample_user.password_hash.startswith('$argon2')
+        assert sample_user.check_password('TestPassword123!')
+        assert not sample_user.check_password('WrongPassword123!')
+    
+    def test_legacy_bcrypt_hash_upgraded_on_login(self, client, db, sample_user):
+        """Test login with a legacy bcrypt hash succeeds and rehashes with argon2"""
+        import bcrypt
+        sample_user.password_hash = bcrypt.hashpw(b'TestPassword123!', bcrypt.gensalt(rounds=4)).decode('utf-8')
+        db.session.commit()
+        
+        response = client.post('/api/auth/login', json={
+            'email': 'testuser@example.com',
+            'password': 'TestPassword123!'
+        })
+        
+        assert response.status_code == 200
+        db.session.refresh(sample_user)
+        assert sample_user.password_hash.startswith('$argon2')
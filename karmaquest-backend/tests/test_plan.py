@@ -3,6 +3,7 @@ Test cases for Plan Generation routes
 Tests: /api/plans/workout/* and /api/plans/meal/* endpoints
 """
 import pytest
+from datetime import datetime, timedelta
 
 
 class TestGenerateWorkoutPlan:
@@ -21,6 +22,205 @@ class TestGenerateWorkoutPlan:
         data = response.get_json()
         assert data['success'] is True
 
+    
+    def test_regenerating_leaves_one_active_plan(self, client, db, auth_headers, sample_user, sample_workout_plan):
+        """Test the previous active plan is deactivated when a new one is generated"""
+        from app.models.plan import WeeklyWorkoutPlan
+        
+        response = client.post('/api/plans/workout/generate',
+            headers=auth_headers
+        )
+        
+        assert response.status_code == 201
+        active = WeeklyWorkoutPlan.query.filter_by(user_id=sample_user.user_id, is_active=True).all()
+        assert [p.plan_id for p in active] == [response.get_json()['data']['plan']['plan_id']]
+
+    
+    def test_default_plan_summarizes_latest_sessions(self, client, db, auth_headers, workout_history):
+        """Test the default plan's history summary covers the 10 latest sessions"""
+        response = client.post('/api/plans/workout/generate',
+            headers=auth_headers
+        )
+        
+        assert response.status_code == 201
+        plan_data = response.get_json()['data']['plan']['plan_data']
+        assert plan_data['based_on_workouts'] == 10
+        assert plan_data['avg_form_score'] == 84.5
+
+    
+    def test_dynamic_regeneration_deactivates_without_loading_plans(self, db, sample_user, sample_workout_plan, sample_meal_plan, sample_exercises, query_counter):
+        """Test old plans are deactivated by one UPDATE per table and never selected"""
+        from app.services.dynamic_plan_generator import DynamicPlanGenerator
+        
+        user_id = sample_user.user_id
+        query_counter.clear()
+        result = DynamicPlanGenerator.generate_plans_from_workout(user_id)
+        
+        assert result['success'] is True
+        plan_statements = [q for q in query_counter if 'weekly_' in q]
+        assert [q.split()[0] for q in plan_statements] == ['UPDATE', 'UPDATE', 'INSERT', 'INSERT']
+
+    
+    def test_second_active_plan_rejected(self, db, sample_user, sample_workout_plan):
+        """Test the database refuses a second active plan for the same user"""
+        from sqlalchemy.exc import IntegrityError
+        from app.models.plan import WeeklyWorkoutPlan
+        
+        db.session.add(WeeklyWorkoutPlan(
+            user_id=sample_user.user_id,
+            start_date=sample_workout_plan.start_date,
+            end_date=sample_workout_plan.end_date,
+            plan_data={},
+            is_active=True
+        ))
+        
+        with pytest.raises(IntegrityError):
+            db.session.commit()
+        db.session.rollback()
+
+class TestDynamicPlanCache:
+    """Test reuse of generated plan data between regenerations"""
+    
+    def test_unchanged_history_reuses_generated_plans(self, client, db, auth_headers, sample_user, sample_workout, sample_exercises, monkeypatch):
+        """Test regenerating twice builds the plans once, and logging an exercise rebuilds them"""
+        from app.models.plan import WeeklyWorkoutPlan
+        from app.services.dynamic_plan_generator import DynamicPlanGenerator
+        
+        calls = []
+        generate = DynamicPlanGenerator.generate_dynamic_plans
+        
+        def counting(user_id, workout_data):
+            calls.append(user_id)
+            return generate(user_id, workout_data)
+        monkeypatch.setattr(DynamicPlanGenerator, 'generate_dynamic_plans', counting)
+        user_id = sample_user.user_id
+        session_id = sample_workout.session_id
+        
+        first = DynamicPlanGenerator.generate_plans_from_workout(user_id)
+        second = DynamicPlanGenerator.generate_plans_from_workout(user_id)
+        
+        assert first['success'] is True and second['success'] is True
+        assert len(calls) == 1
+        assert second['workout_plan'].plan_data == first['workout_plan'].plan_data
+        assert WeeklyWorkoutPlan.query.filter_by(user_id=user_id, is_active=True).count() == 1
+        
+        response = client.post(f'/api/workouts/sessions/{session_id}/exercises',
+            headers=auth_headers,
+            json={'exercise_type': 'plank', 'total_reps': 1}
+        )
+        assert response.status_code == 201
+        
+        DynamicPlanGenerator.generate_plans_from_workout(user_id)
+        assert len(calls) == 2
+    
+    def test_goal_change_rebuilds_plans_without_invalidation(self, app, db, sample_user, sample_exercises, monkeypatch):
+        """Test a cached build is tagged with the goal, so another worker's goal change is picked up"""
+        from app.services.dynamic_plan_generator import DynamicPlanGenerator
+        
+        calls = []
+        generate = DynamicPlanGenerator.generate_dynamic_plans
+        
+        def counting(user_id, workout_data):
+            calls.append(user_id)
+            return generate(user_id, workout_data)
+        monkeypatch.setattr(DynamicPlanGenerator, 'generate_dynamic_plans', counting)
+        user_id = sample_user.user_id
+        
+        DynamicPlanGenerator.generate_plans_from_workout(user_id)
+        # Written directly, as another process would; this worker's cache isn't told
+        sample_user.profile.fitness_goal = 'weight_loss'
+        db.session.commit()
+        DynamicPlanGenerator.generate_plans_from_workout(user_id)
+        
+        assert len(calls) == 2
+    
+    def test_profile_goal_update_invalidates_plans(self, app, client, db, auth_headers, sample_user, sample_exercises):
+        """Test PUT /profile drops the cached plan build like PUT /profile/goals does"""
+        from app.services.dynamic_plan_generator import DynamicPlanGenerator
+        from app.utils.cache import DYNAMIC_PLANS
+        
+        user_id = sample_user.user_id
+        DynamicPlanGenerator.generate_plans_from_workout(user_id)
+        assert (DYNAMIC_PLANS, user_id) in app.extensions['user_cache']
+        
+        response = client.put('/api/users/profile',
+            headers=auth_headers,
+            json={'fitness_goal': 'muscle_gain'}
+        )
+        
+        assert response.status_code == 200
+        assert (DYNAMIC_PLANS, user_id) not in app.extensions['user_cache']
+
+
+class TestFitnessProfile:
+    """Test workout history analysis for dynamic plans"""
+    
+    def test_history_aggregated_in_sql(self, db, sample_user, workout_history, sample_exercises, query_counter):
+        """Test session and per-exercise averages come from aggregate queries, not row loads"""
+        from app.services.dynamic_plan_generator import DynamicPlanGenerator
+        
+        user_id = sample_user.user_id
+        query_counter.clear()
+        profile = DynamicPlanGenerator._analyze_fitness_profile(user_id, {'total_reps': 30})
+        
+        # Sessions (with the fitness goal), then exercises grouped by type
+        assert len(query_counter) == 2
+        assert profile['total_workouts'] == 11
+        assert profile['avg_form_score'] == pytest.approx((sum(80 + i for i in range(10)) + 85.5) / 11)
+        assert profile['avg_calories_per_workout'] == 250
+        assert profile['strengths'] == ['lunges', 'pushups', 'squats']
+        assert profile['fitness_goal'] == 'general_fitness'
+    
+    def test_latest_session_exercises_loaded_once(self, db, sample_user, workout_history, sample_exercises, query_counter):
+        """Test plan generation reads exercise logs in two statements however long the history is"""
+        from app.services.dynamic_plan_generator import DynamicPlanGenerator
+        
+        user_id = sample_user.user_id
+        query_counter.clear()
+        result = DynamicPlanGenerator.generate_plans_from_workout(user_id)
+        
+        assert result['success'] is True
+        # Latest session with its first exercise, then the per-exercise aggregate
+        assert len([q for q in query_counter if 'exercise_logs' in q]) == 2
+    
+    def test_logged_exercise_type_spellings_categorized(self, db, sample_user, sample_workout):
+        """Test the app's own singular exercise types get a category, not Full Body"""
+        from app.models.workout import ExerciseLog
+        from app.services.dynamic_plan_generator import DynamicPlanGenerator
+        
+        db.session.add(ExerciseLog(session_id=sample_workout.session_id, exercise_type='pushup', total_reps=10))
+        db.session.commit()
+        
+        result = DynamicPlanGenerator.generate_plans_from_workout(sample_user.user_id)
+        
+        assert result['message'] == 'Plans generated based on your Push workout!'
+    
+    def test_first_exercise_of_bulk_log_sets_category(self, client, db, auth_headers, sample_user, sample_workout):
+        """Test the plan category follows the first exercise of a bulk log, though its rows share a millisecond"""
+        from app.services.dynamic_plan_generator import DynamicPlanGenerator
+        
+        exercises = ['squats', 'pushups', 'lunges', 'plank', 'deadlift', 'crunches', 'pullups', 'bench press']
+        client.post(f'/api/workouts/sessions/{sample_workout.session_id}/exercises/bulk',
+            headers=auth_headers,
+            json={'exercises': [{'exercise_type': name, 'total_reps': 10} for name in exercises]}
+        )
+        
+        result = DynamicPlanGenerator.generate_plans_from_workout(sample_user.user_id)
+        
+        assert result['message'] == 'Plans generated based on your Legs workout!'
+    
+    def test_empty_latest_session_is_not_skipped(self, db, sample_user, sample_exercises):
+        """Test a newer session without exercises blocks generation rather than reusing an older one"""
+        from app.models.workout import WorkoutSession
+        from app.services.dynamic_plan_generator import DynamicPlanGenerator
+        
+        db.session.add(WorkoutSession(user_id=sample_user.user_id, session_date=datetime.utcnow() + timedelta(minutes=1)))
+        db.session.commit()
+        
+        result = DynamicPlanGenerator.generate_plans_from_workout(sample_user.user_id)
+        
+        assert result['success'] is False
+
 
 class TestGenerateMealPlan:
     """Test meal plan generation"""
@@ -44,3 +244,98 @@ class TestGenerateMealPlan:
         if response.status_code == 201:
             assert data['success'] is True
             assert 'plan' in data['data']
+
+
+class TestPlanHistory:
+    """Test plan history listings"""
+    
+    def test_workout_plan_history_matches_plan_serialization(self, client, db, auth_headers, sample_workout_plan):
+        """Test row-based history returns the same payload as WeeklyWorkoutPlan.to_dict"""
+        expected = sample_workout_plan.to_dict()
+        
+        response = client.get('/api/plans/workout/history',
+            headers=auth_headers
+        )
+        
+        assert response.status_code == 200
+        assert response.get_json()['data']['plans'] == [expected]
+    
+    def test_current_workout_plan_matches_plan_serialization(self, client, db, auth_headers, sample_workout_plan):
+        """Test the row-based current plan returns the same payload as WeeklyWorkoutPlan.to_dict"""
+        expected = sample_workout_plan.to_dict()
+        
+        response = client.get('/api/plans/workout/current',
+            headers=auth_headers
+        )
+        
+        assert response.status_code == 200
+        assert response.get_json()['data']['plan'] == expected
+    
+    def test_meal_plan_history_matches_plan_serialization(self, client, db, auth_headers, sample_meal_plan):
+        """Test row-based history returns the same payload as WeeklyMealPlan.to_dict"""
+        expected = sample_meal_plan.to_dict()
+        
+        response = client.get('/api/plans/meal/history',
+            headers=auth_headers
+        )
+        
+        assert response.status_code == 200
+        assert response.get_json()['data']['plans'] == [expected]
+
+
+class TestPlanGenerationJobs:
+    """Test background workout plan generation"""
+    
+    def test_async_generate_returns_job_and_completes(self, client, db, auth_headers, sample_user, wait_for_job):
+        """Test async=true returns 202 and the generated plan becomes pollable by its owner"""
+        response = client.post('/api/plans/workout/generate?async=true',
+            headers=auth_headers
+        )
+        
+        assert response.status_code == 202
+        job_id = response.get_json()['job_id']
+        
+        job = wait_for_job(f'/api/plans/workout/status/{job_id}', auth_headers)
+        
+        assert job['status'] == 'completed'
+        assert job['result']['success'] is True
+        assert 'plan' in job['result']['data']
+    
+    def test_job_status_hidden_from_other_users(self, client, db, auth_headers, admin_headers, sample_user, wait_for_job):
+        """Test a job can only be polled by the user who started it"""
+        response = client.post('/api/plans/workout/generate',
+            json={'async': True},
+            headers=auth_headers
+        )
+        job_id = response.get_json()['job_id']
+        
+        response = client.get(f'/api/plans/workout/status/{job_id}', headers=admin_headers)
+        
+        assert response.status_code == 404
+        
+        # Let the job finish before the database is torn down
+        wait_for_job(f'/api/plans/workout/status/{job_id}', auth_headers)
+
+
+class TestCurrentUser:
+    """Test the per-request current user loader"""
+    
+    def test_user_and_profile_loaded_in_one_query(self, app, db, auth_headers, sample_user, query_counter):
+        """Test the profile is joined in and repeated lookups reuse the loaded user"""
+        from flask_jwt_extended import verify_jwt_in_request
+        from sqlalchemy.exc import InvalidRequestError
+        from app.utils.current_user import get_current_user
+        
+        fitness_level = sample_user.profile.fitness_level
+        db.session.expunge_all()
+        with app.test_request_context(headers=auth_headers):
+            verify_jwt_in_request()
+            query_counter.clear()
+            
+            user = get_current_user()
+            assert user.profile.fitness_level == fitness_level
+            assert get_current_user() is user
+            assert len(query_counter) == 1
+            
+            with pytest.raises(InvalidRequestError):
+                user.sessions
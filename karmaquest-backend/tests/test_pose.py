@@ -0,0 +1,150 @@
+"""
+Test cases for Pose routes
+Tests: /api/pose/process-video (background mode), /api/pose/status/<job_id>, /api/pose/detect and video cleanup
+"""
+import io
+import os
+import time
+from types import SimpleNamespace
+from app.utils.concurrency import SlotPool
+from app.services.video_jobs import OutputIndex, VIDEO_UPLOAD_DIR, cleanup_expired_outputs
+
+
+class TestVideoJobs:
+    """Test background video processing jobs"""
+    
+    def test_async_upload_returns_job_and_completes(self, client, monkeypatch, wait_for_job):
+        """Test async upload returns 202 and the job result becomes pollable"""
+        def fake_process(input_path, output_path, exercise_type):
+            assert os.path.dirname(input_path) == VIDEO_UPLOAD_DIR
+            os.unlink(input_path)
+            return {'success': True, 'exercise_type': exercise_type, 'total_reps': 5}
+        monkeypatch.setattr('app.routes.pose.process_video_file', fake_process)
+        
+        response = client.post('/api/pose/process-video',
+            data={'video': (io.BytesIO(b'fake video'), 'workout.mp4'), 'exercise_type': 'squats', 'async': 'true'},
+            content_type='multipart/form-data'
+        )
+        
+        assert response.status_code == 202
+        job_id = response.get_json()['job_id']
+        
+        job = wait_for_job(f'/api/pose/status/{job_id}')
+        
+        assert job['status'] == 'completed'
+        assert job['result']['total_reps'] == 5
+    
+    def test_upload_over_size_limit(self, app, client, monkeypatch):
+        """Test uploads above MAX_CONTENT_LENGTH are rejected with 413"""
+        monkeypatch.setitem(app.config, 'MAX_CONTENT_LENGTH', 1024 * 1024)
+        
+        response = client.post('/api/pose/process-video',
+            data={'video': (io.BytesIO(b'0' * (2 * 1024 * 1024)), 'workout.mp4')},
+            content_type='multipart/form-data'
+        )
+        
+        assert response.status_code == 413
+        assert response.get_json()['success'] is False
+    
+    def test_status_for_unknown_job(self, client):
+        """Test polling an unknown job id returns 404"""
+        response = client.get('/api/pose/status/does-not-exist')
+        
+        assert response.status_code == 404
+
+
+class TestVideoDownload:
+    """Test processed video downloads"""
+    
+    def test_download_supports_range_requests(self, client):
+        """Test a Range request returns only the requested bytes with caching headers"""
+        from app.services.video_jobs import new_output_path
+        
+        path = new_output_path()
+        with open(path, 'wb') as f:
+            f.write(b'0123456789')
+        try:
+            response = client.get(f'/api/pose/download/{os.path.basename(path)}',
+                headers={'Range': 'bytes=2-5'}
+            )
+            
+            assert response.status_code == 206
+            assert response.data == b'2345'
+            assert 'max-age=3600' in response.headers['Cache-Control']
+        finally:
+            os.unlink(path)
+    
+    def test_download_missing_video(self, client):
+        """Test downloading an unknown video returns 404"""
+        response = client.get('/api/pose/download/processed_0.mp4')
+        
+        assert response.status_code == 404
+
+
+class TestPoseSlots:
+    """Test the bound on concurrent pose inference"""
+    
+    def test_detect_returns_503_when_slots_are_taken(self, app, client, monkeypatch):
+        """Test a frame is rejected with Retry-After once every inference slot is busy"""
+        fake_service = SimpleNamespace(detect_pose=lambda image: {'success': True, 'keypoints': []})
+        monkeypatch.setattr('app.routes.pose.get_pose_service', lambda: fake_service)
+        monkeypatch.setitem(app.extensions, 'pose_slots', SlotPool(size=1, timeout=0))
+        
+        response = client.post('/api/pose/detect', json={'image': 'frame'})
+        assert response.status_code == 200
+        
+        with app.extensions['pose_slots'].slot():
+            response = client.post('/api/pose/detect', json={'image': 'frame'})
+        
+        assert response.status_code == 503
+        assert response.headers['Retry-After'] == '1'
+        assert response.get_json()['success'] is False
+
+
+class TestFrameUploads:
+    """Test frame input formats for /detect and /analyze-frame"""
+    
+    def test_analyze_frame_accepts_multipart_bytes(self, client, monkeypatch):
+        """Test a multipart 'frame' upload reaches the service as raw bytes"""
+        received = []
+        fake_service = SimpleNamespace(detect_pose=lambda image: received.append(image) or {'success': True, 'keypoints': []})
+        monkeypatch.setattr('app.routes.pose.get_pose_service', lambda: fake_service)
+        
+        response = client.post('/api/pose/analyze-frame',
+            data={'frame': (io.BytesIO(b'\xff\xd8jpeg'), 'frame.jpg'), 'exercise_type': 'lunge'},
+            content_type='multipart/form-data'
+        )
+        
+        assert response.status_code == 200
+        assert response.get_json()['exercise_type'] == 'lunge'
+        assert received == [b'\xff\xd8jpeg']
+    
+    def test_detect_without_image_returns_400(self, client):
+        """Test a request with neither a frame nor an image is rejected"""
+        response = client.post('/api/pose/detect', json={'session_id': 'abc'})
+        
+        assert response.status_code == 400
+
+
+class TestVideoCleanup:
+    """Test expiry of processed videos"""
+    
+    def test_cleanup_deletes_only_expired_outputs(self, app, tmp_path, monkeypatch):
+        """Test files older than VIDEO_OUTPUT_MAX_AGE are deleted and newer ones kept"""
+        old_video = tmp_path / 'processed_old.mp4'
+        new_video = tmp_path / 'processed_new.mp4'
+        old_video.write_bytes(b'old')
+        new_video.write_bytes(b'new')
+        
+        index = OutputIndex()
+        index.add(str(old_video), time.time() - 7200)
+        index.add(str(new_video))
+        monkeypatch.setitem(app.extensions, 'video_outputs', index)
+        monkeypatch.setitem(app.config, 'VIDEO_OUTPUT_MAX_AGE', 3600)
+        
+        with app.app_context():
+            cleanup_expired_outputs()
+        
+        assert not old_video.exists()
+        assert new_video.exists()
+        assert len(index) == 1
@@ -18,6 +18,105 @@ class TestProgressSummary:
         data = response.get_json()
         assert data['success'] is True
         assert 'total_workouts' in data['data']
+    
+    def test_summary_aggregates_and_streak(self, client, db, auth_headers, workout_history, monkeypatch):
+        """Test totals and a streak that spans several windows of workout days"""
+        monkeypatch.setattr('app.routes.progress.STREAK_WINDOW_DAYS', 3)
+        
+        response = client.get('/api/progress/summary',
+            headers=auth_headers
+        )
+        
+        assert response.status_code == 200
+        data = response.get_json()['data']
+        assert data['total_workouts'] == 10
+        assert data['total_reps'] == 300
+        assert data['total_calories'] == 2500.0
+        assert data['current_streak'] == 10
+    
+    def test_streak_reads_only_recent_window(self, app, db, sample_user, query_counter):
+        """Test a short streak is found with one windowed query, ignoring older history"""
+        from app.models.workout import WorkoutSession
+        from app.routes.progress import _current_streak
+        from datetime import datetime, timedelta
+        now = datetime.utcnow()
+        user_id = sample_user.user_id
+        for days_ago in (0, 1, 3, 100, 101):
+            db.session.add(WorkoutSession(user_id=user_id, session_date=now - timedelta(days=days_ago)))
+        db.session.commit()
+        query_counter.clear()
+        
+        assert _current_streak(user_id, now.date()) == 2
+        assert len(query_counter) == 1
+    
+    def test_summary_weight_change(self, client, db, auth_headers, sample_user, query_counter):
+        """Test weight change is latest minus first weigh-in, read alongside the totals"""
+        from app.models.progress import UserProgress
+        from datetime import date
+        for day, weight in [(date(2025, 1, 1), 80.0), (date(2025, 1, 15), 78.5), (date(2025, 2, 1), 77.0)]:
+            db.session.add(UserProgress(user_id=sample_user.user_id, weight=weight, date=day))
+        db.session.commit()
+        query_counter.clear()
+        
+        response = client.get('/api/progress/summary',
+            headers=auth_headers
+        )
+        
+        assert response.status_code == 200
+        assert response.get_json()['data']['weight_change'] == -3.0
+        # One row for totals and weigh-ins, one page of streak days
+        assert len(query_counter) == 2
+
+
+class TestSummaryCache:
+    """Test cached progress responses are refreshed by writes"""
+    
+    def test_summary_cached_until_workout_started(self, client, db, auth_headers, workout_history, query_counter):
+        """Test a repeated summary is served from cache and a new session invalidates it"""
+        first = client.get('/api/progress/summary', headers=auth_headers).get_json()
+        
+        query_counter.clear()
+        cached = client.get('/api/progress/summary', headers=auth_headers).get_json()
+        assert cached == first
+        assert not any('workout_sessions' in statement for statement in query_counter)
+        
+        client.post('/api/workouts/sessions/start', headers=auth_headers)
+        
+        refreshed = client.get('/api/progress/summary', headers=auth_headers).get_json()
+        assert refreshed['data']['total_workouts'] == first['data']['total_workouts'] + 1
+
+
+class TestBulkWeight:
+    """Test batched weigh-in logging"""
+    
+    def test_bulk_weight_saves_all_entries(self, client, db, auth_headers, sample_user):
+        """Test every entry is saved and shows up in the summary's weight change"""
+        response = client.post('/api/progress/weight/bulk',
+            json={'entries': [
+                {'weight': 82.0, 'date': '2025-01-01'},
+                {'weight': 81.0, 'date': '2025-01-08'},
+                {'weight': 79.5, 'date': '2025-01-15'}
+            ]},
+            headers=auth_headers
+        )
+        
+        assert response.status_code == 201
+        assert [entry['date'] for entry in response.get_json()['data']['progress']] == ['2025-01-01', '2025-01-08', '2025-01-15']
+        
+        summary = client.get('/api/progress/summary', headers=auth_headers).get_json()
+        assert summary['data']['weight_change'] == -2.5
+    
+    def test_bulk_weight_rejects_invalid_entry(self, client, db, auth_headers, sample_user):
+        """Test one bad entry rejects the whole batch"""
+        from app.models.progress import UserProgress
+        
+        response = client.post('/api/progress/weight/bulk',
+            json={'entries': [{'weight': 80.0}, {'date': '2025-01-01'}]},
+            headers=auth_headers
+        )
+        
+        assert response.status_code == 400
+        assert UserProgress.query.count() == 0
 
 
 class TestWeeklyProgress:
@@ -32,3 +131,35 @@ class TestWeeklyProgress:
         assert response.status_code == 200
         data = response.get_json()
         assert data['success'] is True
+
+    
+    def test_weekly_sessions_with_exercises(self, client, db, auth_headers, workout_history, query_counter):
+        """Test only the last week's sessions are listed, with their exercises from a single query"""
+        from app.models.workout import ExerciseLog
+        for session in workout_history:
+            db.session.add(ExerciseLog(session_id=session.session_id, exercise_type='squats', total_reps=10))
+        db.session.commit()
+        query_counter.clear()
+        
+        response = client.get('/api/progress/weekly',
+            headers=auth_headers
+        )
+        
+        assert response.status_code == 200
+        sessions = response.get_json()['data']['sessions']
+        assert len(sessions) == 7
+        assert all(s['primary_exercise'] == 'squats' for s in sessions)
+        assert len([q for q in query_counter if 'FROM exercise_logs' in q]) == 1
+
+class TestAchievements:
+    """Test achievement unlocking"""
+    
+    def test_achievements_from_workout_totals(self, client, db, auth_headers, workout_history):
+        """Test 10 workouts with 300 reps unlock the matching achievements"""
+        response = client.get('/api/progress/achievements',
+            headers=auth_headers
+        )
+        
+        assert response.status_code == 200
+        names = [a['name'] for a in response.get_json()['data']['achievements']]
+        assert names == ['First Workout', '10 Workouts', '100 Reps']
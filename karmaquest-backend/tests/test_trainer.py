@@ -20,7 +20,79 @@ class TestGetAssignedClients:
         assert response.status_code == 200
         data = response.get_json()
         assert data['success'] is True
+    
+    def test_client_workout_stats_in_constant_queries(self, client, db, trainer_headers, trainer_with_clients, query_counter):
+        """Test clients and their workout stats come from a single query, whatever the client count"""
+        trainer, clients = trainer_with_clients
+        from app.models.workout import WorkoutSession
+        last_date = datetime(2025, 3, 10, 8, 30)
+        for days_ago in range(3):
+            db.session.add(WorkoutSession(user_id=clients[0].user_id, session_date=last_date - timedelta(days=days_ago)))
+        db.session.commit()
+        client_ids = {c.user_id for c in clients}
+        # First request caches the trainer's client ids
+        client.get('/api/trainer/clients', headers=trainer_headers)
+        query_counter.clear()
+        
+        response = client.get('/api/trainer/clients',
+            headers=trainer_headers
+        )
+        
+        assert response.status_code == 200
+        listed = {c['user_id']: c for c in response.get_json()['data']['clients']}
+        assert set(listed) == client_ids
+        assert listed[clients[0].user_id]['total_workouts'] == 3
+        assert listed[clients[0].user_id]['last_workout_date'] == last_date.isoformat()
+        assert listed[clients[1].user_id]['total_workouts'] == 0
+        assert listed[clients[1].user_id]['last_workout_date'] is None
+        assert len(query_counter) == 1
+
+
+class TestDashboardStats:
+    """Test trainer dashboard aggregates"""
+    
+    def test_dashboard_stats_from_assigned_clients(self, client, db, trainer_headers, trainer_with_clients, sample_user, query_counter):
+        """Test counts and the 30-day average cover only assigned clients, and old workouts still count as active"""
+        trainer, clients = trainer_with_clients
+        from app.models.workout import WorkoutSession
+        now = datetime.utcnow()
+        db.session.add_all([
+            WorkoutSession(user_id=clients[0].user_id, session_date=now, avg_posture_score=80.0),
+            WorkoutSession(user_id=clients[0].user_id, session_date=now - timedelta(days=60), avg_posture_score=10.0),
+            WorkoutSession(user_id=clients[1].user_id, session_date=now, avg_posture_score=91.0),
+            WorkoutSession(user_id=clients[2].user_id, session_date=now - timedelta(days=90), avg_posture_score=20.0),
+            WorkoutSession(user_id=sample_user.user_id, session_date=now, avg_posture_score=0.0)
+        ])
+        db.session.commit()
+        client.get('/api/trainer/dashboard/stats', headers=trainer_headers)
+        query_counter.clear()
+        
+        response = client.get('/api/trainer/dashboard/stats',
+            headers=trainer_headers
+        )
+        
+        assert response.status_code == 200
+        stats = response.get_json()['data']
+        assert stats['total_clients'] == 3
+        assert stats['active_clients'] == 3
+        assert stats['total_workouts_this_week'] == 2
+        assert stats['avg_performance_score'] == 85.5
+        assert len(query_counter) == 1
 
+    
+    def test_token_decoded_once_per_request(self, client, db, trainer_headers, monkeypatch):
+        """Test the role check reuses the token jwt_required() already decoded"""
+        from flask_jwt_extended import view_decorators
+        decodes = []
+        decode = view_decorators._decode_jwt_from_request
+        monkeypatch.setattr(view_decorators, '_decode_jwt_from_request', lambda *args, **kwargs: decodes.append(1) or decode(*args, **kwargs))
+        
+        response = client.get('/api/trainer/dashboard/stats',
+            headers=trainer_headers
+        )
+        
+        assert response.status_code == 200
+        assert len(decodes) == 1
 
 class TestGetClientPerformance:
     """Test trainer viewing client performance"""
@@ -51,3 +123,265 @@ class TestGetClientPerformance:
         assert response.status_code == 200
         data = response.get_json()
         assert data['success'] is True
+        assert data['data']['total_workouts'] == 5
+        assert data['data']['avg_duration'] == 30.0
+        assert data['data']['total_calories'] == 1250
+        assert data['data']['avg_form_score'] == 85.0
+        assert [s['exercises_count'] for s in data['data']['workout_history']] == [3] * 5
+    
+    def test_history_exercise_counts_from_logs(self, client, db, trainer_headers, trainer_with_clients):
+        """Test each history entry counts its own exercise logs and falls back to total_exercises"""
+        trainer, clients = trainer_with_clients
+        client_id = clients[0].user_id
+        from app.models.workout import WorkoutSession, ExerciseLog
+        logged = WorkoutSession(user_id=client_id, session_date=datetime.utcnow(), total_exercises=5)
+        logged.exercises = [ExerciseLog(exercise_type='squat'), ExerciseLog(exercise_type='lunge')]
+        unlogged = WorkoutSession(user_id=client_id, session_date=datetime.utcnow() - timedelta(days=1), total_exercises=4)
+        db.session.add_all([logged, unlogged])
+        db.session.commit()
+        
+        response = client.get(f'/api/trainer/clients/{client_id}/performance',
+            headers=trainer_headers
+        )
+        
+        assert response.status_code == 200
+        assert [s['exercises_count'] for s in response.get_json()['data']['workout_history']] == [2, 4]
+    
+    def test_long_window_totals_summed_in_batches(self, client, db, trainer_headers, trainer_with_clients, query_counter):
+        """Test a window past the batching threshold gives the same totals as one aggregate"""
+        trainer, clients = trainer_with_clients
+        client_id = clients[0].user_id
+        from app.models.workout import WorkoutSession
+        for days_ago, score in [(1, 90.0), (100, 70.0), (250, 30.0), (390, 50.0), (500, 10.0)]:
+            db.session.add(WorkoutSession(
+                user_id=client_id,
+                session_date=datetime.utcnow() - timedelta(days=days_ago),
+                duration_seconds=600,
+                total_calories=100,
+                avg_posture_score=score
+            ))
+        db.session.commit()
+        query_counter.clear()
+        
+        response = client.get(f'/api/trainer/clients/{client_id}/performance?days=400',
+            headers=trainer_headers
+        )
+        
+        assert response.status_code == 200
+        data = response.get_json()['data']
+        assert data['total_workouts'] == 4
+        assert data['avg_duration'] == 10.0
+        assert data['total_calories'] == 400
+        assert data['avg_form_score'] == 60.0
+        assert sum('sum(workout_sessions.total_calories)' in statement for statement in query_counter) == 5
+    
+    def test_trainer_cannot_view_unassigned_client(self, client, db, trainer_headers, trainer_with_clients, sample_user):
+        """Test the assignment check rejects clients of other trainers"""
+        response = client.get(f'/api/trainer/clients/{sample_user.user_id}/performance',
+            headers=trainer_headers
+        )
+        
+        assert response.status_code == 403
+
+    
+    def test_assignment_check_cached_across_requests(self, app, db, trainer_headers, trainer_with_clients, sample_user, query_counter):
+        """Test the trainer's client ids are read once and answer later checks from the cache"""
+        from flask_jwt_extended import verify_jwt_in_request
+        from app.utils.current_user import is_assigned_client
+        client_id = trainer_with_clients[1][0].user_id
+        other_id = sample_user.user_id
+        query_counter.clear()
+        
+        for _ in range(2):
+            with app.test_request_context(headers=trainer_headers):
+                verify_jwt_in_request()
+                assert is_assigned_client(client_id) is True
+                assert is_assigned_client(other_id) is False
+        
+        assert len(query_counter) == 1
+    
+    def test_empty_roster_skips_queries(self, client, db, trainer_headers, sample_trainer, query_counter):
+        """Test a trainer without clients gets empty results from the cached roster alone"""
+        client.get('/api/trainer/clients', headers=trainer_headers)
+        query_counter.clear()
+        
+        clients_response = client.get('/api/trainer/clients', headers=trainer_headers)
+        stats_response = client.get('/api/trainer/dashboard/stats', headers=trainer_headers)
+        
+        assert clients_response.get_json()['data']['clients'] == []
+        assert stats_response.get_json()['data']['total_clients'] == 0
+        assert query_counter == []
+
+class TestGetClientWorkoutSession:
+    """Test trainer viewing a single client session"""
+    
+    def test_session_detail_loads_exercises_once(self, client, db, trainer_headers, trainer_with_clients, query_counter):
+        """Test the session and its exercise logs come from a single joined query"""
+        trainer, clients = trainer_with_clients
+        from app.models.workout import WorkoutSession, ExerciseLog
+        session = WorkoutSession(user_id=clients[0].user_id, session_date=datetime.utcnow())
+        session.exercises = [ExerciseLog(exercise_type='squat', total_reps=12), ExerciseLog(exercise_type='lunge', total_reps=8)]
+        db.session.add(session)
+        db.session.commit()
+        url = f'/api/trainer/clients/{clients[0].user_id}/sessions/{session.session_id}'
+        query_counter.clear()
+        
+        response = client.get(url, headers=trainer_headers)
+        
+        assert response.status_code == 200
+        logs = response.get_json()['data']['exercise_logs']
+        assert sorted(log['exercise_name'] for log in logs) == ['lunge', 'squat']
+        # Assignment check, session joined to its exercises
+        assert len(query_counter) == 2
+    
+    def test_session_detail_without_exercises(self, client, db, trainer_headers, trainer_with_clients):
+        """Test a session with no exercise logs still returns its details"""
+        trainer, clients = trainer_with_clients
+        from app.models.workout import WorkoutSession
+        session = WorkoutSession(user_id=clients[0].user_id, duration_seconds=600)
+        db.session.add(session)
+        db.session.commit()
+        
+        response = client.get(f'/api/trainer/clients/{clients[0].user_id}/sessions/{session.session_id}',
+            headers=trainer_headers
+        )
+        
+        assert response.status_code == 200
+        data = response.get_json()['data']
+        assert data['duration'] == 10
+        assert data['exercise_logs'] == []
+
+
+class TestClientFeedback:
+    """Test trainer feedback notes"""
+    
+    def test_feedback_appended_without_loading_exercises(self, client, db, trainer_headers, trainer_with_clients, query_counter):
+        """Test feedback lands on the latest session and its exercises are never queried"""
+        trainer, clients = trainer_with_clients
+        from app.models.workout import WorkoutSession, ExerciseLog
+        latest = WorkoutSession(user_id=clients[0].user_id, session_date=datetime.utcnow())
+        latest.exercises = [ExerciseLog(exercise_type='squat')]
+        db.session.add_all([latest, WorkoutSession(user_id=clients[0].user_id, session_date=datetime.utcnow() - timedelta(days=1))])
+        db.session.commit()
+        latest_id = latest.session_id
+        url = f'/api/trainer/clients/{clients[0].user_id}/feedback'
+        db.session.expunge_all()
+        query_counter.clear()
+        
+        response = client.post(url,
+            json={'feedback': 'Keep your back straight'},
+            headers=trainer_headers
+        )
+        
+        assert response.status_code == 200
+        assert response.get_json()['data']['session_id'] == latest_id
+        assert not any('exercise_logs' in statement for statement in query_counter)
+    
+    def test_feedback_appended_in_sql_update(self, client, db, trainer_headers, trainer_with_clients, query_counter):
+        """Test feedback is appended to existing notes by an UPDATE without reading them first"""
+        trainer, clients = trainer_with_clients
+        from app.models.workout import WorkoutSession
+        session = WorkoutSession(user_id=clients[0].user_id, session_notes='Felt strong')
+        db.session.add(session)
+        db.session.commit()
+        session_id = session.session_id
+        url = f'/api/trainer/clients/{clients[0].user_id}/feedback'
+        db.session.expunge_all()
+        query_counter.clear()
+        
+        response = client.post(url,
+            json={'feedback': 'Go deeper on squats', 'session_id': session_id},
+            headers=trainer_headers
+        )
+        
+        assert response.status_code == 200
+        feedback_note = response.get_json()['data']['feedback']
+        assert not any('session_notes' in statement for statement in query_counter if statement.lstrip().startswith('SELECT'))
+        assert db.session.get(WorkoutSession, session_id).session_notes == 'Felt strong\n\n' + feedback_note
+    
+    def test_feedback_on_unknown_session_not_found(self, client, db, trainer_headers, trainer_with_clients):
+        """Test feedback for a session the client doesn't own is a 404"""
+        trainer, clients = trainer_with_clients
+        
+        response = client.post(f'/api/trainer/clients/{clients[0].user_id}/feedback',
+            json={'feedback': 'Nice work', 'session_id': 'missing-session'},
+            headers=trainer_headers
+        )
+        
+        assert response.status_code == 404
+
+
+class TestClientPlans:
+    """Test trainer views of client plans"""
+    
+    def test_client_workout_plan_matches_plan_serialization(self, client, db, trainer_headers, trainer_with_clients):
+        """Test the row-based plan read returns the same payload as WeeklyWorkoutPlan.to_dict"""
+        trainer, clients = trainer_with_clients
+        from app.models.plan import WeeklyWorkoutPlan
+        plan = WeeklyWorkoutPlan(
+            user_id=clients[0].user_id,
+            start_date=datetime.utcnow().date(),
+            end_date=(datetime.utcnow() + timedelta(days=7)).date(),
+            plan_data={'days': [{'day': 'Monday', 'exercises': [{'name': 'Squats', 'sets': 3, 'reps': 10}]}]},
+            is_active=True
+        )
+        db.session.add(plan)
+        db.session.commit()
+        expected = plan.to_dict()
+        
+        response = client.get(f'/api/trainer/clients/{clients[0].user_id}/workout-plan',
+            headers=trainer_headers
+        )
+        
+        assert response.status_code == 200
+        assert response.get_json()['data']['plan'] == expected
+    
+    def test_adjust_workout_plan_not_reloaded_after_commit(self, client, db, trainer_headers, trainer_with_clients, query_counter):
+        """Test the adjusted plan is returned without re-selecting it after the commit"""
+        trainer, clients = trainer_with_clients
+        from app.models.plan import WeeklyWorkoutPlan
+        db.session.add(WeeklyWorkoutPlan(
+            user_id=clients[0].user_id,
+            start_date=datetime.utcnow().date(),
+            end_date=(datetime.utcnow() + timedelta(days=7)).date(),
+            plan_data={'days': []},
+            is_active=True
+        ))
+        db.session.commit()
+        url = f'/api/trainer/clients/{clients[0].user_id}/workout-plan'
+        new_plan = {'days': [{'day': 'Friday', 'exercises': [{'name': 'Plank', 'sets': 3}]}]}
+        client.get(url, headers=trainer_headers)
+        query_counter.clear()
+        
+        response = client.put(url, json={'plan_data': new_plan}, headers=trainer_headers)
+        
+        assert response.status_code == 200
+        assert response.get_json()['data']['plan']['plan_data'] == new_plan
+        assert sum(statement.lstrip().startswith('SELECT') for statement in query_counter) == 1
+    
+    def test_client_workout_plan_not_modified(self, client, db, trainer_headers, trainer_with_clients, query_counter):
+        """Test a matching If-None-Match gets a 304 without reading the plan JSON, and edits change the ETag"""
+        trainer, clients = trainer_with_clients
+        from app.models.plan import WeeklyWorkoutPlan
+        db.session.add(WeeklyWorkoutPlan(
+            user_id=clients[0].user_id,
+            start_date=datetime.utcnow().date(),
+            end_date=(datetime.utcnow() + timedelta(days=7)).date(),
+            plan_data={'days': []},
+            is_active=True
+        ))
+        db.session.commit()
+        url = f'/api/trainer/clients/{clients[0].user_id}/workout-plan'
+        etag = client.get(url, headers=trainer_headers).headers['ETag']
+        query_counter.clear()
+        
+        response = client.get(url, headers={**trainer_headers, 'If-None-Match': etag})
+        
+        assert response.status_code == 304
+        assert not any('plan_data' in statement for statement in query_counter)
+        
+        client.put(url, json={'plan_data': {'days': [{'day': 'Monday'}]}}, headers=trainer_headers)
+        response = client.get(url, headers={**trainer_headers, 'If-None-Match': etag})
+        
+        assert response.status_code == 200
+        assert response.headers['ETag'] != etag
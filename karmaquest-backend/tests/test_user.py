@@ -3,6 +3,7 @@ Test cases for User Profile routes
 Tests: /api/users/profile (GET, PUT)
 """
 import pytest
+import time
 
 
 class TestGetUserProfile:
@@ -63,3 +64,72 @@ class TestUpdateUserProfile:
         assert data['data']['profile']['fitness_level'] == 'advanced'
         assert data['data']['profile']['fitness_goal'] == 'muscle_gain'
         assert data['data']['profile']['current_weight'] == 75.5
+    
+    def test_update_profile_clears_empty_numbers(self, client, db, auth_headers, sample_user):
+        """Test empty numeric fields clear the value and unknown keys are ignored"""
+        response = client.put('/api/users/profile',
+            headers=auth_headers,
+            json={
+                'current_weight': '',
+                'height': '182',
+                'medical_conditions': 'none',
+                'role': 'admin'
+            }
+        )
+        
+        assert response.status_code == 200
+        data = response.get_json()['data']
+        assert data['profile']['current_weight'] is None
+        assert data['profile']['height'] == 182.0
+        assert data['profile']['medical_conditions'] == 'none'
+        assert data['user']['role'] == 'user'
+    
+    def test_inline_profile_picture_stored_as_file(self, app, client, db, auth_headers, sample_user, tmp_path, monkeypatch):
+        """Test a base64 data URL is written to disk and only its URL is kept"""
+        import base64
+        monkeypatch.setitem(app.config, 'AVATAR_UPLOAD_DIR', str(tmp_path))
+        image_bytes = b'\x89PNG\r\n\x1a\nfake-image'
+        data_url = 'data:image/png;base64,' + base64.b64encode(image_bytes).decode('ascii')
+        
+        response = client.put('/api/users/profile',
+            headers=auth_headers,
+            json={'profile_picture_url': data_url}
+        )
+        
+        assert response.status_code == 200
+        url = response.get_json()['data']['user']['profile_picture_url']
+        assert '/api/users/avatars/' in url
+        
+        avatar = client.get('/api/users/avatars/' + url.rsplit('/', 1)[1])
+        assert avatar.status_code == 200
+        assert avatar.data == image_bytes
+    
+    def test_foreign_avatar_url_rejected(self, app, client, db, auth_headers, sample_user, tmp_path, monkeypatch):
+        """Test another user's avatar URL can't be stored, so a later change can't delete their file"""
+        monkeypatch.setitem(app.config, 'AVATAR_UPLOAD_DIR', str(tmp_path))
+        victim_file = tmp_path / 'someone-else_1700000000000.png'
+        victim_file.write_bytes(b'victim')
+        
+        response = client.put('/api/users/profile',
+            headers=auth_headers,
+            json={'profile_picture_url': 'http://localhost/api/users/avatars/someone-else_1700000000000.png'}
+        )
+        
+        assert response.status_code == 400
+        assert victim_file.exists()
+    
+    def test_replaced_avatar_deleted_after_commit(self, app, client, db, auth_headers, sample_user, tmp_path, monkeypatch):
+        """Test uploading a new avatar removes the user's previous file"""
+        import io
+        monkeypatch.setitem(app.config, 'AVATAR_UPLOAD_DIR', str(tmp_path))
+        
+        for content in (b'first', b'second'):
+            response = client.post('/api/users/profile/avatar',
+                headers=auth_headers,
+                data={'avatar': (io.BytesIO(content), 'me.png')},
+                content_type='multipart/form-data'
+            )
+            assert response.status_code == 200
+            time.sleep(0.002)  # distinct millisecond filenames
+        
+        assert [path.read_bytes() for path in tmp_path.iterdir()] == [b'second']
@@ -22,6 +22,34 @@ class TestStartWorkoutSession:
         assert 'session' in data['data']
         assert 'session_id' in data['data']['session']
 
+    
+    def test_complete_unknown_session_not_found(self, client, db, auth_headers):
+        """Test a session id that doesn't exist gets the standard JSON 404"""
+        response = client.post('/api/workouts/sessions/00000000-0000-0000-0000-000000000000/complete',
+            headers=auth_headers,
+            json={}
+        )
+        
+        assert response.status_code == 404
+        assert response.get_json() == {'success': False, 'error': 'Session not found'}
+
+class TestUpdateWorkoutSession:
+    """Test updating a workout session in progress"""
+    
+    def test_update_session_not_reloaded_after_commit(self, client, db, auth_headers, sample_workout, query_counter):
+        """Test the response is built from the updated instance without re-selecting the session"""
+        url = f'/api/workouts/sessions/{sample_workout.session_id}/update'
+        query_counter.clear()
+        
+        response = client.put(url,
+            headers=auth_headers,
+            json={'duration_seconds': 600}
+        )
+        
+        assert response.status_code == 200
+        assert response.get_json()['data']['session']['duration_seconds'] == 600
+        session_selects = [q for q in query_counter if q.startswith('SELECT') and 'FROM workout_sessions' in q]
+        assert len(session_selects) == 1
 
 class TestCompleteWorkoutSession:
     """Test completing a workout session"""
@@ -41,6 +69,138 @@ class TestCompleteWorkoutSession:
         data = response.get_json()
         assert data['success'] is True
 
+    
+    def test_complete_session_regenerates_plans_inline(self, client, db, auth_headers, sample_workout, sample_exercises):
+        """Test plans generated from the workout are active once the inline request returns"""
+        from app.models.plan import WeeklyWorkoutPlan, WeeklyMealPlan
+        
+        response = client.post(f'/api/workouts/sessions/{sample_workout.session_id}/complete',
+            headers=auth_headers,
+            json={}
+        )
+        
+        assert response.status_code == 200
+        assert WeeklyWorkoutPlan.query.filter_by(user_id=sample_workout.user_id, is_active=True).count() == 1
+        assert WeeklyMealPlan.query.filter_by(user_id=sample_workout.user_id, is_active=True).count() == 1
+    
+    def test_complete_session_commits_once_inline(self, client, db, auth_headers, sample_workout, sample_exercises, monkeypatch):
+        """Test session fields and regenerated plans are written in a single commit"""
+        commits = []
+        commit = db.session.commit
+        monkeypatch.setattr(db.session, 'commit', lambda: commits.append(1) or commit())
+        
+        response = client.post(f'/api/workouts/sessions/{sample_workout.session_id}/complete',
+            headers=auth_headers,
+            json={'duration_seconds': 900}
+        )
+        
+        assert response.status_code == 200
+        assert len(commits) == 1
+    
+    def test_complete_session_saved_when_plan_generation_fails(self, client, db, auth_headers, sample_workout, monkeypatch):
+        """Test a plan generator error doesn't roll back the completed session"""
+        from app.models.workout import WorkoutSession
+        from app.services.dynamic_plan_generator import DynamicPlanGenerator
+        
+        def fail(*args):
+            raise RuntimeError('generator down')
+        monkeypatch.setattr(DynamicPlanGenerator, 'generate_dynamic_plans', fail)
+        session_id = sample_workout.session_id
+        
+        response = client.post(f'/api/workouts/sessions/{session_id}/complete',
+            headers=auth_headers,
+            json={'duration_seconds': 900}
+        )
+        
+        assert response.status_code == 200
+        db.session.expire_all()
+        assert db.session.get(WorkoutSession, session_id).duration_seconds == 900
+    
+    def test_primary_exercise_is_first_of_bulk_log(self, client, db, auth_headers, sample_workout, monkeypatch):
+        """Test plans follow the first exercise of a bulk log, though all its rows share a millisecond"""
+        from app.services.dynamic_plan_generator import DynamicPlanGenerator
+        
+        seen = []
+        generate = DynamicPlanGenerator.generate_dynamic_plans
+        monkeypatch.setattr(DynamicPlanGenerator, 'generate_dynamic_plans',
+                            lambda user_id, workout_data: seen.append(workout_data) or generate(user_id, workout_data))
+        exercises = ['squats', 'pushups', 'lunges', 'plank', 'deadlift', 'crunches', 'pullups', 'bench press']
+        
+        client.post(f'/api/workouts/sessions/{sample_workout.session_id}/exercises/bulk',
+            headers=auth_headers,
+            json={'exercises': [{'exercise_type': name, 'total_reps': 10} for name in exercises]}
+        )
+        response = client.post(f'/api/workouts/sessions/{sample_workout.session_id}/complete',
+            headers=auth_headers,
+            json={}
+        )
+        
+        assert response.status_code == 200
+        assert seen[0]['exercise_type'] == 'squats'
+        assert seen[0]['exercise_category'] == 'Legs'
+    
+    def test_exercise_category_spellings(self, app):
+        """Test spacing, hyphenation, plurals and case variants map to the same category"""
+        from app.routes.workout import exercise_category
+        
+        assert {exercise_category(t) for t in ['pushups', 'Push-Ups', 'push up', 'push_ups']} == {'Push'}
+        assert {exercise_category(t) for t in ['pullups', 'bent_over_row', 'Bicep Curls', 'facepulls']} == {'Pull'}
+        assert {exercise_category(t) for t in ['Squat', 'lunges', 'leg press', 'deadlifts']} == {'Legs'}
+        assert {exercise_category(t) for t in ['plank', 'crunches', 'Russian Twists', 'legraises']} == {'Core'}
+        assert exercise_category('jumping jacks') == 'Full Body'
+    
+    def test_complete_session_totals_from_exercise_logs(self, client, db, auth_headers, sample_workout, sample_exercises):
+        """Test session totals are aggregated from the logged exercises"""
+        response = client.post(f'/api/workouts/sessions/{sample_workout.session_id}/complete',
+            headers=auth_headers,
+            json={'duration_seconds': 900}
+        )
+        
+        assert response.status_code == 200
+        session = response.get_json()['data']['session']
+        assert session['total_exercises'] == 3
+        assert session['total_reps'] == 30
+        assert session['total_calories'] == 240
+        assert session['avg_posture_score'] == 85.0
+        assert len(session['exercises']) == 3
+    
+    def test_complete_session_queues_plan_regeneration(self, app, client, db, auth_headers, sample_workout, monkeypatch):
+        """Test async mode hands plan generation to the plan job pool instead of running it in the request"""
+        from app.models.plan import WeeklyWorkoutPlan
+        submitted = []
+        monkeypatch.setitem(app.config, 'PLAN_REGENERATION_ASYNC', True)
+        monkeypatch.setattr(app.extensions['plan_jobs'], 'submit', lambda fn, *args, owner=None: submitted.append((args, owner)) or 'job-1')
+        
+        response = client.post(f'/api/workouts/sessions/{sample_workout.session_id}/complete',
+            headers=auth_headers,
+            json={'exercise_type': 'squats'}
+        )
+        
+        assert response.status_code == 202
+        assert response.get_json()['job_id'] == 'job-1'
+        assert response.get_json()['status_url'] == '/api/plans/workout/status/job-1'
+        [((user_id, workout_data), owner)] = submitted
+        assert user_id == owner == sample_workout.user_id
+        assert workout_data['exercise_category'] == 'Legs'
+        assert WeeklyWorkoutPlan.query.filter_by(user_id=user_id).count() == 0
+
+    
+    def test_complete_session_job_pollable(self, app, client, db, auth_headers, sample_workout, sample_exercises, monkeypatch, wait_for_job):
+        """Test the 202's status_url reports the background regeneration and the new plan becomes current"""
+        monkeypatch.setitem(app.config, 'PLAN_REGENERATION_ASYNC', True)
+        
+        response = client.post(f'/api/workouts/sessions/{sample_workout.session_id}/complete',
+            headers=auth_headers,
+            json={}
+        )
+        
+        assert response.status_code == 202
+        status_url = response.get_json()['status_url']
+        
+        job = wait_for_job(status_url, auth_headers)
+        
+        assert job['status'] == 'completed'
+        assert client.get('/api/plans/workout/current', headers=auth_headers).status_code == 200
 
 class TestGetWorkoutHistory:
     """Test getting workout history"""
@@ -55,3 +215,157 @@ class TestGetWorkoutHistory:
         data = response.get_json()
         assert data['success'] is True
         assert len(data['data']) > 0
+    
+    def test_history_loads_exercises_in_one_query(self, client, db, auth_headers, workout_history, query_counter):
+        """Test exercise logs for all listed sessions are fetched with a single query"""
+        from app.models.workout import ExerciseLog
+        for session in workout_history:
+            db.session.add(ExerciseLog(session_id=session.session_id, exercise_type='squats', total_reps=10))
+        db.session.commit()
+        query_counter.clear()
+        
+        response = client.get('/api/workouts/sessions/history',
+            headers=auth_headers
+        )
+        
+        assert response.status_code == 200
+        assert len(response.get_json()['data']['sessions'][0]['exercises']) == 1
+        exercise_queries = [q for q in query_counter if 'FROM exercise_logs' in q]
+        assert len(exercise_queries) == 1
+
+    
+    def test_history_pages_with_cursor(self, client, db, auth_headers, workout_history):
+        """Test following next_cursor walks the history without repeats or gaps"""
+        seen = []
+        url = '/api/workouts/sessions/history?limit=4'
+        while True:
+            response = client.get(url, headers=auth_headers)
+            assert response.status_code == 200
+            data = response.get_json()['data']
+            seen.extend(s['session_id'] for s in data['sessions'])
+            if not data['next_cursor']:
+                break
+            url = f"/api/workouts/sessions/history?limit=4&cursor={data['next_cursor']}"
+        
+        assert seen == [s.session_id for s in workout_history]
+    
+    def test_history_rejects_malformed_cursor(self, client, db, auth_headers):
+        """Test a cursor that can't be parsed is a 400, not a server error"""
+        response = client.get('/api/workouts/sessions/history?cursor=not-a-cursor',
+            headers=auth_headers
+        )
+        
+        assert response.status_code == 400
+
+class TestGetWorkoutSession:
+    """Test reading a single workout session"""
+    
+    def test_get_session_with_exercises_in_two_queries(self, client, db, auth_headers, sample_workout, sample_exercises, query_counter):
+        """Test the session and its exercises are loaded with one query each"""
+        url = f'/api/workouts/sessions/{sample_workout.session_id}'
+        db.session.expunge_all()
+        query_counter.clear()
+        
+        response = client.get(url, headers=auth_headers)
+        
+        assert response.status_code == 200
+        session = response.get_json()['data']['session']
+        assert sorted(ex['exercise_type'] for ex in session['exercises']) == ['lunges', 'pushups', 'squats']
+        assert len(query_counter) == 2
+
+
+class TestLogExercise:
+    """Test logging a single exercise"""
+    
+    def test_log_exercise_defaults(self, client, db, auth_headers, sample_workout):
+        """Test fields left out of the payload get their defaults"""
+        response = client.post(f'/api/workouts/sessions/{sample_workout.session_id}/exercises',
+            headers=auth_headers,
+            json={'exercise_type': 'squats', 'total_reps': 12}
+        )
+        
+        assert response.status_code == 201
+        exercise = response.get_json()['data']['exercise']
+        assert exercise['total_reps'] == 12
+        assert exercise['sets'] == 1
+        assert exercise['posture_issues'] == []
+    
+    def test_log_exercise_rejects_wrong_type(self, client, db, auth_headers, sample_workout):
+        """Test a non-numeric count is a 400 naming the field, not a database error"""
+        response = client.post(f'/api/workouts/sessions/{sample_workout.session_id}/exercises',
+            headers=auth_headers,
+            json={'exercise_type': 'squats', 'total_reps': 'twelve'}
+        )
+        
+        assert response.status_code == 400
+        assert 'total_reps' in response.get_json()['error']
+
+class TestLogExercisesBulk:
+    """Test logging a session's exercises in one request"""
+    
+    def test_bulk_exercises_saved_in_one_insert(self, client, db, auth_headers, sample_workout, query_counter):
+        """Test every exercise is saved and returned, with a single INSERT statement"""
+        url = f'/api/workouts/sessions/{sample_workout.session_id}/exercises/bulk'
+        query_counter.clear()
+        
+        response = client.post(url,
+            headers=auth_headers,
+            json={'exercises': [
+                {'exercise_type': 'squats', 'total_reps': 12},
+                {'exercise_type': 'pushups', 'total_reps': 10},
+                {'exercise_type': 'lunges', 'total_reps': 8}
+            ]}
+        )
+        
+        assert response.status_code == 201
+        assert [ex['exercise_type'] for ex in response.get_json()['data']['exercises']] == ['squats', 'pushups', 'lunges']
+        assert len([q for q in query_counter if q.startswith('INSERT INTO exercise_logs')]) == 1
+    
+    def test_bulk_exercises_rejects_invalid_entry(self, client, db, auth_headers, sample_workout):
+        """Test one exercise without a type rejects the whole batch"""
+        from app.models.workout import ExerciseLog
+        
+        response = client.post(f'/api/workouts/sessions/{sample_workout.session_id}/exercises/bulk',
+            headers=auth_headers,
+            json={'exercises': [{'exercise_type': 'squats'}, {'total_reps': 10}]}
+        )
+        
+        assert response.status_code == 400
+        assert ExerciseLog.query.count() == 0
+
+class TestGetExerciseHistory:
+    """Test per-exercise history"""
+    
+    def test_exercise_history_filters_by_type(self, client, db, auth_headers, sample_exercises):
+        """Test only the requested exercise type is returned, with its posture issues intact"""
+        sample_exercises[0].posture_issues = {'knees': 2}
+        db.session.commit()
+        
+        response = client.get('/api/workouts/exercises/history/squats',
+            headers=auth_headers
+        )
+        
+        assert response.status_code == 200
+        [exercise] = response.get_json()['data']['exercises']
+        assert exercise['exercise_type'] == 'squats'
+        assert exercise['posture_issues'] == {'knees': 2}
+
+class TestExerciseTypes:
+    """Test the static exercise type list"""
+    
+    def test_exercise_types_cacheable(self, client, auth_headers):
+        """Test the list is served with long-lived caching headers and revalidates to 304"""
+        response = client.get('/api/workouts/exercises/types',
+            headers=auth_headers
+        )
+        
+        assert response.status_code == 200
+        assert 'squat' in response.get_json()['data']['types']
+        assert response.cache_control.public
+        assert response.cache_control.max_age == 86400
+        
+        response = client.get('/api/workouts/exercises/types',
+            headers={**auth_headers, 'If-None-Match': response.headers['ETag']}
+        )
+        
+        assert response.status_code == 304